@@ -0,0 +1,580 @@
+"""Benchmark suite of pillow_affine.
+
+All benchmarks run offline on synthetic images. The results can be written to a
+JSON file and compared against a previously saved baseline:
+
+    python benchmarks/benchmark.py --output baseline.json
+    # upgrade Pillow, checkout another commit, ...
+    python benchmarks/benchmark.py --compare baseline.json
+
+If a benchmark is slower than the baseline by more than the threshold, the exit
+code is 1. Use --filter to run only the benchmarks whose name matches a regular
+expression and --list to show all available benchmarks.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+import argparse
+from datetime import datetime
+import json
+import os
+import pickle
+import platform
+import re
+import statistics
+import sys
+import timeit
+from os import path
+import numpy as np
+import PIL
+from PIL import Image
+
+sys.path.insert(0, path.abspath(path.join(path.dirname(__file__), "..")))
+
+from pillow_affine import __about__  # noqa: E402
+from pillow_affine import augmentation, serialization, transforms, utils  # noqa: E402
+from pillow_affine.apply import apply, apply_batch, apply_many  # noqa: E402
+from pillow_affine.arrays import transform_array  # noqa: E402
+from pillow_affine.collage import Patch, composite_patches  # noqa: E402
+from pillow_affine.sampling import SamplingMapCache  # noqa: E402
+from pillow_affine.tiling import transform_tiled  # noqa: E402
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+
+
+SIZES = (256, 1024, 2048)
+MODES = ("L", "RGB", "RGBA")
+RESAMPLE_FILTERS = {
+    "nearest": Image.NEAREST,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+}
+CHAIN_LENGTHS = (1, 4, 16)
+BATCH_SIZES = (16, 256)
+
+
+def make_image(size: int, mode: str = "RGB", seed: int = 0) -> Image.Image:
+    # smooth gradients with some noise, so that the images are not trivially
+    # compressible but still resemble natural images
+    generator = np.random.default_rng(seed)
+    height, width = (3 * size) // 4, size
+    xs = np.linspace(0.0, 255.0, width)[None, :, None]
+    ys = np.linspace(0.0, 255.0, height)[:, None, None]
+    num_channels = len(Image.new(mode, (1, 1)).getbands())
+    weights = generator.uniform(0.0, 1.0, (2, num_channels))
+    array = weights[0] * xs + weights[1] * ys
+    array += generator.normal(0.0, 16.0, array.shape)
+    array = np.clip(array, 0.0, 255.0).astype(np.uint8)
+    if num_channels == 1:
+        array = array[..., 0]
+    return Image.fromarray(array, mode)
+
+
+def make_chain(length: int) -> transforms.AffineTransform:
+    elementary_transforms = (
+        transforms.Shear(10.0),
+        transforms.Rotate(30.0),
+        transforms.Scale((1.2, 0.8)),
+        transforms.Translate((20.0, -10.0)),
+    )
+    return transforms.ComposedTransform(
+        *[elementary_transforms[idx % 4] for idx in range(length)]
+    )
+
+
+def make_sizes(num: int) -> List[transforms.Size]:
+    generator = np.random.default_rng(0)
+    return [
+        (int(width), int(height))
+        for width, height in generator.integers(64, 1024, (num, 2))
+    ]
+
+
+def matrix_benchmarks() -> Iterator[Benchmark]:
+    for length in (2, 8, 32):
+        matrices = [
+            tuple(np.random.default_rng(idx).normal(size=6).tolist())
+            for idx in range(length)
+        ]
+        yield Benchmark(
+            f"matrix/left_matmuls[length={length}]",
+            lambda matrices=matrices: lambda: utils.left_matmuls(*matrices),
+        )
+
+    yield Benchmark(
+        "matrix/matinv",
+        lambda: lambda: utils.matinv((1.2, 0.3, 4.0, -0.1, 0.9, -2.0)),
+    )
+
+    for num in BATCH_SIZES:
+        generator = np.random.default_rng(0)
+        matrices = [generator.normal(size=(num, 6)) for _ in range(4)]
+        yield Benchmark(
+            f"matrix/batch_left_matmuls[length=4,num={num}]",
+            lambda matrices=matrices: lambda: utils.batch_left_matmuls(*matrices),
+        )
+        yield Benchmark(
+            f"matrix/batch_matinv[num={num}]",
+            lambda matrices=matrices: lambda: utils.batch_matinv(matrices[0]),
+        )
+
+
+def transform_benchmarks() -> Iterator[Benchmark]:
+    size = (1024, 768)
+    for length in CHAIN_LENGTHS:
+        for expand in (False, True):
+            transform = make_chain(length)
+            yield Benchmark(
+                f"transform/extract_transform_params"
+                f"[length={length},expand={expand}]",
+                lambda transform=transform, expand=expand: lambda: (
+                    transform.extract_transform_params(size, expand=expand)
+                ),
+            )
+
+        compiled_transform = make_chain(length).compile()
+        yield Benchmark(
+            f"transform/extract_transform_params[length={length},compiled=True]",
+            lambda transform=compiled_transform: lambda: (
+                transform.extract_transform_params(size)
+            ),
+        )
+
+    def cached() -> Callable[[], Any]:
+        transform = make_chain(4)
+        transform.enable_cache()
+        return lambda: transform.extract_transform_params(size)
+
+    yield Benchmark("transform/extract_transform_params[length=4,cached=True]", cached)
+
+    matrix = transforms.Rotate(30.0)._create_matrix(size)
+    yield Benchmark(
+        "transform/expand_canvas",
+        lambda: lambda: transforms.AffineTransform._expand_canvas(size, matrix),
+    )
+
+    for num in BATCH_SIZES:
+        sizes = make_sizes(num)
+        for length in CHAIN_LENGTHS:
+            yield Benchmark(
+                f"transform/extract_batch_transform_params"
+                f"[length={length},num={num}]",
+                lambda transform=make_chain(length), sizes=sizes: lambda: (
+                    transform.extract_batch_transform_params(sizes, expand=True)
+                ),
+            )
+
+        random_transform = augmentation.RandomAffine(
+            shear=10.0, angle=30.0, factor=(0.8, 1.2), translation=(20.0, 20.0)
+        )
+        yield Benchmark(
+            f"augmentation/extract_batch_transform_params[num={num}]",
+            lambda sizes=sizes: lambda: random_transform.extract_batch_transform_params(
+                sizes, generator=augmentation.make_generator(0), expand=True
+            ),
+        )
+
+
+def warp_benchmarks() -> Iterator[Benchmark]:
+    transform = transforms.Rotate(30.0)
+    for size in SIZES:
+        for mode in MODES:
+            for name, resample in RESAMPLE_FILTERS.items():
+                yield Benchmark(
+                    f"warp/apply[size={size},mode={mode},resample={name}]",
+                    lambda size=size, mode=mode, resample=resample: (
+                        lambda image=make_image(size, mode): apply(
+                            image, transform, resample=resample
+                        )
+                    ),
+                )
+
+    for size in SIZES:
+        for fast_path in (False, True):
+            yield Benchmark(
+                f"warp/apply_rotate_90[size={size},fast_path={fast_path}]",
+                lambda size=size, fast_path=fast_path: (
+                    lambda image=make_image(size): apply(
+                        image,
+                        transforms.Rotate(90.0),
+                        resample=Image.BILINEAR,
+                        fast_path=fast_path,
+                    )
+                ),
+            )
+
+    zoom = transforms.Scale(8.0)
+    for size in SIZES:
+        for crop_source in (False, True):
+            yield Benchmark(
+                f"warp/apply_zoom[size={size},crop_source={crop_source}]",
+                lambda size=size, crop_source=crop_source: (
+                    lambda image=make_image(size): apply(
+                        image, zoom, resample=Image.BICUBIC, crop_source=crop_source
+                    )
+                ),
+            )
+
+    shrink = transforms.Scale(0.1)
+    for size in SIZES:
+        for reducing_gap in (None, 2.0):
+            yield Benchmark(
+                f"warp/apply_shrink[size={size},reducing_gap={reducing_gap}]",
+                lambda size=size, reducing_gap=reducing_gap: (
+                    lambda image=make_image(size): apply(
+                        image,
+                        shrink,
+                        expand=True,
+                        resample=Image.BILINEAR,
+                        reducing_gap=reducing_gap,
+                    )
+                ),
+            )
+
+    for size in SIZES:
+        for name, resample in RESAMPLE_FILTERS.items():
+            if resample == Image.BICUBIC:
+                continue
+            yield Benchmark(
+                f"warp/transform_array[size={size},resample={name}]",
+                lambda size=size, resample=resample: (
+                    lambda array=np.asarray(make_image(size)): transform_array(
+                        array, transform, resample=resample
+                    )
+                ),
+            )
+
+    def cached_remap(size: int, resample: int) -> Callable[[], Any]:
+        array = np.asarray(make_image(size))
+        cache = SamplingMapCache(maxbytes=2**30)
+        cache.warp(array, transform, resample=resample)
+        return lambda: cache.warp(array, transform, resample=resample)
+
+    for size in SIZES:
+        for name, resample in RESAMPLE_FILTERS.items():
+            if resample == Image.BICUBIC:
+                continue
+            yield Benchmark(
+                f"warp/cached_remap[size={size},resample={name}]",
+                lambda size=size, resample=resample: cached_remap(size, resample),
+            )
+
+
+def batch_benchmarks() -> Iterator[Benchmark]:
+    num = 1000
+    images = [make_image(64, seed=seed) for seed in range(8)] * (num // 8)
+    angles = np.random.default_rng(0).uniform(-30.0, 30.0, num)
+    rotations = [transforms.Rotate(angle) for angle in angles]
+    yield Benchmark(
+        f"batch/apply[num={num},size=64]",
+        lambda: lambda: [
+            apply(image, transform) for image, transform in zip(images, rotations)
+        ],
+    )
+    yield Benchmark(
+        f"batch/apply_batch[num={num},size=64]",
+        lambda: lambda: apply_batch(images, transforms.Rotate(angles)),
+    )
+
+
+def collage_benchmarks() -> Iterator[Benchmark]:
+    generator = np.random.default_rng(0)
+    canvas_size = (4096, 4096)
+    images = [make_image(256, mode="RGBA", seed=seed) for seed in range(8)]
+    patches = [
+        Patch(
+            images[idx % len(images)],
+            transforms.ComposedTransform(
+                transforms.Rotate(float(generator.uniform(-180.0, 180.0))),
+                transforms.Scale(float(generator.uniform(0.5, 1.5))),
+            ),
+            tuple(generator.uniform(0.0, 3840.0, 2).tolist()),
+        )
+        for idx in range(64)
+    ]
+    workers = min(4, os.cpu_count() or 1)
+    for num_workers in sorted({1, workers}):
+        yield Benchmark(
+            f"collage/composite_patches[num=64,workers={num_workers}]",
+            lambda num_workers=num_workers: lambda: composite_patches(
+                Image.new("RGBA", canvas_size),
+                patches,
+                resample=Image.BILINEAR,
+                workers=num_workers,
+            ),
+        )
+
+
+def parallel_benchmarks() -> Iterator[Benchmark]:
+    transform = transforms.Rotate(30.0)
+    images = [make_image(512, seed=seed) for seed in range(32)]
+    workers = min(4, os.cpu_count() or 1)
+    for backend in ("thread", "process"):
+        yield Benchmark(
+            f"parallel/apply_many[num=32,backend={backend},workers={workers}]",
+            lambda backend=backend: lambda: list(
+                apply_many(
+                    images,
+                    transform,
+                    workers=workers,
+                    backend=backend,
+                    resample=Image.BILINEAR,
+                )
+            ),
+        )
+
+    for workers in sorted({1, min(4, os.cpu_count() or 1)}):
+        yield Benchmark(
+            f"parallel/transform_tiled[size=2048,workers={workers}]",
+            lambda workers=workers: (
+                lambda image=make_image(2048): transform_tiled(
+                    image, transform, resample=Image.BILINEAR, workers=workers
+                )
+            ),
+        )
+
+
+def serialization_benchmarks() -> Iterator[Benchmark]:
+    # distinct transforms, since pickle only stores repeated objects once
+    generator = np.random.default_rng(0)
+    chains = [
+        transforms.ComposedTransform(
+            transforms.Shear(shear_angle),
+            transforms.Rotate(rotation_angle),
+            transforms.Scale((horizontal_factor, 0.8)),
+            transforms.Translate((horizontal_translation, -10.0)),
+        )
+        for shear_angle, rotation_angle, horizontal_factor, horizontal_translation in (
+            generator.uniform(0.0, 10.0, (1000, 4)).tolist()
+        )
+    ]
+    buffer = serialization.dumps_transforms(chains)
+    pickled = pickle.dumps(chains, protocol=pickle.HIGHEST_PROTOCOL)
+    yield Benchmark(
+        "serialization/dumps_transforms[length=4,num=1000]",
+        lambda: lambda: serialization.dumps_transforms(chains),
+    )
+    yield Benchmark(
+        "serialization/dumps_transforms[length=4,num=1000,format=pickle]",
+        lambda: lambda: pickle.dumps(chains, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+    yield Benchmark(
+        "serialization/loads_transforms[length=4,num=1000]",
+        lambda: lambda: serialization.loads_transforms(buffer).tolist(),
+    )
+    yield Benchmark(
+        "serialization/loads_transforms[length=4,num=1000,format=pickle]",
+        lambda: lambda: pickle.loads(pickled),
+    )
+    yield Benchmark(
+        "serialization/loads_transform[length=4,num=1000]",
+        lambda: lambda: serialization.loads_transforms(buffer)[500],
+    )
+    yield Benchmark(
+        "serialization/loads_transform[length=4,num=1000,format=pickle]",
+        lambda: lambda: pickle.loads(pickled)[500],
+    )
+
+    num = 100_000
+    sizes = np.random.default_rng(0).integers(64, 1024, (num, 2))
+    batch = serialization.TransformParamsBatch.from_transform(
+        transforms.Rotate(30.0), sizes
+    )
+    params = batch.tolist()
+    params_buffer = serialization.dumps_params(batch)
+    pickled_params = pickle.dumps(params, protocol=pickle.HIGHEST_PROTOCOL)
+    yield Benchmark(
+        f"serialization/dumps_params[num={num}]",
+        lambda: lambda: serialization.dumps_params(batch),
+    )
+    yield Benchmark(
+        f"serialization/dumps_params[num={num},input=list]",
+        lambda: lambda: serialization.dumps_params(params),
+    )
+    yield Benchmark(
+        f"serialization/dumps_params[num={num},format=pickle]",
+        lambda: lambda: pickle.dumps(params, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+    yield Benchmark(
+        f"serialization/loads_params[num={num}]",
+        lambda: lambda: serialization.loads_params(params_buffer),
+    )
+    yield Benchmark(
+        f"serialization/loads_params[num={num},output=list]",
+        lambda: lambda: serialization.loads_params(params_buffer).tolist(),
+    )
+    yield Benchmark(
+        f"serialization/loads_params[num={num},format=pickle]",
+        lambda: lambda: pickle.loads(pickled_params),
+    )
+
+
+def collect_benchmarks() -> List[Benchmark]:
+    return [
+        *matrix_benchmarks(),
+        *transform_benchmarks(),
+        *warp_benchmarks(),
+        *batch_benchmarks(),
+        *collage_benchmarks(),
+        *parallel_benchmarks(),
+        *serialization_benchmarks(),
+    ]
+
+
+def measure(benchmark: Benchmark, repeat: int, min_time: float) -> Dict[str, Any]:
+    func = benchmark.setup()
+    timer = timeit.Timer(func)
+
+    # calibrate the number of calls per measurement similar to python -m timeit
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2
+
+    timings = [timing / number for timing in timer.repeat(repeat, number)]
+    return {
+        "name": benchmark.name,
+        "number": number,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+    }
+
+
+def collect_metadata() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "pillow_affine": __about__.__version__,
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, factor in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.2f} ns"
+
+
+def compare(
+    results: Sequence[Dict[str, Any]],
+    baseline: Sequence[Dict[str, Any]],
+    threshold: float,
+) -> bool:
+    baseline_results = {result["name"]: result for result in baseline}
+    regression = False
+    for result in results:
+        name = result["name"]
+        try:
+            reference = baseline_results[name]["min"]
+        except KeyError:
+            print(f"{'new':>10} {format_time(result['min'])}  {name}")
+            continue
+
+        ratio = result["min"] / reference
+        if ratio > 1.0 + threshold:
+            status = "SLOWER"
+            regression = True
+        elif ratio < 1.0 / (1.0 + threshold):
+            status = "faster"
+        else:
+            status = ""
+        print(
+            f"{ratio:9.2f}x {format_time(result['min'])} "
+            f"(baseline {format_time(reference)})  {name} {status}".rstrip()
+        )
+    return regression
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[2:]),
+    )
+    parser.add_argument("-o", "--output", help="JSON file the results are written to.")
+    parser.add_argument(
+        "-c", "--compare", metavar="BASELINE", help="JSON file of a previous run."
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown that counts as regression. Defaults to 0.1.",
+    )
+    parser.add_argument(
+        "-f",
+        "--filter",
+        metavar="PATTERN",
+        help="Only run the benchmarks whose name matches this regular expression.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of measurements per benchmark. Defaults to 5.",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="Minimum duration of a single measurement in seconds. Defaults to "
+        "0.05.",
+    )
+    parser.add_argument(
+        "-l", "--list", action="store_true", help="List the benchmarks and exit."
+    )
+    return parser
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    options = make_parser().parse_args(args)
+
+    benchmarks = collect_benchmarks()
+    if options.filter is not None:
+        pattern = re.compile(options.filter)
+        benchmarks = [
+            benchmark for benchmark in benchmarks if pattern.search(benchmark.name)
+        ]
+
+    if options.list:
+        for benchmark in benchmarks:
+            print(benchmark.name)
+        return 0
+
+    baseline = None
+    if options.compare is not None:
+        with open(options.compare, "r") as fh:
+            baseline = json.load(fh)["results"]
+
+    results = []
+    for benchmark in benchmarks:
+        result = measure(benchmark, options.repeat, options.min_time)
+        results.append(result)
+        if baseline is None:
+            print(f"{format_time(result['min'])}  {benchmark.name}", flush=True)
+
+    if options.output is not None:
+        with open(options.output, "w") as fh:
+            json.dump(
+                {"metadata": collect_metadata(), "results": results}, fh, indent=2
+            )
+
+    if baseline is not None:
+        return 1 if compare(results, baseline, options.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import argparse
+import glob
+from os import path
+import os
+import queue
+import sys
+import threading
+import time
+from PIL import Image
+from .apply import apply
+from .transforms import ComposedTransform, Rotate, Scale, Shear, Translate
+
+__all__ = ["main"]
+
+IMAGE_EXTENSIONS = (".bmp", ".gif", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp")
+RESAMPLE_FILTERS = {
+    "nearest": Image.NEAREST,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+}
+
+_DONE = object()
+
+
+def _parse_factor(value: str) -> Any:
+    try:
+        factors = tuple(float(item) for item in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid factor: '{value}'")
+    if len(factors) == 1:
+        return factors[0]
+    elif len(factors) == 2:
+        return factors
+    else:
+        raise argparse.ArgumentTypeError(f"expected FACTOR or HORZ,VERT: '{value}'")
+
+
+def _parse_translation(value: str) -> Any:
+    try:
+        horz_translation, vert_translation = [float(item) for item in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HORZ,VERT: '{value}'")
+    return horz_translation, vert_translation
+
+
+def _parse_positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive int: '{value}'")
+    return number
+
+
+class _AppendTransform(argparse.Action):
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: Any,
+        option_string: Optional[str] = None,
+    ) -> None:
+        transforms = getattr(namespace, self.dest) or []
+        transforms.append(self.const(values))
+        setattr(namespace, self.dest, transforms)
+
+
+def _make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m pillow_affine",
+        description=(
+            "Applies a chain of affine transformations to a batch of images. The "
+            "transformations are applied in the order they are given."
+        ),
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="INPUT",
+        help=(
+            "Directory, glob pattern, or manifest file with one image path per "
+            "line. Relative paths in a manifest are resolved against its directory."
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help=(
+            "Directory the images are written to. The images keep the name of "
+            "their input file."
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="Output format, e.g. 'png'. Defaults to the format of the input.",
+    )
+
+    group = parser.add_argument_group("transformations")
+    for option, cls, metavar, type, help in (
+        ("--shear", Shear, "ANGLE", float, "Horizontal shearing angle in degrees."),
+        ("--rotate", Rotate, "ANGLE", float, "Rotation angle in degrees."),
+        (
+            "--scale",
+            Scale,
+            "FACTOR",
+            _parse_factor,
+            "Scaling factor or HORZ,VERT scaling factors.",
+        ),
+        (
+            "--translate",
+            Translate,
+            "HORZ,VERT",
+            _parse_translation,
+            "Horizontal and vertical translation.",
+        ),
+    ):
+        group.add_argument(
+            option,
+            dest="transforms",
+            metavar=metavar,
+            type=type,
+            action=_AppendTransform,
+            const=cls,
+            help=help,
+        )
+    group.add_argument(
+        "--expand",
+        action="store_true",
+        help="Expand the canvas to hold the complete transformed motif.",
+    )
+    group.add_argument(
+        "--resample",
+        choices=tuple(RESAMPLE_FILTERS.keys()),
+        default="nearest",
+        help="Resampling filter. Defaults to 'nearest'.",
+    )
+
+    group = parser.add_argument_group("concurrency")
+    group.add_argument(
+        "--decoders",
+        type=_parse_positive_int,
+        default=2,
+        help="Number of decoders. Defaults to 2.",
+    )
+    group.add_argument(
+        "--workers",
+        type=_parse_positive_int,
+        default=os.cpu_count() or 1,
+        help="Number of workers transforming the images. Defaults to the number "
+        "of CPUs.",
+    )
+    group.add_argument(
+        "--encoders",
+        type=_parse_positive_int,
+        default=2,
+        help="Number of encoders. Defaults to 2.",
+    )
+    group.add_argument(
+        "--queue-size",
+        type=_parse_positive_int,
+        default=16,
+        help="Maximum number of images buffered between stages. Defaults to 16.",
+    )
+    return parser
+
+
+def _collect_files(inputs: Sequence[str]) -> List[str]:
+    files = []
+    for input in inputs:
+        if path.isdir(input):
+            files.extend(
+                sorted(
+                    path.join(input, file)
+                    for file in os.listdir(input)
+                    if path.splitext(file)[1].lower() in IMAGE_EXTENSIONS
+                )
+            )
+        elif glob.has_magic(input):
+            files.extend(sorted(glob.glob(input)))
+        elif path.splitext(input)[1].lower() in IMAGE_EXTENSIONS:
+            files.append(input)
+        elif not path.isfile(input):
+            raise RuntimeError(f"input '{input}' does not exist")
+        else:
+            root = path.dirname(input)
+            with open(input, "r") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        files.append(path.join(root, line))
+    return files
+
+
+def _output_files(
+    files: Sequence[str], output: str, format: Optional[str]
+) -> List[str]:
+    output_files = []
+    sources: Dict[str, str] = {}
+    for file in files:
+        name, ext = path.splitext(path.basename(file))
+        if format is not None:
+            ext = "." + format.lower().lstrip(".")
+        output_file = path.join(output, name + ext)
+        if output_file in sources:
+            raise RuntimeError(
+                f"'{sources[output_file]}' and '{file}' would both be written to "
+                f"'{output_file}'"
+            )
+        sources[output_file] = file
+        output_files.append(output_file)
+    return output_files
+
+
+def _start_stage(
+    func: Callable[[Any], Any],
+    in_queue: "queue.Queue[Any]",
+    out_queue: Optional["queue.Queue[Any]"],
+    workers: int,
+    errors: List[str],
+) -> threading.Thread:
+    def work() -> None:
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                in_queue.put(_DONE)
+                return
+
+            try:
+                result = func(item)
+            except Exception as error:
+                errors.append(f"{item[0]}: {error}")
+                continue
+
+            if out_queue is not None:
+                out_queue.put(result)
+
+    def supervise() -> None:
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if out_queue is not None:
+            out_queue.put(_DONE)
+
+    supervisor = threading.Thread(target=supervise, daemon=True)
+    supervisor.start()
+    return supervisor
+
+
+def main(args: Optional[Sequence[str]] = None) -> int:
+    """Entry point of ``python -m pillow_affine``. Decoding, transforming, and
+    encoding run as concurrent pipeline stages connected by bounded queues.
+
+    Args:
+        args: Optional command line arguments. Defaults to ``sys.argv[1:]``.
+
+    Returns:
+        Exit code.
+    """
+    parser = _make_parser()
+    options = parser.parse_args(args)
+    if not options.transforms:
+        parser.error("at least one transformation is required")
+
+    transforms = options.transforms
+    transform = (
+        transforms[0] if len(transforms) == 1 else ComposedTransform(*transforms)
+    )
+    resample = RESAMPLE_FILTERS[options.resample]
+
+    try:
+        files = _collect_files(options.inputs)
+        output_files = _output_files(files, options.output, options.format)
+    except (RuntimeError, OSError) as error:
+        parser.error(str(error))
+    os.makedirs(options.output, exist_ok=True)
+
+    def decode(item: Any) -> Any:
+        file, output_file = item
+        image = Image.open(file)
+        image.load()
+        return file, output_file, image
+
+    def warp(item: Any) -> Any:
+        file, output_file, image = item
+        image = apply(image, transform, expand=options.expand, resample=resample)
+        return file, output_file, image
+
+    def encode(item: Any) -> None:
+        _, output_file, image = item
+        image.save(output_file)
+        written.append(output_file)
+
+    errors: List[str] = []
+    written: List[str] = []
+    file_queue: "queue.Queue[Any]" = queue.Queue()
+    decoded_queue: "queue.Queue[Any]" = queue.Queue(maxsize=options.queue_size)
+    warped_queue: "queue.Queue[Any]" = queue.Queue(maxsize=options.queue_size)
+
+    start = time.perf_counter()
+    stages = (
+        _start_stage(decode, file_queue, decoded_queue, options.decoders, errors),
+        _start_stage(warp, decoded_queue, warped_queue, options.workers, errors),
+        _start_stage(encode, warped_queue, None, options.encoders, errors),
+    )
+    for file, output_file in zip(files, output_files):
+        file_queue.put((file, output_file))
+    file_queue.put(_DONE)
+    for stage in stages:
+        stage.join()
+    duration = time.perf_counter() - start
+
+    for error in errors:
+        print(error, file=sys.stderr)
+
+    # only images that were actually written are counted
+    num_images = len(written)
+    throughput = num_images / duration if duration > 0.0 else 0.0
+    print(
+        f"Transformed {num_images} image(s) in {duration:.2f} s "
+        f"({throughput:.1f} images/s)."
+    )
+    return 1 if errors or num_images < len(files) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
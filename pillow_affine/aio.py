@@ -0,0 +1,329 @@
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+    Union,
+)
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+import io
+import os
+from types import TracebackType
+from PIL import Image
+from .apply import apply
+from .transforms import AffineTransform
+
+__all__ = ["AsyncTransformer", "apply_async", "apply_many_async"]
+
+T = TypeVar("T")
+
+Images = Union[Iterable[Image.Image], AsyncIterable[Image.Image]]
+
+
+def _apply(
+    image: Image.Image, transform: AffineTransform, kwargs: Dict[str, Any]
+) -> Image.Image:
+    return apply(image, transform, **kwargs)
+
+
+def _transform_bytes(
+    data: bytes,
+    transform: AffineTransform,
+    format: Optional[str],
+    kwargs: Dict[str, Any],
+) -> bytes:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    if format is None:
+        format = image.format
+
+    transformed_image = apply(image, transform, **kwargs)
+
+    fp = io.BytesIO()
+    transformed_image.save(fp, format=format)
+    return fp.getvalue()
+
+
+async def _iterate(images: Images) -> AsyncGenerator[Image.Image, None]:
+    if isinstance(images, AsyncIterable):
+        async for image in images:
+            yield image
+    else:
+        for image in images:
+            yield image
+
+
+class AsyncTransformer:
+    """Applies affine transformations from ``asyncio`` code without blocking the
+    event loop. The decoding, warping, and encoding is offloaded to an executor. A
+    simple call might look like::
+
+        from pillow_affine import transforms
+        from pillow_affine.aio import AsyncTransformer
+
+        transformer = AsyncTransformer(max_concurrency=4, timeout=1.0)
+        transform = transforms.Rotate(30.0)
+
+        async def handle(data: bytes) -> bytes:
+            return await transformer.transform_bytes(data, transform, format="png")
+
+    Cancelling a call or exceeding the timeout cancels jobs that have not been
+    started yet. Jobs that already run in the executor cannot be interrupted, but
+    keep occupying their slot of the concurrency limit until they finish. Thus,
+    the limit holds even under timeouts.
+
+    Args:
+        executor: Executor the work is offloaded to. If a
+            ``ProcessPoolExecutor`` is used, the images and transforms have to be
+            picklable. Defaults to a thread pool with ``max_concurrency`` workers,
+            which is shut down by :meth:`shutdown`.
+        max_concurrency: Maximum number of jobs submitted to the executor at
+            once. Further calls wait until a slot is free. Defaults to the number
+            of CPUs.
+        timeout: Optional timeout in seconds for every job including the time it
+            waits for a free slot. If exceeded, an ``asyncio.TimeoutError`` is
+            raised.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        if max_concurrency < 1:
+            raise RuntimeError("max_concurrency has to be positive.")
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # created lazily, since it has to be bound to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncTransformer":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down the executor if it was created by the transformer.
+
+        Args:
+            wait: If ``True``, blocks until all running jobs are finished. Defaults
+                to ``True``.
+        """
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wait_for(self._submit(func, *args), self.timeout)
+
+    async def _submit(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+
+        await semaphore.acquire()
+        try:
+            future: "Future[T]" = self.executor.submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def release(_: "Future[T]") -> None:
+            # invoked from the worker thread once the job has actually finished or
+            # was cancelled before it started
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(semaphore.release)
+
+        future.add_done_callback(release)
+        # cancelling the wrapper also cancels the job if it has not started yet
+        return await asyncio.wrap_future(future, loop=loop)
+
+    async def apply(
+        self, image: Image.Image, transform: AffineTransform, **kwargs: Any
+    ) -> Image.Image:
+        """Awaitable version of :func:`~pillow_affine.apply.apply`.
+
+        Args:
+            image: Image to be transformed.
+            transform: Affine transformation.
+            **kwargs: Optional parameters passed to
+                :func:`~pillow_affine.apply.apply`.
+
+        Returns:
+            Transformed image.
+        """
+        return await self._run(_apply, image, transform, kwargs)
+
+    async def transform_bytes(
+        self,
+        data: bytes,
+        transform: AffineTransform,
+        format: Optional[str] = None,
+        **kwargs: Any,
+    ) -> bytes:
+        """Decodes an encoded image, applies an affine transformation, and encodes
+        the result. All three steps are performed in a single job of the executor.
+
+        Args:
+            data: Encoded image.
+            transform: Affine transformation.
+            format: Optional output format, e.g. ``"png"``. Defaults to the format
+                of the input.
+            **kwargs: Optional parameters passed to
+                :func:`~pillow_affine.apply.apply`.
+
+        Returns:
+            Encoded transformed image.
+        """
+        return await self._run(_transform_bytes, data, transform, format, kwargs)
+
+    async def apply_many(
+        self,
+        images: Images,
+        transform: AffineTransform,
+        ordered: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[Image.Image]:
+        """Applies an affine transformation to many images. The images are
+        consumed lazily, at most twice ``max_concurrency`` of them are in flight at
+        once, and the results are streamed back. If the iteration is stopped
+        early, the remaining jobs are cancelled. A simple call might look like::
+
+            async for transformed_image in transformer.apply_many(images, transform):
+                ...
+
+        Args:
+            images: Images to be transformed. Can also be an asynchronous
+                iterable.
+            transform: Affine transformation.
+            ordered: If ``True``, the results are yielded in the order of the
+                input. Otherwise, they are yielded as they are completed. Defaults
+                to ``True``.
+            **kwargs: Optional parameters passed to
+                :func:`~pillow_affine.apply.apply`.
+
+        Returns:
+            Asynchronous iterator of the transformed images.
+        """
+        max_pending = 2 * self.max_concurrency
+        tasks: Deque["asyncio.Future[Image.Image]"] = deque()
+        pending: Set["asyncio.Future[Image.Image]"] = set()
+        iterator = _iterate(images)
+        try:
+            async for image in iterator:
+                task = asyncio.ensure_future(self.apply(image, transform, **kwargs))
+                if ordered:
+                    tasks.append(task)
+                    if len(tasks) >= max_pending:
+                        yield await tasks.popleft()
+                else:
+                    pending.add(task)
+                    if len(pending) >= max_pending:
+                        done, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        for task in done:
+                            yield task.result()
+
+            while tasks:
+                yield await tasks.popleft()
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in (*tasks, *pending):
+                task.cancel()
+            await iterator.aclose()
+
+
+async def apply_async(
+    image: Image.Image,
+    transform: AffineTransform,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> Image.Image:
+    """Awaitable version of :func:`~pillow_affine.apply.apply`. For a concurrency
+    limit shared by many calls use :class:`AsyncTransformer`.
+
+    Args:
+        image: Image to be transformed.
+        transform: Affine transformation.
+        executor: Optional executor the warp is offloaded to. Defaults to the
+            default executor of the event loop.
+        timeout: Optional timeout in seconds. If exceeded, an
+            ``asyncio.TimeoutError`` is raised.
+        **kwargs: Optional parameters passed to :func:`~pillow_affine.apply.apply`.
+
+    Returns:
+        Transformed image.
+    """
+    loop = asyncio.get_event_loop()
+    future = loop.run_in_executor(executor, _apply, image, transform, kwargs)
+    return await asyncio.wait_for(future, timeout)
+
+
+async def apply_many_async(
+    images: Images,
+    transform: AffineTransform,
+    executor: Optional[Executor] = None,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    ordered: bool = True,
+    **kwargs: Any,
+) -> AsyncIterator[Image.Image]:
+    """Asynchronous version of :func:`~pillow_affine.apply.apply_many`. See
+    :meth:`AsyncTransformer.apply_many` for details.
+
+    Args:
+        images: Images to be transformed. Can also be an asynchronous iterable.
+        transform: Affine transformation.
+        executor: Optional executor the warps are offloaded to. Defaults to a
+            thread pool with ``max_concurrency`` workers.
+        max_concurrency: Maximum number of warps submitted to the executor at
+            once. Defaults to the number of CPUs.
+        timeout: Optional timeout in seconds for every image.
+        ordered: If ``True``, the results are yielded in the order of the input.
+            Defaults to ``True``.
+        **kwargs: Optional parameters passed to :func:`~pillow_affine.apply.apply`.
+
+    Returns:
+        Asynchronous iterator of the transformed images.
+    """
+    transformer = AsyncTransformer(
+        executor=executor, max_concurrency=max_concurrency, timeout=timeout
+    )
+    try:
+        async for transformed_image in transformer.apply_many(
+            images, transform, ordered=ordered, **kwargs
+        ):
+            yield transformed_image
+    finally:
+        transformer.shutdown(wait=False)
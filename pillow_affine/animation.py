@@ -0,0 +1,477 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from abc import ABC, abstractmethod
+from itertools import count, islice
+import os
+import numpy as np
+from PIL import Image
+from .apply import _create_executor, _submit_bounded, _warp
+from .instrumentation import stage
+from .transforms import (
+    AffineTransform,
+    ComposedTransform,
+    Identity,
+    Rotate,
+    Scale,
+    Size,
+    Sizes,
+    Translate,
+    _MIN_BATCH_SIZE,
+)
+from .utils import Coordinate, Matrix, Matrices
+
+__all__ = [
+    "Schedule",
+    "ConstantSchedule",
+    "KeyframeSchedule",
+    "GeneratedSchedule",
+    "make_schedule",
+    "iter_frames",
+    "transform_frames",
+    "save_frames",
+]
+
+Keyframes = Union[Mapping[int, Any], Sequence[Tuple[int, Any]]]
+
+
+class Schedule(ABC):
+    """ABC for all per-frame schedules of affine transformations."""
+
+    @abstractmethod
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        pass
+
+    def extract_batch_transform_params(
+        self, sizes: Sizes, expand: bool = False, common_canvas: bool = True
+    ) -> List[Tuple[Size, int, Matrix]]:
+        """Extracts the parameters that need to be passed to ``Image.transform()``
+        for every frame. All matrices are computed in one batch.
+
+        Args:
+            sizes: Frame sizes (width, height) of shape (N, 2).
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+            common_canvas: If ``True`` and ``expand`` is set, all frames share the
+                smallest canvas that holds every transformed motif, which is
+                required by most animated formats. Defaults to ``True``.
+
+        Returns:
+            ``size``, ``method``, and ``data`` parameters for each of the :math:`N`
+            frames.
+        """
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+        with stage("create_matrix", batch=len(sizes)):
+            transform_matrices = np.broadcast_to(
+                self._create_matrices(sizes), (len(sizes), 6)
+            )
+        expanded_sizes, data = AffineTransform._extract_batch_affine_data(
+            sizes, transform_matrices, expand=expand, common_canvas=common_canvas
+        )
+        return [
+            ((int(width), int(height)), Image.AFFINE, tuple(params.tolist()))
+            for (width, height), params in zip(expanded_sizes, data)
+        ]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._extra_repr()})"
+
+    def _extra_repr(self) -> str:
+        return ""
+
+
+class ConstantSchedule(Schedule):
+    """Applies the same affine transformation to every frame.
+
+    Args:
+        transform: Affine transformation.
+    """
+
+    def __init__(self, transform: AffineTransform) -> None:
+        self.transform = transform
+
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        if len(sizes) < _MIN_BATCH_SIZE and not self.transform._is_batched():
+            # same scalar matrices as the transform itself uses for small batches
+            return AffineTransform._create_matrices(self.transform, sizes)
+        return self.transform._create_matrices(sizes)
+
+    def _extra_repr(self) -> str:
+        return repr(self.transform)
+
+
+def _interpolate(keyframes: Keyframes, num_frames: int) -> np.ndarray:
+    items = sorted(dict(keyframes).items())
+    if not items:
+        raise RuntimeError("At least one keyframe is required.")
+
+    frames = np.array([frame for frame, _ in items], dtype=np.float64)
+    # scalar values are broadcast if other values have multiple components
+    num_components = max(np.size(value) for _, value in items)
+    values = np.stack(
+        [
+            np.broadcast_to(np.asarray(value, dtype=np.float64), (num_components,))
+            for _, value in items
+        ]
+    )
+    idcs = np.arange(num_frames, dtype=np.float64)
+    interpolated = np.stack(
+        [np.interp(idcs, frames, column) for column in values.T], axis=-1
+    )
+    return interpolated[:, 0] if interpolated.shape[1] == 1 else interpolated
+
+
+class KeyframeSchedule(Schedule):
+    """Interpolates the parameters of a rotation, scaling, and translation, which
+    are applied in this order, linearly between keyframes. Before the first and
+    after the last keyframe the parameters are held constant. A simple call might
+    look like::
+
+        from pillow_affine.animation import KeyframeSchedule
+
+        schedule = KeyframeSchedule(
+            angle={0: 0.0, 24: 360.0},
+            scale={0: 1.0, 12: 1.5, 24: 1.0},
+        )
+
+    Args:
+        angle: Optional keyframes of the rotation angle in degrees as mapping or
+            sequence of pairs (frame index, value).
+        scale: Optional keyframes of the scaling factor. The values can be scalars
+            or horizontal and vertical factors.
+        translation: Optional keyframes of the horizontal and vertical translation.
+        center: Optional center of the rotation and scaling. Defaults to the center
+            of each frame.
+    """
+
+    def __init__(
+        self,
+        angle: Optional[Keyframes] = None,
+        scale: Optional[Keyframes] = None,
+        translation: Optional[Keyframes] = None,
+        center: Optional[Coordinate] = None,
+    ) -> None:
+        self.angle = angle
+        self.scale = scale
+        self.translation = translation
+        self.center = center
+
+    def transform(self, num_frames: int) -> AffineTransform:
+        """Interpolates the parameters.
+
+        Args:
+            num_frames: Number of frames.
+
+        Returns:
+            Transform with array-valued parameters for each frame.
+        """
+        transforms: List[AffineTransform] = []
+        if self.angle is not None:
+            angles = _interpolate(self.angle, num_frames)
+            transforms.append(Rotate(angles, center=self.center))
+        if self.scale is not None:
+            factors = _interpolate(self.scale, num_frames)
+            transforms.append(Scale(factors, center=self.center))
+        if self.translation is not None:
+            translations = _interpolate(self.translation, num_frames)
+            transforms.append(Translate(translations))
+
+        if not transforms:
+            return Identity()
+        return ComposedTransform(*transforms)
+
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        return self.transform(len(sizes))._create_matrices(sizes)
+
+    def _extra_repr(self) -> str:
+        extras = []
+        for name in ("angle", "scale", "translation"):
+            keyframes = getattr(self, name)
+            if keyframes is not None:
+                extras.append(f"{name}=[{len(keyframes)} keyframes]")
+        if self.center is not None:
+            extras.append(f"center={self.center}")
+        return ", ".join(extras)
+
+
+class GeneratedSchedule(Schedule):
+    """Uses an individual affine transformation for each frame.
+
+    Args:
+        transforms: Either a callable that creates the transformation for a frame
+            index or an iterable, e.g. a generator, that yields a transformation
+            for each frame.
+    """
+
+    def __init__(
+        self,
+        transforms: Union[Callable[[int], AffineTransform], Iterable[AffineTransform]],
+    ) -> None:
+        self.transforms = transforms
+
+    def _iter_transforms(self) -> Iterator[AffineTransform]:
+        if callable(self.transforms):
+            return map(self.transforms, count())
+        return iter(self.transforms)
+
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        transforms = list(islice(self._iter_transforms(), len(sizes)))
+        if len(transforms) < len(sizes):
+            raise RuntimeError(
+                f"Got {len(sizes)} frames, but only {len(transforms)} transforms."
+            )
+
+        matrices = []
+        for transform, (width, height) in zip(transforms, sizes.tolist()):
+            transform._check_not_batched()
+            matrices.append(transform._create_matrix((width, height)))
+        return np.array(matrices, dtype=np.float64).reshape(-1, 6)
+
+
+def make_schedule(
+    schedule: Union[
+        Schedule,
+        AffineTransform,
+        Callable[[int], AffineTransform],
+        Iterable[AffineTransform],
+    ],
+) -> Schedule:
+    """Converts the supported inputs into a :class:`Schedule`.
+
+    Args:
+        schedule: Schedule, a single affine transformation used for all frames, or
+            any input of :class:`GeneratedSchedule`.
+
+    Returns:
+        Schedule.
+    """
+    if isinstance(schedule, Schedule):
+        return schedule
+    if isinstance(schedule, AffineTransform):
+        return ConstantSchedule(schedule)
+    return GeneratedSchedule(schedule)
+
+
+def _seek_frames(image: Image.Image) -> Iterator[Image.Image]:
+    # Seeks until the end rather than determining the number of frames upfront,
+    # which costs an additional pass over formats such as GIF.
+    idx = 0
+    while True:
+        try:
+            image.seek(idx)
+        except EOFError:
+            return
+        yield image
+        idx += 1
+
+
+def iter_frames(image: Image.Image) -> Iterator[Image.Image]:
+    """Iterates over the frames of a multi-frame image, e.g. an animated GIF or
+    WebP or a multi-page TIFF. Only the current frame is decoded.
+
+    Args:
+        image: Image.
+
+    Returns:
+        Iterator of independent copies of the frames.
+    """
+    for frame in _seek_frames(image):
+        yield frame.copy()
+
+
+def _scan_frames(image: Image.Image) -> Tuple[List[Size], List[Any]]:
+    # Seeking is not cheap: formats such as GIF, in which each frame builds on the
+    # previous one, decode every frame on the way. Thus, the frames are scanned
+    # in a single sequential pass.
+    sizes = []
+    durations = []
+    for frame in _seek_frames(image):
+        sizes.append(frame.size)
+        durations.append(frame.info.get("duration"))
+    image.seek(0)
+    return sizes, durations
+
+
+def transform_frames(
+    image: Image.Image,
+    schedule: Union[
+        Schedule,
+        AffineTransform,
+        Callable[[int], AffineTransform],
+        Iterable[AffineTransform],
+    ],
+    expand: bool = False,
+    workers: Optional[int] = None,
+    backend: str = "thread",
+    max_pending: Optional[int] = None,
+    **kwargs: Any,
+) -> Generator[Image.Image, None, None]:
+    """Transforms every frame of a multi-frame image. The matrices of all frames
+    are computed in one batch up front. Afterwards, the frames are decoded one
+    after another and warped in parallel. The transformed frames are streamed
+    back in order. A simple call might look like::
+
+        from PIL import Image
+        from pillow_affine.animation import KeyframeSchedule, transform_frames
+
+        image = Image.open("animation.gif")
+        schedule = KeyframeSchedule(angle={0: 0.0, image.n_frames - 1: 360.0})
+
+        for transformed_frame in transform_frames(image, schedule, workers=4):
+            ...
+
+    Args:
+        image: Multi-frame image. Single-frame images are treated as animation with
+            one frame.
+        schedule: Per-frame schedule of the affine transformations. See
+            :func:`make_schedule` for the supported inputs.
+        expand: If ``True``, expands the canvas to hold the complete transformed
+            motif. All frames share the smallest canvas that holds every
+            transformed motif. Defaults to ``False``.
+        workers: Number of workers. Defaults to the number of CPUs.
+        backend: Either ``"thread"`` or ``"process"``. Defaults to ``"thread"``.
+        max_pending: Maximum number of frames in flight. If reached, no further
+            frames are decoded until one is completed. Defaults to twice the
+            number of workers.
+        **kwargs: Optional parameters passed to :func:`~pillow_affine.apply.apply`.
+
+    Returns:
+        Iterator of the transformed frames.
+    """
+    sizes, _ = _scan_frames(image)
+    yield from _transform_frames(
+        image,
+        sizes,
+        schedule,
+        expand=expand,
+        workers=workers,
+        backend=backend,
+        max_pending=max_pending,
+        kwargs=kwargs,
+    )
+
+
+def _transform_frames(
+    image: Image.Image,
+    sizes: List[Size],
+    schedule: Any,
+    expand: bool,
+    workers: Optional[int],
+    backend: str,
+    max_pending: Optional[int],
+    kwargs: Dict[str, Any],
+) -> Generator[Image.Image, None, None]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * workers
+
+    batch_transform_params = make_schedule(schedule).extract_batch_transform_params(
+        sizes, expand=expand
+    )
+
+    executor = _create_executor(backend, workers)
+    results = _submit_bounded(
+        executor,
+        (
+            (_warp_frame, (frame, transform_params, kwargs))
+            for frame, transform_params in zip(
+                iter_frames(image), batch_transform_params
+            )
+        ),
+        ordered=True,
+        max_pending=max_pending,
+    )
+    try:
+        yield from results
+    finally:
+        results.close()
+        executor.shutdown(wait=True)
+
+
+def _warp_frame(
+    frame: Image.Image,
+    transform_params: Tuple[Size, int, Matrix],
+    kwargs: Dict[str, Any],
+) -> Image.Image:
+    return _warp(frame, *transform_params, **kwargs)
+
+
+def save_frames(
+    image: Image.Image,
+    fp: Any,
+    schedule: Union[
+        Schedule,
+        AffineTransform,
+        Callable[[int], AffineTransform],
+        Iterable[AffineTransform],
+    ],
+    format: Optional[str] = None,
+    expand: bool = False,
+    workers: Optional[int] = None,
+    backend: str = "thread",
+    save_params: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> None:
+    """Transforms every frame of a multi-frame image with
+    :func:`transform_frames` and saves the result. The transformed frames are
+    passed to the encoder as they are completed. Thus, for formats that encode the
+    frames incrementally, e.g. WebP and TIFF, only the frames in flight are held in
+    memory at once. The frame durations and the loop count of ``image`` are kept.
+
+    Args:
+        image: Multi-frame image.
+        fp: Filename or file object.
+        schedule: Per-frame schedule of the affine transformations. See
+            :func:`make_schedule` for the supported inputs.
+        format: Optional format. Defaults to the format of ``image`` if ``fp`` is
+            a file object and is otherwise determined from the filename.
+        expand: If ``True``, expands the canvas to hold the complete transformed
+            motif. Defaults to ``False``.
+        workers: Number of workers. Defaults to the number of CPUs.
+        backend: Either ``"thread"`` or ``"process"``. Defaults to ``"thread"``.
+        save_params: Optional parameters passed to ``Image.save()``, which take
+            precedence over the kept frame durations and loop count.
+        **kwargs: Optional parameters passed to :func:`~pillow_affine.apply.apply`.
+    """
+    if format is None and not isinstance(fp, (str, os.PathLike)):
+        format = image.format
+
+    # scanned only once, since this decodes every frame of some formats
+    sizes, durations = _scan_frames(image)
+    params: Dict[str, Any] = {}
+    if all(duration is not None for duration in durations):
+        params["duration"] = durations
+    if "loop" in image.info:
+        params["loop"] = image.info["loop"]
+    if save_params is not None:
+        params.update(save_params)
+
+    frames = _transform_frames(
+        image,
+        sizes,
+        schedule,
+        expand=expand,
+        workers=workers,
+        backend=backend,
+        max_pending=None,
+        kwargs=kwargs,
+    )
+    try:
+        first_frame = next(frames)
+        first_frame.save(
+            fp, format=format, save_all=True, append_images=frames, **params
+        )
+    finally:
+        frames.close()
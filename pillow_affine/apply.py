@@ -0,0 +1,473 @@
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    wait,
+    FIRST_COMPLETED,
+)
+from itertools import islice
+from math import ceil
+import os
+from PIL import Image
+from .instrumentation import stage
+from .transforms import AffineTransform
+from .utils import (
+    AffineMatrix,
+    Box,
+    Matrix,
+    calculate_source_box,
+    offset_affine_data,
+)
+
+__all__ = ["apply", "apply_batch", "apply_many"]
+
+T = TypeVar("T")
+
+# additional source pixels needed by the resampling filters
+_FILTER_MARGINS = {Image.NEAREST: 1, Image.BILINEAR: 1, Image.BICUBIC: 2}
+
+
+def _clip_box(box: Box, size: Tuple[int, int]) -> Box:
+    width, height = size
+    left, upper, right, lower = box
+    return max(left, 0), max(upper, 0), min(right, width), min(lower, height)
+
+
+def _crop_source(
+    image: Image.Image, data: Matrix, box: Box, resample: int
+) -> Tuple[Image.Image, Matrix]:
+    margin = _FILTER_MARGINS.get(resample, 2)
+    source_box = _clip_box(calculate_source_box(data, box, margin=margin), image.size)
+    left, upper, right, lower = source_box
+    if left >= right or upper >= lower:
+        # the output does not read any pixel of the source
+        source_box = (0, 0, 1, 1)
+    elif source_box == (0, 0, *image.size) and box[:2] == (0, 0):
+        return image, data
+
+    data = offset_affine_data(data, output_offset=box[:2], input_offset=source_box[:2])
+    return image.crop(source_box), data
+
+
+# modes Image.reduce() does not support, e.g. averaging palette indices is meaningless
+_NON_REDUCIBLE_MODES = ("1", "P", "I;16", "I;16L", "I;16B", "I;16N", "BGR;15")
+
+
+def _reduce_source(
+    image: Image.Image, data: Matrix, factor: int
+) -> Tuple[Image.Image, Matrix]:
+    factor = min(factor, *image.size)
+    if factor < 2 or image.mode in _NON_REDUCIBLE_MODES:
+        return image, data
+
+    # pixel (i, j) of the reduced image covers the pixels [i * factor, (i + 1) *
+    # factor) x [j * factor, (j + 1) * factor) of the source
+    a, b, c, d, e, f = data
+    data = (a / factor, b / factor, c / factor, d / factor, e / factor, f / factor)
+    return image.reduce(factor), data
+
+
+def _snap(value: float, tolerance: float = 1e-9) -> Optional[int]:
+    integer = round(value)
+    return integer if abs(value - integer) < tolerance else None
+
+
+# Image.transform() premultiplies the alpha channel of these modes for every filter
+# except Image.NEAREST, so that the color of transparent pixels does not bleed into
+# their neighbors. Image.transpose() and Image.crop() do not, which changes the
+# result.
+_PREMULTIPLIED_MODES = ("LA", "RGBA")
+
+
+# Image.transpose() methods and their mapping of output to input pixels, i.e.
+# out(x, y) = in(L * (x, y) + t), given as linear part L and a function of the
+# input size for t
+_TRANSPOSE_MAPPINGS = (
+    (None, (1, 0, 0, 1), lambda width, height: (0, 0)),
+    (Image.FLIP_LEFT_RIGHT, (-1, 0, 0, 1), lambda width, height: (width - 1, 0)),
+    (Image.FLIP_TOP_BOTTOM, (1, 0, 0, -1), lambda width, height: (0, height - 1)),
+    (
+        Image.ROTATE_180,
+        (-1, 0, 0, -1),
+        lambda width, height: (width - 1, height - 1),
+    ),
+    (Image.ROTATE_90, (0, -1, 1, 0), lambda width, height: (width - 1, 0)),
+    (Image.ROTATE_270, (0, 1, -1, 0), lambda width, height: (0, height - 1)),
+    (Image.TRANSPOSE, (0, 1, 1, 0), lambda width, height: (0, 0)),
+    (
+        Image.TRANSVERSE,
+        (0, -1, -1, 0),
+        lambda width, height: (width - 1, height - 1),
+    ),
+)
+
+
+def _crop_with_fill(
+    image: Image.Image, box: Box, fillcolor: Optional[Any]
+) -> Image.Image:
+    if fillcolor is None or _clip_box(box, image.size) == box:
+        # Image.crop() fills the area outside of the image with zeros just as
+        # Image.transform() does without fillcolor
+        return image.crop(box)
+
+    left, upper, right, lower = box
+    cropped_image = Image.new(image.mode, (right - left, lower - upper), fillcolor)
+    if image.mode == "P":
+        cropped_image.putpalette(image.getpalette())
+    clipped_box = _clip_box(box, image.size)
+    if clipped_box[0] < clipped_box[2] and clipped_box[1] < clipped_box[3]:
+        cropped_image.paste(
+            image.crop(clipped_box), (clipped_box[0] - left, clipped_box[1] - upper)
+        )
+    return cropped_image
+
+
+def _transpose_fast_path(
+    image: Image.Image,
+    size: Tuple[int, int],
+    matrix: AffineMatrix,
+    fillcolor: Optional[Any],
+) -> Optional[Image.Image]:
+    if not matrix.is_axis_aligned:
+        return None
+
+    a, b, c, d, e, f = matrix
+    linear = tuple(_snap(param) for param in (a, b, d, e))
+    # output pixel centers have to hit input pixel centers
+    translation = (_snap(c + (a + b - 1.0) / 2.0), _snap(f + (d + e - 1.0) / 2.0))
+    if None in translation:
+        return None
+
+    for method, mapping_linear, mapping_translation in _TRANSPOSE_MAPPINGS:
+        if linear != mapping_linear:
+            continue
+
+        horz_offset, vert_offset = mapping_translation(*image.size)
+        horz_offset = translation[0] - horz_offset  # type: ignore[operator]
+        vert_offset = translation[1] - vert_offset  # type: ignore[operator]
+        # the linear part is orthogonal and thus its inverse is the transpose
+        la, lb, ld, le = mapping_linear
+        left = la * horz_offset + ld * vert_offset
+        upper = lb * horz_offset + le * vert_offset
+
+        if method is not None:
+            image = image.transpose(method)
+        box = (left, upper, left + size[0], upper + size[1])
+        return _crop_with_fill(image, box, fillcolor)
+    return None
+
+
+def _resize_fast_path(
+    image: Image.Image, size: Tuple[int, int], matrix: AffineMatrix, resample: int
+) -> Optional[Image.Image]:
+    a, b, c, d, e, f = matrix
+    # the linear part has to be diagonal with positive scaling factors
+    if not matrix.is_axis_aligned or a <= abs(b) or e <= abs(d):
+        return None
+
+    width, height = size
+    box = (c, f, c + a * width, f + e * height)
+    if box[0] < 0.0 or box[1] < 0.0 or box[2] > image.width or box[3] > image.height:
+        return None
+    return image.resize(size, resample=resample, box=box)
+
+
+def apply(
+    image: Image.Image,
+    transform: AffineTransform,
+    expand: bool = False,
+    resample: int = Image.NEAREST,
+    fillcolor: Optional[Any] = None,
+    crop_source: bool = False,
+    fast_path: bool = True,
+    resize_scales: bool = False,
+    reducing_gap: Optional[float] = None,
+) -> Image.Image:
+    """Applies an affine transformation to an image.
+
+    Args:
+        image: Image to be transformed.
+        transform: Affine transformation.
+        expand: If ``True``, expands the canvas to hold the complete
+            transformed motif. Defaults to ``False``.
+        resample: Resampling filter passed to ``Image.transform()``. Defaults to
+            ``Image.NEAREST``.
+        fillcolor: Optional color for the area outside the transformed motif.
+        crop_source: If ``True``, the image is cropped to the region that is
+            actually read by the transformation before it is warped. This speeds
+            up transformations that zoom into a small part of the image. Samples
+            that fall exactly on a pixel border might pick the neighboring pixel.
+            Defaults to ``False``.
+        fast_path: If ``True``, transformations that map pixels one-to-one, i.e.
+            the identity, integer translations, flips, and rotations by multiples
+            of 90 degrees, are performed with ``Image.crop()`` and
+            ``Image.transpose()`` instead of a resampling. The result is identical.
+            For images with an alpha channel this is only done for
+            ``Image.NEAREST``, since the other filters premultiply the alpha
+            channel. Defaults to ``True``.
+        resize_scales: If ``True``, pure axis-aligned scalings that stay within
+            the image are performed with ``Image.resize()``. For filters other than
+            ``Image.NEAREST`` the result is not identical, since ``Image.resize()``
+            antialiases, but usually of higher quality. Defaults to ``False``.
+        reducing_gap: If given, the image is first reduced with ``Image.reduce()``
+            by the largest integer factor that leaves a remaining shrinking of at
+            least ``reducing_gap`` for the transformation. Since
+            ``Image.reduce()`` averages the pixels, this strongly reduces the
+            aliasing of transformations that shrink the image. Note that this
+            adds a pass over the complete image and thus is not faster than the
+            transformation alone. Defaults to ``None``, i.e. no reduction.
+
+    Returns:
+        Transformed image.
+    """
+    size, method, data = transform.extract_transform_params(image.size, expand=expand)
+    return _warp(
+        image,
+        size,
+        method,
+        data,
+        resample=resample,
+        fillcolor=fillcolor,
+        crop_source=crop_source,
+        fast_path=fast_path,
+        resize_scales=resize_scales,
+        reducing_gap=reducing_gap,
+    )
+
+
+def apply_batch(
+    images: Sequence[Image.Image],
+    transform: AffineTransform,
+    expand: bool = False,
+    **kwargs: Any,
+) -> List[Image.Image]:
+    """Applies an affine transformation to a batch of images. The transformation
+    parameters of all images are extracted at once by
+    :meth:`~pillow_affine.transforms.AffineTransform.extract_batch_transform_params`
+    rather than one image at a time. For large batches of thumbnails and small
+    crops, where the per-image overhead is comparable to the resampling itself,
+    this is considerably faster than calling :func:`apply` in a loop. Batches of
+    less than about 32 images gain nothing. A simple call might look like::
+
+        from pillow_affine import transforms
+        from pillow_affine.apply import apply_batch
+
+        crops = [...]
+        transform = transforms.Rotate(generator.uniform(-30.0, 30.0, len(crops)))
+        transformed_crops = apply_batch(crops, transform, expand=True)
+
+    Since the matrices are composed and inverted in a vectorized manner, the
+    ``data`` parameters might differ from :func:`apply` in the last bit.
+
+    Args:
+        images: Images to be transformed. The images can have different sizes.
+        transform: Affine transformation. Transforms with array-valued
+            parameters need exactly one value per image.
+        expand: If ``True``, expands the canvas to hold the complete
+            transformed motif. Defaults to ``False``.
+        **kwargs: Optional parameters passed to :func:`apply`.
+
+    Returns:
+        Transformed images.
+    """
+    if not images:
+        return []
+
+    batch_transform_params = transform.extract_batch_transform_params(
+        [image.size for image in images], expand=expand
+    )
+    return [
+        _warp(image, *transform_params, **kwargs)
+        for image, transform_params in zip(images, batch_transform_params)
+    ]
+
+
+def _warp(
+    image: Image.Image,
+    size: Tuple[int, int],
+    method: int,
+    data: Matrix,
+    resample: int = Image.NEAREST,
+    fillcolor: Optional[Any] = None,
+    crop_source: bool = False,
+    fast_path: bool = True,
+    resize_scales: bool = False,
+    reducing_gap: Optional[float] = None,
+) -> Image.Image:
+    matrix = AffineMatrix(data)
+    if fast_path or resize_scales:
+        with stage("fast_path", size=size, mode=image.mode) as record:
+            transformed_image = None
+            if fast_path and (
+                resample == Image.NEAREST or image.mode not in _PREMULTIPLIED_MODES
+            ):
+                transformed_image = _transpose_fast_path(image, size, matrix, fillcolor)
+            if transformed_image is None and resize_scales:
+                transformed_image = _resize_fast_path(image, size, matrix, resample)
+            record.annotate(hit=transformed_image is not None)
+        if transformed_image is not None:
+            return transformed_image
+    if crop_source:
+        with stage("crop_source", size=image.size):
+            image, data = _crop_source(image, data, (0, 0, *size), resample)
+    if reducing_gap is not None:
+        # data maps output to input coordinates, so its smallest singular value is
+        # the number of input pixels per output pixel in the least shrunk direction
+        _, min_scale = matrix.singular_values
+        with stage("reduce", size=image.size):
+            image, data = _reduce_source(image, data, int(min_scale / reducing_gap))
+    with stage("warp", size=size, mode=image.mode):
+        return image.transform(
+            size, method, data, resample=resample, fillcolor=fillcolor
+        )
+
+
+def _apply_chunk(
+    images: List[Image.Image], transform: AffineTransform, kwargs: Dict[str, Any]
+) -> List[Image.Image]:
+    return [apply(image, transform, **kwargs) for image in images]
+
+
+def _default_chunksize(
+    images: Iterable[Image.Image], workers: int, backend: str
+) -> int:
+    if backend == "thread":
+        return 1
+    try:
+        num_images = len(images)  # type: ignore[arg-type]
+    except TypeError:
+        return 4
+    return max(1, min(32, ceil(num_images / (workers * 4))))
+
+
+def _create_executor(backend: str, workers: int) -> Executor:
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    elif backend == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    else:
+        msg = f"backend can be either 'thread' or 'process', but got {backend}."
+        raise RuntimeError(msg)
+
+
+def _submit_bounded(
+    executor: Executor,
+    jobs: Iterable[Tuple[Callable[..., T], Tuple[Any, ...]]],
+    ordered: bool = True,
+    max_pending: int = 1,
+) -> Generator[T, None, None]:
+    # Submits the jobs lazily and yields their results. At most max_pending jobs
+    # are in flight at once. Jobs that are not finished if the generator is closed
+    # are cancelled.
+    futures: Deque["Future[T]"] = deque()
+    pending: Set["Future[T]"] = set()
+    try:
+        for func, args in jobs:
+            future = executor.submit(func, *args)
+            if ordered:
+                futures.append(future)
+                if len(futures) >= max_pending:
+                    yield futures.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+        while futures:
+            yield futures.popleft().result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in (*futures, *pending):
+            future.cancel()
+
+
+def apply_many(
+    images: Iterable[Image.Image],
+    transform: AffineTransform,
+    workers: Optional[int] = None,
+    backend: str = "thread",
+    ordered: bool = True,
+    chunksize: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    **kwargs: Any,
+) -> Iterator[Image.Image]:
+    """Applies an affine transformation to many images in parallel. The images are
+    consumed lazily and the results are streamed back, so that neither has to fit
+    into memory at once. A simple call might look like::
+
+        from PIL import Image
+        from pillow_affine import transforms
+        from pillow_affine.apply import apply_many
+
+        images = (Image.open(file) for file in files)
+        transform = transforms.Rotate(30.0)
+
+        for transformed_image in apply_many(images, transform, workers=8):
+            ...
+
+    Args:
+        images: Images to be transformed.
+        transform: Affine transformation.
+        workers: Number of workers. Defaults to the number of CPUs.
+        backend: Either ``"thread"`` or ``"process"``. Since ``Pillow`` releases
+            the GIL while resampling, threads usually scale well and avoid the
+            cost of pickling the images. Defaults to ``"thread"``.
+        ordered: If ``True``, the results are yielded in the order of the
+            input. Otherwise, they are yielded as they are completed. Defaults to
+            ``True``.
+        chunksize: Number of images processed by a worker at once. Defaults to
+            ``1`` for threads and is derived from the number of images and
+            workers for processes.
+        max_pending: Maximum number of chunks in flight. If reached, no further
+            images are consumed until a chunk is completed. Defaults to twice the
+            number of workers.
+        **kwargs: Optional parameters passed to :func:`apply`.
+
+    Returns:
+        Iterator of the transformed images.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = _default_chunksize(images, workers, backend)
+    if max_pending is None:
+        max_pending = 2 * workers
+
+    iterator = iter(images)
+    chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+
+    executor = _create_executor(backend, workers)
+    results = _submit_bounded(
+        executor,
+        ((_apply_chunk, (chunk, transform, kwargs)) for chunk in chunks),
+        ordered=ordered,
+        max_pending=max_pending,
+    )
+    try:
+        for transformed_images in results:
+            yield from transformed_images
+    finally:
+        results.close()
+        executor.shutdown(wait=True)
@@ -0,0 +1,108 @@
+from typing import Optional, Union
+import numpy as np
+from PIL import Image
+from .sampling import Fill, _gather, compute_sampling_map
+from .transforms import AffineTransform, Size
+from .utils import Matrix, Matrices
+
+__all__ = ["warp_array", "transform_array"]
+
+
+def warp_array(
+    array: np.ndarray,
+    data: Union[Matrix, Matrices],
+    size: Optional[Size] = None,
+    resample: int = Image.NEAREST,
+    fill: Fill = 0,
+) -> np.ndarray:
+    """Applies the ``data`` parameters of an affine transformation, as returned by
+    :meth:`~pillow_affine.transforms.AffineTransform.extract_transform_params`, to an
+    array without a round-trip through ``Pillow``.
+
+    The arithmetic of ``Image.transform()`` is reproduced, so that the results for
+    integer images are identical. Floating point images might differ in the last
+    bit. In contrast to ``Pillow``, images with an alpha channel are not
+    premultiplied before a bilinear interpolation.
+
+    Args:
+        array: Image(s) of shape (H, W), (H, W, C), or (N, H, W, C) with arbitrary
+            dtype.
+        data: Parameters of shape (6,) or (N, 6) for a batch of images.
+        size: Optional output size (width, height). Defaults to the input size.
+        resample: Either ``Image.NEAREST`` or ``Image.BILINEAR``. Defaults to
+            ``Image.NEAREST``.
+        fill: Value for the area outside the transformed motif. Can also be given
+            per channel. Defaults to ``0``.
+
+    .. note::
+        For repeated warps with the same parameters and image size, the
+        coordinate arithmetic can be skipped by caching the sampling maps with
+        :class:`~pillow_affine.sampling.SamplingMapCache`.
+
+    Returns:
+        Transformed image(s) with the same number of dimensions and dtype as the
+        input.
+    """
+    array = np.asarray(array)
+    if array.ndim == 2:
+        return warp_array(array[..., None], data, size, resample, fill)[..., 0]
+    if array.ndim not in (3, 4):
+        msg = f"Expected array with 2 to 4 dimensions, but got {array.ndim}."
+        raise RuntimeError(msg)
+
+    height, width = array.shape[-3:-1]
+    input_size = (width, height)
+    if size is None:
+        size = input_size
+    fill = np.asarray(fill, dtype=array.dtype)
+
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim == 1:
+        sampling_map = compute_sampling_map(data, size, input_size, resample)
+        return _gather(array, sampling_map, fill)
+
+    if array.ndim != 4 or len(array) != len(data):
+        msg = "A batch of parameters requires a batch of images of the same size."
+        raise RuntimeError(msg)
+    return np.stack(
+        [
+            _gather(
+                image, compute_sampling_map(params, size, input_size, resample), fill
+            )
+            for image, params in zip(array, data)
+        ]
+    )
+
+
+def transform_array(
+    array: np.ndarray,
+    transform: AffineTransform,
+    expand: bool = False,
+    resample: int = Image.NEAREST,
+    fill: Fill = 0,
+) -> np.ndarray:
+    """Applies an affine transformation to an array. See :func:`warp_array` for
+    details.
+
+    Args:
+        array: Image(s) of shape (H, W), (H, W, C), or (N, H, W, C) with arbitrary
+            dtype.
+        transform: Affine transformation. For a batch of images the same
+            transformation is applied to every image.
+        expand: If ``True``, expands the canvas to hold the complete
+            transformed motif. Defaults to ``False``.
+        resample: Either ``Image.NEAREST`` or ``Image.BILINEAR``. Defaults to
+            ``Image.NEAREST``.
+        fill: Value for the area outside the transformed motif. Can also be given
+            per channel. Defaults to ``0``.
+
+    Returns:
+        Transformed image(s).
+    """
+    array = np.asarray(array)
+    if array.ndim == 2:
+        height, width = array.shape
+    else:
+        height, width = array.shape[-3:-1]
+    size, _, data = transform.extract_transform_params((width, height), expand=expand)
+    return warp_array(array, data, size=size, resample=resample, fill=fill)
@@ -0,0 +1,319 @@
+from typing import List, Optional, Sequence, Tuple, Union
+from abc import ABC, abstractmethod
+import numpy as np
+from PIL import Image
+from .matrix import (
+    rotation_matrix,
+    scaling_matrix,
+    shearing_matrix,
+    translation_matrix,
+)
+from .transforms import AffineTransform, Size, Sizes
+from .utils import Coordinate, Matrix, Matrices, batch_left_matmuls
+
+__all__ = [
+    "make_generator",
+    "RandomTransform",
+    "RandomShear",
+    "RandomRotate",
+    "RandomScale",
+    "RandomTranslate",
+    "RandomAffine",
+]
+
+Range = Union[float, Tuple[float, float]]
+
+
+def make_generator(
+    seed: Optional[int] = None, worker_id: Optional[int] = None
+) -> np.random.Generator:
+    """Creates a random number generator. Generators created with the same ``seed``
+    but different ``worker_id`` s produce independent streams, which makes runs
+    with multiple workers reproducible.
+
+    Args:
+        seed: Optional seed. If omitted, fresh entropy is pulled from the OS.
+        worker_id: Optional index of the worker.
+
+    Returns:
+        Random number generator.
+    """
+    spawn_key = () if worker_id is None else (worker_id,)
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+
+
+def _parse_range(value: Range) -> Tuple[float, float]:
+    if isinstance(value, (tuple, list)):
+        low, high = value
+        return float(low), float(high)
+    return -float(value), float(value)
+
+
+class RandomTransform(ABC):
+    """ABC for all random affine transformations. Rather than creating one
+    :class:`~pillow_affine.transforms.AffineTransform` per image, the parameters
+    for a whole batch of images are sampled at once. A simple call might look
+    like::
+
+        from PIL import Image
+        from pillow_affine import augmentation
+
+        images = [Image.open(...), ...]
+        transform = augmentation.RandomRotate(30.0)
+        generator = augmentation.make_generator(seed=0)
+
+        sizes = [image.size for image in images]
+        batch_transform_params = transform.extract_batch_transform_params(
+            sizes, generator
+        )
+        transformed_images = [
+            image.transform(*transform_params)
+            for image, transform_params in zip(images, batch_transform_params)
+        ]
+    """
+
+    @abstractmethod
+    def _sample_matrices(
+        self, sizes: np.ndarray, generator: np.random.Generator
+    ) -> Matrices:
+        pass
+
+    def sample_matrices(
+        self, sizes: Sizes, generator: Optional[np.random.Generator] = None
+    ) -> Matrices:
+        """Samples the transformation matrices of a batch of images.
+
+        Args:
+            sizes: Image sizes (width, height) of shape (N, 2).
+            generator: Optional random number generator. If omitted, a
+                generator is created with :func:`make_generator`.
+
+        Returns:
+            Transformation matrices of shape (N, 6).
+        """
+        if generator is None:
+            generator = make_generator()
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+        return self._sample_matrices(sizes, generator)
+
+    def extract_batch_transform_params(
+        self,
+        sizes: Sizes,
+        generator: Optional[np.random.Generator] = None,
+        expand: bool = False,
+    ) -> List[Tuple[Size, int, Matrix]]:
+        """Samples a transformation for each image of a batch and extracts the
+        parameters that need to be passed to ``Image.transform()``.
+
+        Args:
+            sizes: Image sizes (width, height) of shape (N, 2).
+            generator: Optional random number generator. If omitted, a
+                generator is created with :func:`make_generator`.
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+
+        Returns:
+            ``size``, ``method``, and ``data`` parameters for each of the :math:`N`
+            images.
+        """
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+        transform_matrices = self.sample_matrices(sizes, generator)
+        expanded_sizes, data = AffineTransform._extract_batch_affine_data(
+            sizes, transform_matrices, expand=expand
+        )
+        return [
+            ((int(width), int(height)), Image.AFFINE, tuple(params.tolist()))
+            for (width, height), params in zip(expanded_sizes, data)
+        ]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._extra_repr()})"
+
+    def _extra_repr(self) -> str:
+        return ""
+
+
+class RandomShear(RandomTransform):
+    """Random affine horizontal shearing transformation.
+
+    Args:
+        angle: Range of the shearing angle in degrees. If scalar, the range is
+            (-``angle``, ``angle``).
+        clockwise: If ``True``, the shearing will be performed clockwise.
+            Defaults to ``False``.
+        center: Optional center of the shearing. Defaults to the center of
+            the image.
+    """
+
+    def __init__(
+        self,
+        angle: Range,
+        clockwise: bool = False,
+        center: Optional[Coordinate] = None,
+    ) -> None:
+        self.angle = _parse_range(angle)
+        self.clockwise = clockwise
+        self.center = center
+
+    def _sample_matrices(
+        self, sizes: np.ndarray, generator: np.random.Generator
+    ) -> Matrices:
+        angles = generator.uniform(*self.angle, size=len(sizes))
+        matrices = shearing_matrix(angles, clockwise=self.clockwise)
+        return AffineTransform._batch_off_center_transform(sizes, self.center, matrices)
+
+    def _extra_repr(self) -> str:
+        extras = [f"({self.angle[0]:.1f}°, {self.angle[1]:.1f}°)"]
+        if self.clockwise:
+            extras.append(f"clockwise={self.clockwise}")
+        if self.center is not None:
+            extras.append(f"center={self.center}")
+        return ", ".join(extras)
+
+
+class RandomRotate(RandomTransform):
+    """Random affine rotation transformation.
+
+    Args:
+        angle: Range of the rotation angle in degrees. If scalar, the range is
+            (-``angle``, ``angle``).
+        clockwise: If ``True``, the rotation will be performed clockwise.
+            Defaults to ``False``.
+        center: Optional center of the rotation. Defaults to the center of the
+            image.
+    """
+
+    def __init__(
+        self,
+        angle: Range,
+        clockwise: bool = False,
+        center: Optional[Coordinate] = None,
+    ) -> None:
+        self.angle = _parse_range(angle)
+        self.clockwise = clockwise
+        self.center = center
+
+    def _sample_matrices(
+        self, sizes: np.ndarray, generator: np.random.Generator
+    ) -> Matrices:
+        angles = generator.uniform(*self.angle, size=len(sizes))
+        matrices = rotation_matrix(angles, clockwise=self.clockwise)
+        return AffineTransform._batch_off_center_transform(sizes, self.center, matrices)
+
+    def _extra_repr(self) -> str:
+        extras = [f"({self.angle[0]:.1f}°, {self.angle[1]:.1f}°)"]
+        if self.clockwise:
+            extras.append(f"clockwise={self.clockwise}")
+        if self.center is not None:
+            extras.append(f"center={self.center}")
+        return ", ".join(extras)
+
+
+class RandomScale(RandomTransform):
+    """Random affine scaling transformation.
+
+    Args:
+        factor: Range of the scaling factor.
+        anisotropic: If ``True``, the horizontal and vertical scaling factors are
+            sampled independently. Defaults to ``False``.
+        center: Optional center of the scaling. Defaults to the center of
+            the image.
+    """
+
+    def __init__(
+        self,
+        factor: Tuple[float, float],
+        anisotropic: bool = False,
+        center: Optional[Coordinate] = None,
+    ) -> None:
+        low, high = factor
+        self.factor = (float(low), float(high))
+        self.anisotropic = anisotropic
+        self.center = center
+
+    def _sample_matrices(
+        self, sizes: np.ndarray, generator: np.random.Generator
+    ) -> Matrices:
+        if self.anisotropic:
+            factors = generator.uniform(*self.factor, size=(2, len(sizes))).T
+        else:
+            factors = generator.uniform(*self.factor, size=len(sizes))
+        matrices = scaling_matrix(factors)
+        return AffineTransform._batch_off_center_transform(sizes, self.center, matrices)
+
+    def _extra_repr(self) -> str:
+        extras = [f"({self.factor[0]:.2f}, {self.factor[1]:.2f})"]
+        if self.anisotropic:
+            extras.append(f"anisotropic={self.anisotropic}")
+        if self.center is not None:
+            extras.append(f"center={self.center}")
+        return ", ".join(extras)
+
+
+class RandomTranslate(RandomTransform):
+    """Random affine translation transformation.
+
+    Args:
+        translation: Maximum absolute horizontal and vertical translation. Both
+            directions are sampled independently from the range
+            (-``translation``, ``translation``).
+    """
+
+    def __init__(self, translation: Coordinate) -> None:
+        horz_translation, vert_translation = translation
+        self.translation = (float(horz_translation), float(vert_translation))
+
+    def _sample_matrices(
+        self, sizes: np.ndarray, generator: np.random.Generator
+    ) -> Matrices:
+        max_translation = np.asarray(self.translation)
+        translations = generator.uniform(
+            -max_translation, max_translation, size=(len(sizes), 2)
+        )
+        return translation_matrix(translations)
+
+    def _extra_repr(self) -> str:
+        return f"{tuple([round(coord, 1) for coord in self.translation])}"
+
+
+class RandomAffine(RandomTransform):
+    """Random affine transformation combining a random shearing, rotation, scaling,
+    and translation, which are applied in this order.
+
+    Args:
+        shear: Range of the shearing angle in degrees. Defaults to ``0.0``.
+        angle: Range of the rotation angle in degrees. Defaults to ``0.0``.
+        factor: Range of the scaling factor. Defaults to ``(1.0, 1.0)``.
+        translation: Maximum absolute horizontal and vertical translation.
+            Defaults to ``(0.0, 0.0)``.
+        center: Optional center of the shearing, rotation, and scaling.
+            Defaults to the center of the image.
+    """
+
+    def __init__(
+        self,
+        shear: Range = 0.0,
+        angle: Range = 0.0,
+        factor: Tuple[float, float] = (1.0, 1.0),
+        translation: Coordinate = (0.0, 0.0),
+        center: Optional[Coordinate] = None,
+    ) -> None:
+        self.transforms: Sequence[RandomTransform] = (
+            RandomShear(shear, center=center),
+            RandomRotate(angle, center=center),
+            RandomScale(factor, center=center),
+            RandomTranslate(translation),
+        )
+
+    def _sample_matrices(
+        self, sizes: np.ndarray, generator: np.random.Generator
+    ) -> Matrices:
+        return batch_left_matmuls(
+            *[
+                transform._sample_matrices(sizes, generator)
+                for transform in self.transforms
+            ]
+        )
+
+    def _extra_repr(self) -> str:
+        return ", ".join([repr(transform) for transform in self.transforms])
@@ -0,0 +1,112 @@
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+from collections import OrderedDict
+from threading import Lock
+
+__all__ = ["CacheInfo", "LRUCache"]
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    currbytes: int = 0
+
+
+class LRUCache:
+    """Thread-safe, bounded cache that evicts the least recently used entry first.
+
+    Args:
+        maxsize: Maximum number of entries. Defaults to ``128``.
+        maxbytes: Optional maximum of the summed sizes of the entries as reported
+            to :meth:`put`. Entries larger than the limit are not stored at all.
+    """
+
+    def __init__(self, maxsize: int = 128, maxbytes: Optional[int] = None) -> None:
+        if maxsize < 1:
+            raise RuntimeError("The maximum size of a cache has to be positive.")
+        if maxbytes is not None and maxbytes < 0:
+            raise RuntimeError("The maximum bytes of a cache cannot be negative.")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._nbytes: Dict[Hashable, int] = {}
+        self._currbytes = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Looks up an entry and marks it as most recently used.
+
+        Args:
+            key: Key of the entry.
+            default: Value returned if ``key`` is not cached. Defaults to ``None``.
+
+        Returns:
+            Cached value or ``default``.
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, nbytes: int = 0) -> None:
+        """Stores an entry and evicts the least recently used ones until the cache
+        is within its limits.
+
+        Args:
+            key: Key of the entry.
+            value: Value of the entry.
+            nbytes: Size of the entry in bytes. Only relevant if the cache was
+                created with ``maxbytes``. Defaults to ``0``.
+        """
+        with self._lock:
+            self._discard(key)
+            if self.maxbytes is not None and nbytes > self.maxbytes:
+                return
+
+            self._entries[key] = value
+            self._nbytes[key] = nbytes
+            self._currbytes += nbytes
+            while len(self._entries) > self.maxsize or (
+                self.maxbytes is not None and self._currbytes > self.maxbytes
+            ):
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Hashable) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            self._currbytes -= self._nbytes.pop(key)
+
+    def clear(self) -> None:
+        """Removes all entries. The statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes.clear()
+            self._currbytes = 0
+
+    def info(self) -> CacheInfo:
+        """Reports the statistics of the cache.
+
+        Returns:
+            Number of hits and misses, maximum and current size, and the summed
+            size of the entries in bytes.
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self.maxsize,
+                len(self._entries),
+                self._currbytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
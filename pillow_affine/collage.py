@@ -0,0 +1,192 @@
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+from math import ceil, floor
+from PIL import Image
+from .apply import _create_executor, _submit_bounded, _warp
+from .instrumentation import stage
+from .matrix import translation_matrix
+from .transforms import AffineTransform, Size
+from .utils import (
+    Box,
+    Coordinate,
+    Matrix,
+    left_matmuls,
+    matinv,
+    offset_affine_data,
+    transform_coordinate,
+)
+
+__all__ = ["Patch", "calculate_patch_box", "composite_patches"]
+
+
+class Patch(NamedTuple):
+    """Image that is placed onto a canvas by an affine transformation.
+
+    Args:
+        image: Image of the patch. Images without alpha channel are opaque.
+        transform: Affine transformation. As for a single image, it is performed
+            around the center of the patch.
+        offset: Position (left, upper) of the patch on the canvas before it is
+            transformed. Defaults to ``(0.0, 0.0)``.
+    """
+
+    image: Image.Image
+    transform: AffineTransform
+    offset: Coordinate = (0.0, 0.0)
+
+
+PatchLike = Union[
+    Patch,
+    Tuple[Image.Image, AffineTransform],
+    Tuple[Image.Image, AffineTransform, Coordinate],
+]
+
+
+def _as_patch(patch: PatchLike) -> Patch:
+    if isinstance(patch, Patch):
+        return patch
+    return Patch(*patch)
+
+
+def _canvas_matrix(patch: Patch) -> Matrix:
+    # maps the pixel coordinates of the patch onto the pixel coordinates of the
+    # canvas. The motif is not expanded to keep the translation of the transform.
+    _, transform_matrix = patch.transform._extract_transform_matrix(
+        patch.image.size, expand=False
+    )
+    return left_matmuls(transform_matrix, translation_matrix(patch.offset))
+
+
+def _calculate_box(patch: Patch, matrix: Matrix, canvas_size: Size) -> Box:
+    width, height = patch.image.size
+    vertices = [
+        transform_coordinate(coordinate, matrix)
+        for coordinate in ((0.0, 0.0), (width, 0.0), (0.0, height), (width, height))
+    ]
+    xs, ys = zip(*vertices)
+    canvas_width, canvas_height = canvas_size
+    return (
+        max(floor(min(xs)), 0),
+        max(floor(min(ys)), 0),
+        min(ceil(max(xs)), canvas_width),
+        min(ceil(max(ys)), canvas_height),
+    )
+
+
+def calculate_patch_box(patch: PatchLike, canvas_size: Size) -> Optional[Box]:
+    """Calculates the region of the canvas that is covered by a transformed patch.
+
+    Args:
+        patch: Patch or tuple of its parameters.
+        canvas_size: Canvas size (width, height).
+
+    Returns:
+        Region (left, upper, right, lower) of the canvas or ``None`` if the patch
+        is placed completely outside of the canvas.
+    """
+    patch = _as_patch(patch)
+    box = _calculate_box(patch, _canvas_matrix(patch), canvas_size)
+    left, upper, right, lower = box
+    return box if left < right and upper < lower else None
+
+
+def _render_patch(
+    patch: Patch, canvas_size: Size, resample: int, kwargs: Dict[str, Any]
+) -> Optional[Tuple[Box, Image.Image]]:
+    matrix = _canvas_matrix(patch)
+    box = _calculate_box(patch, matrix, canvas_size)
+    left, upper, right, lower = box
+    if left >= right or upper >= lower:
+        return None
+
+    image = patch.image
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    data = offset_affine_data(matinv(matrix), output_offset=(left, upper))
+    # the area outside of the motif is transparent and thus leaves the canvas as is
+    warped_image = _warp(
+        image,
+        (right - left, lower - upper),
+        Image.AFFINE,
+        data,
+        resample=resample,
+        fillcolor=None,
+        **kwargs,
+    )
+    return box, warped_image
+
+
+def composite_patches(
+    canvas: Image.Image,
+    patches: Iterable[PatchLike],
+    resample: int = Image.NEAREST,
+    workers: int = 1,
+    max_pending: Optional[int] = None,
+    **kwargs: Any,
+) -> Image.Image:
+    """Transforms patches and alpha composites them onto a canvas in place. Every
+    patch is only warped into the bounding box of its transformed motif and the
+    parts outside of the canvas are skipped. Thus, time and memory scale with the
+    area of the patches rather than with the area of the canvas. A simple call
+    might look like::
+
+        from PIL import Image
+        from pillow_affine import transforms
+        from pillow_affine.collage import composite_patches
+
+        canvas = Image.new("RGBA", (4096, 4096))
+        patches = [
+            (Image.open(...), transforms.Rotate(30.0), (100.0, 200.0)),
+            (Image.open(...), transforms.Scale(0.5), (1500.0, 300.0)),
+        ]
+        composite_patches(canvas, patches, resample=Image.BILINEAR, workers=4)
+
+    The patches are warped in parallel, but composited one after another in the
+    given order, so that later patches cover earlier ones.
+
+    Args:
+        canvas: Canvas in ``"RGBA"`` or ``"RGB"`` mode. It is modified in place.
+        patches: Patches or tuples of their parameters, i.e. the image, the
+            affine transformation, and optionally the offset. They are consumed
+            lazily.
+        resample: Resampling filter passed to ``Image.transform()``. Defaults to
+            ``Image.NEAREST``.
+        workers: Number of threads warping patches in parallel. Defaults to ``1``.
+        max_pending: Maximum number of warped patches waiting to be composited.
+            Defaults to twice the number of workers.
+        **kwargs: Optional parameters passed to
+            :func:`~pillow_affine.apply.apply` except for ``fillcolor``, e.g.
+            ``crop_source`` or ``reducing_gap``.
+
+    Returns:
+        Canvas.
+    """
+    if canvas.mode not in ("RGBA", "RGB"):
+        msg = f"The canvas has to be in RGBA or RGB mode, but got {canvas.mode}."
+        raise RuntimeError(msg)
+    if "fillcolor" in kwargs:
+        msg = "The area outside of the patches is always transparent."
+        raise RuntimeError(msg)
+    if max_pending is None:
+        max_pending = 2 * workers
+
+    jobs = (
+        (_render_patch, (_as_patch(patch), canvas.size, resample, kwargs))
+        for patch in patches
+    )
+    executor = _create_executor("thread", workers)
+    results = _submit_bounded(executor, jobs, ordered=True, max_pending=max_pending)
+    try:
+        for result in results:
+            if result is None:
+                continue
+
+            box, warped_image = result
+            with stage("composite", size=warped_image.size):
+                if canvas.mode == "RGBA":
+                    canvas.alpha_composite(warped_image, dest=box[:2])
+                else:
+                    canvas.paste(warped_image, box[:2], mask=warped_image)
+    finally:
+        results.close()
+        executor.shutdown(wait=True)
+    return canvas
@@ -0,0 +1,248 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from types import TracebackType
+
+__all__ = [
+    "Event",
+    "StageStatistics",
+    "Collector",
+    "add_callback",
+    "remove_callback",
+    "collect",
+    "stage",
+]
+
+
+class Event(NamedTuple):
+    """Measurement of a single stage.
+
+    Args:
+        stage: Name of the stage, e.g. ``"create_matrix"`` or ``"warp"``.
+        duration: Wall time in seconds.
+        info: Additional information about the stage, e.g. the image size.
+    """
+
+    stage: str
+    duration: float
+    info: Dict[str, Any]
+
+
+Callback = Callable[[Event], None]
+
+# replaced rather than mutated, so that it can be read without a lock
+_callbacks: Tuple[Callback, ...] = ()
+_callbacks_lock = Lock()
+
+
+def add_callback(callback: Callback) -> None:
+    """Registers a callback that is invoked with an :class:`Event` after each
+    instrumented stage. The callback is invoked in the thread that executed the
+    stage.
+
+    Args:
+        callback: Callback.
+    """
+    global _callbacks
+    with _callbacks_lock:
+        _callbacks = (*_callbacks, callback)
+
+
+def remove_callback(callback: Callback) -> None:
+    """Unregisters a callback previously registered with :func:`add_callback`.
+
+    Args:
+        callback: Callback.
+    """
+    global _callbacks
+    with _callbacks_lock:
+        callbacks = list(_callbacks)
+        callbacks.remove(callback)
+        _callbacks = tuple(callbacks)
+
+
+class _Stage:
+    enabled = True
+
+    def __init__(self, name: str, info: Dict[str, Any]) -> None:
+        self.name = name
+        self.info = info
+        self._start = 0.0
+
+    def annotate(self, **info: Any) -> None:
+        self.info.update(info)
+
+    def __enter__(self) -> "_Stage":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        event = Event(self.name, perf_counter() - self._start, self.info)
+        for callback in _callbacks:
+            callback(event)
+
+
+class _DisabledStage:
+    enabled = False
+
+    def annotate(self, **info: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_DisabledStage":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        pass
+
+
+_DISABLED_STAGE = _DisabledStage()
+
+
+def stage(name: str, **info: Any) -> Union[_Stage, _DisabledStage]:
+    """Context manager measuring the wall time of a stage. If no callback is
+    registered, a shared no-op object is returned and nothing is measured.
+    Additional information that is only available at the end of the stage can be
+    added with ``annotate()``::
+
+        with stage("expand_canvas", size=size) as record:
+            expanded_size = ...
+            record.annotate(expanded_size=expanded_size)
+
+    Information that is expensive to compute should only be gathered if
+    ``record.enabled`` is ``True``.
+
+    Args:
+        name: Name of the stage.
+        **info: Additional information about the stage.
+    """
+    if not _callbacks:
+        return _DISABLED_STAGE
+    return _Stage(name, info)
+
+
+class StageStatistics(NamedTuple):
+    calls: int
+    total: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls
+
+
+class Collector:
+    """Callback that aggregates the events of all stages.
+
+    Args:
+        keep_events: If ``True``, all events are stored in :attr:`events`.
+            Defaults to ``True``.
+    """
+
+    def __init__(self, keep_events: bool = True) -> None:
+        self.keep_events = keep_events
+        self.events: List[Event] = []
+        self.max_area_growth = 1.0
+        self._statistics: Dict[str, StageStatistics] = {}
+        self._lock = Lock()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            if self.keep_events:
+                self.events.append(event)
+
+            calls, total, max_duration = self._statistics.get(
+                event.stage, (0, 0.0, 0.0)
+            )
+            self._statistics[event.stage] = StageStatistics(
+                calls + 1, total + event.duration, max(max_duration, event.duration)
+            )
+            self.max_area_growth = max(
+                self.max_area_growth, event.info.get("area_growth", 1.0)
+            )
+
+    @property
+    def statistics(self) -> Dict[str, StageStatistics]:
+        """Number of calls, total, and maximum duration per stage."""
+        with self._lock:
+            return self._statistics.copy()
+
+    def summary(self) -> str:
+        """Formats the :attr:`statistics` as a table.
+
+        Returns:
+            Summary.
+        """
+        lines = [f"{'stage':<28} {'calls':>8} {'total':>12} {'mean':>12} {'max':>12}"]
+        for name, statistics in sorted(
+            self.statistics.items(), key=lambda item: item[1].total, reverse=True
+        ):
+            lines.append(
+                f"{name:<28} {statistics.calls:>8d} "
+                f"{statistics.total * 1e3:>9.3f} ms "
+                f"{statistics.mean * 1e3:>9.3f} ms "
+                f"{statistics.max * 1e3:>9.3f} ms"
+            )
+        lines.append(f"maximum canvas area growth: {self.max_area_growth:.2f}x")
+        return "\n".join(lines)
+
+
+@contextmanager
+def collect(keep_events: bool = True) -> Iterator[Collector]:
+    """Collects the events of all instrumented stages within the context. A
+    simple call might look like::
+
+        from pillow_affine import instrumentation
+
+        with instrumentation.collect() as collector:
+            ...
+
+        print(collector.summary())
+
+    The instrumented stages are
+
+    - ``"create_matrix"``, ``"expand_canvas"``,
+      ``"coordinate_system_transform"``, and ``"matinv"`` of
+      :meth:`~pillow_affine.transforms.AffineTransform.extract_transform_params`
+      and its batched version. The ``"expand_canvas"`` events report the
+      ``area_growth`` of the canvas.
+    - ``"fast_path"``, ``"crop_source"``, ``"reduce"``, and ``"warp"`` of
+      :func:`~pillow_affine.apply.apply` and
+      :func:`~pillow_affine.tiling.iter_tiles`. The ``"fast_path"`` and
+      ``"warp"`` events report the ``size`` and ``mode`` of the image. The
+      ``"fast_path"`` events additionally report whether it was a ``hit``.
+
+    Args:
+        keep_events: If ``True``, all events are stored in
+            :attr:`Collector.events`. Defaults to ``True``.
+
+    Returns:
+        Context manager yielding the :class:`Collector`.
+    """
+    collector = Collector(keep_events=keep_events)
+    add_callback(collector)
+    try:
+        yield collector
+    finally:
+        remove_callback(collector)
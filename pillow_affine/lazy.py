@@ -0,0 +1,161 @@
+from typing import Any, Optional, Tuple
+from threading import Lock
+from PIL import Image
+from .apply import _warp
+from .transforms import AffineTransform, Size
+from .utils import Matrix, left_matmuls, matinv
+
+__all__ = ["LazyImage"]
+
+
+class LazyImage:
+    """Image wrapper that records affine transformations instead of performing
+    them. The pixel-space matrices of all pending transformations are composed and
+    the source is resampled only once when the pixels are requested by
+    :meth:`load`, :meth:`save`, or :meth:`tobytes`. A simple call might look
+    like::
+
+        from PIL import Image
+        from pillow_affine import transforms
+        from pillow_affine.lazy import LazyImage
+
+        image = LazyImage(Image.open(...), resample=Image.BILINEAR)
+        image = image.transform(transforms.Rotate(30.0), expand=True)
+        image = image.transform(transforms.Scale(0.5))
+        image.save(...)
+
+    In contrast to performing the transformations one after another, the
+    intermediate canvases do not clip the motif. Thus, parts of the source that
+    are moved out of the canvas by one transformation and back in by another are
+    preserved rather than replaced by the fill color.
+
+    Args:
+        image: Source image.
+        resample: Resampling filter passed to ``Image.transform()``. Defaults to
+            ``Image.NEAREST``.
+        fillcolor: Optional color for the area outside the transformed motif.
+        **kwargs: Optional parameters passed to :func:`~pillow_affine.apply.apply`,
+            e.g. ``reducing_gap``.
+    """
+
+    def __init__(
+        self,
+        image: Image.Image,
+        resample: int = Image.NEAREST,
+        fillcolor: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> None:
+        self.source = image
+        self.resample = resample
+        self.fillcolor = fillcolor
+        self._kwargs = kwargs
+
+        self._size: Size = image.size
+        self._matrix: Matrix = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+        self._num_transforms = 0
+        self._image: Optional[Image.Image] = None
+        self._lock = Lock()
+
+    @property
+    def size(self) -> Size:
+        """Size (width, height) of the transformed image."""
+        return self._size
+
+    @property
+    def width(self) -> int:
+        return self._size[0]
+
+    @property
+    def height(self) -> int:
+        return self._size[1]
+
+    @property
+    def mode(self) -> str:
+        return self.source.mode
+
+    @property
+    def matrix(self) -> Matrix:
+        """Composed matrix of all pending transformations that maps pixel
+        coordinates of the source onto pixel coordinates of the transformed
+        image."""
+        return self._matrix
+
+    @property
+    def is_loaded(self) -> bool:
+        """``True`` if the pixels of the transformed image were already
+        computed."""
+        return self._image is not None
+
+    def extract_transform_params(self) -> Tuple[Size, int, Matrix]:
+        """Extracts the transformation parameters for ``Image.transform()`` of the
+        composed transformation.
+
+        Returns:
+            ``size``, ``method``, and ``data`` parameters.
+        """
+        return self._size, Image.AFFINE, matinv(self._matrix)
+
+    def transform(
+        self, transform: AffineTransform, expand: bool = False
+    ) -> "LazyImage":
+        """Records an affine transformation. The center of the transformation and
+        the expanded canvas are determined from the size of the transformed image
+        so far, exactly as if the transformations were performed one after
+        another.
+
+        Args:
+            transform: Affine transformation.
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+
+        Returns:
+            New lazy image. The current one is not modified.
+        """
+        size, matrix = transform._extract_transform_matrix(self._size, expand=expand)
+
+        image = LazyImage(
+            self.source,
+            resample=self.resample,
+            fillcolor=self.fillcolor,
+            **self._kwargs,
+        )
+        image._size = size
+        image._matrix = left_matmuls(self._matrix, matrix)
+        image._num_transforms = self._num_transforms + 1
+        return image
+
+    def load(self) -> Image.Image:
+        """Resamples the source once with the composed transformation. The result
+        is cached.
+
+        Returns:
+            Transformed image.
+        """
+        with self._lock:
+            if self._image is None:
+                if self._num_transforms == 0:
+                    self._image = self.source.copy()
+                else:
+                    self._image = _warp(
+                        self.source,
+                        *self.extract_transform_params(),
+                        resample=self.resample,
+                        fillcolor=self.fillcolor,
+                        **self._kwargs,
+                    )
+            return self._image
+
+    def save(self, fp: Any, format: Optional[str] = None, **params: Any) -> None:
+        """Saves the transformed image. See ``Image.save()`` for details."""
+        self.load().save(fp, format=format, **params)
+
+    def tobytes(self, *args: Any) -> bytes:
+        """Returns the transformed image as bytes. See ``Image.tobytes()`` for
+        details."""
+        return self.load().tobytes(*args)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(mode={self.mode}, size={self._size}, "
+            f"pending={0 if self.is_loaded else self._num_transforms})"
+        )
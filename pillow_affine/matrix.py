@@ -1,6 +1,7 @@
-from typing import Union, Tuple
-from math import cos, sin
-from .utils import Coordinate, Matrix, deg2rad
+from typing import Any, Union, Tuple, overload
+from math import cos, sin, pi
+import numpy as np
+from .utils import Coordinate, Matrix, Matrices, deg2rad
 
 __all__ = [
     "shearing_matrix",
@@ -10,7 +11,67 @@ __all__ = [
 ]
 
 
-def shearing_matrix(angle: float, clockwise: bool = False) -> Matrix:
+def _cos_sin(angle: float, clockwise: bool) -> Tuple[float, float]:
+    angle %= 360.0
+    if angle % 90.0 == 0.0:
+        # avoid round-off errors such as cos(pi / 2) = 6e-17
+        cos_angle, sin_angle = {
+            0.0: (1.0, 0.0),
+            90.0: (0.0, 1.0),
+            180.0: (-1.0, 0.0),
+            270.0: (0.0, -1.0),
+        }[angle]
+    else:
+        angle = deg2rad(angle)
+        cos_angle, sin_angle = cos(angle), sin(angle)
+    if clockwise:
+        sin_angle *= -1.0
+    return cos_angle, sin_angle
+
+
+_RIGHT_ANGLE_COS_SIN = np.array(((1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)))
+
+
+def _batch_cos_sin(angles: np.ndarray, clockwise: bool) -> Tuple[np.ndarray, ...]:
+    angles = np.asarray(angles, dtype=np.float64).reshape(-1) % 360.0
+    radians = angles * (pi / 180.0)
+    cos_angles, sin_angles = np.cos(radians), np.sin(radians)
+
+    right_angles = angles % 90.0 == 0.0
+    if right_angles.any():
+        quarters = (angles[right_angles] // 90.0).astype(np.int64)
+        cos_angles[right_angles], sin_angles[right_angles] = _RIGHT_ANGLE_COS_SIN[
+            quarters
+        ].T
+
+    if clockwise:
+        sin_angles *= -1.0
+    return cos_angles, sin_angles
+
+
+def _stack(*params: Any) -> Matrices:
+    # one contiguous column per parameter
+    return np.stack(
+        np.broadcast_arrays(*[np.asarray(param, dtype=np.float64) for param in params])
+    ).T
+
+
+# Exact type checks are the cheapest way to recognize Python numbers and tuples,
+# which keeps the scalar path free of any NumPy overhead.
+_PYTHON_NUMBERS = frozenset((float, int))
+
+
+@overload
+def shearing_matrix(angle: float, clockwise: bool = ...) -> Matrix: ...
+
+
+@overload
+def shearing_matrix(angle: np.ndarray, clockwise: bool = ...) -> Matrices: ...
+
+
+def shearing_matrix(
+    angle: Union[float, np.ndarray], clockwise: bool = False
+) -> Union[Matrix, Matrices]:
     r"""Creates an affine horizontal shearing matrix in the form
 
     .. math::
@@ -29,21 +90,40 @@ def shearing_matrix(angle: float, clockwise: bool = False) -> Matrix:
         \end{pmatrix}
 
     Args:
-        angle: Angle :math:`\varphi` in degrees.
+        angle: Angle :math:`\varphi` in degrees. Can also be an array of shape
+            (N,).
         clockwise: If ``True``, the shearing will be performed clockwise.
             Defaults to ``False``.
 
     Returns:
         Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
-        :math:`f`.
+        :math:`f`. If ``angle`` is an array, they are returned as array of shape
+        (N, 6) that stores each parameter contiguously.
     """
-    angle = deg2rad(angle)
-    if clockwise:
-        angle *= -1.0
-    return (1.0, -sin(angle), 0.0, 0.0, cos(angle), 0.0)
+    if type(angle) not in _PYTHON_NUMBERS and isinstance(
+        angle, (np.ndarray, list, tuple)
+    ):
+        angles = np.asarray(angle, dtype=np.float64)
+        if angles.ndim > 0:
+            cos_angles, sin_angles = _batch_cos_sin(angles, clockwise)
+            return _stack(1.0, -sin_angles, 0.0, 0.0, cos_angles, 0.0)
+        angle = float(angles)
 
+    cos_angle, sin_angle = _cos_sin(angle, clockwise)  # type: ignore[arg-type]
+    return (1.0, -sin_angle, 0.0, 0.0, cos_angle, 0.0)
 
-def rotation_matrix(angle: float, clockwise: bool = False) -> Matrix:
+
+@overload
+def rotation_matrix(angle: float, clockwise: bool = ...) -> Matrix: ...
+
+
+@overload
+def rotation_matrix(angle: np.ndarray, clockwise: bool = ...) -> Matrices: ...
+
+
+def rotation_matrix(
+    angle: Union[float, np.ndarray], clockwise: bool = False
+) -> Union[Matrix, Matrices]:
     r"""Creates an affine rotation matrix in the form
 
     .. math::
@@ -62,21 +142,46 @@ def rotation_matrix(angle: float, clockwise: bool = False) -> Matrix:
         \end{pmatrix}
 
     Args:
-        angle: Angle :math:`\varphi` in degrees.
+        angle: Angle :math:`\varphi` in degrees. Can also be an array of shape
+            (N,).
         clockwise: If ``True``, the rotation will be performed clockwise.
             Defaults to ``False``.
 
     Returns:
         Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
-        :math:`f`.
+        :math:`f`. If ``angle`` is an array, they are returned as array of shape
+        (N, 6) that stores each parameter contiguously.
     """
-    angle = deg2rad(angle)
-    if clockwise:
-        angle *= -1.0
-    return (cos(angle), -sin(angle), 0.0, sin(angle), cos(angle), 0.0)
+    if type(angle) not in _PYTHON_NUMBERS and isinstance(
+        angle, (np.ndarray, list, tuple)
+    ):
+        angles = np.asarray(angle, dtype=np.float64)
+        if angles.ndim > 0:
+            cos_angles, sin_angles = _batch_cos_sin(angles, clockwise)
+            return _stack(cos_angles, -sin_angles, 0.0, sin_angles, cos_angles, 0.0)
+        angle = float(angles)
+
+    cos_angle, sin_angle = _cos_sin(angle, clockwise)  # type: ignore[arg-type]
+    return (cos_angle, -sin_angle, 0.0, sin_angle, cos_angle, 0.0)
+
+
+def _is_batched_factor(factor: Any) -> bool:
+    # tuples and lists of length two hold the horizontal and vertical factor of a
+    # single scaling, whereas one-dimensional arrays hold the factors of a batch
+    return isinstance(factor, np.ndarray) and factor.ndim > 0
+
 
+@overload
+def scaling_matrix(factor: Union[float, Tuple[float, float]]) -> Matrix: ...
 
-def scaling_matrix(factor: Union[float, Tuple[float, float]]) -> Matrix:
+
+@overload
+def scaling_matrix(factor: np.ndarray) -> Matrices: ...
+
+
+def scaling_matrix(
+    factor: Union[float, Tuple[float, float], np.ndarray],
+) -> Union[Matrix, Matrices]:
     r"""Creates an affine scaling matrix in the form
 
     .. math::
@@ -97,20 +202,46 @@ def scaling_matrix(factor: Union[float, Tuple[float, float]]) -> Matrix:
     Args:
         factor: Horizontal and vertical scaling factors
             (:math:`c_\text{horz}`, :math:`c_\text{vert}`). If scalar, the
-            same factor is used for both directions.
+            same factor is used for both directions. Can also be an array of shape
+            (N,) or (N, 2).
 
     Returns:
         Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
-        :math:`f`.
+        :math:`f`. If ``factor`` is an array, they are returned as array of shape
+        (N, 6) that stores each parameter contiguously.
     """
-    if isinstance(factor, float):
-        factor_horz = factor_vert = factor
+    factor_type = type(factor)
+    if factor_type in _PYTHON_NUMBERS:
+        return (factor, 0.0, 0.0, 0.0, factor, 0.0)  # type: ignore[return-value]
+    if factor_type is tuple:
+        factor_horz, factor_vert = factor  # type: ignore[misc]
+        return (factor_horz, 0.0, 0.0, 0.0, factor_vert, 0.0)
+
+    if _is_batched_factor(factor):
+        factors = np.asarray(factor, dtype=np.float64)
+        if factors.ndim == 1:
+            factors = factors[:, None]
+        factors = factors.reshape(len(factors), -1)
+        return _stack(factors[:, 0], 0.0, 0.0, 0.0, factors[:, -1], 0.0)
+
+    if isinstance(factor, (tuple, list)):
+        factor_horz, factor_vert = [float(dim_factor) for dim_factor in factor]
     else:
-        factor_horz, factor_vert = factor
+        factor_horz = factor_vert = float(factor)
     return (factor_horz, 0.0, 0.0, 0.0, factor_vert, 0.0)
 
 
-def translation_matrix(translation: Coordinate, inverse: bool = False) -> Matrix:
+@overload
+def translation_matrix(translation: Coordinate, inverse: bool = ...) -> Matrix: ...
+
+
+@overload
+def translation_matrix(translation: np.ndarray, inverse: bool = ...) -> Matrices: ...
+
+
+def translation_matrix(
+    translation: Union[Coordinate, np.ndarray], inverse: bool = False
+) -> Union[Matrix, Matrices]:
     r"""Creates an affine scaling matrix in the form
 
     .. math::
@@ -130,14 +261,27 @@ def translation_matrix(translation: Coordinate, inverse: bool = False) -> Matrix
 
     Args:
         translation: Horizontal and vertical translation.
-            (:math:`t_\text{horz}`, :math:`t_\text{vert}`)
+            (:math:`t_\text{horz}`, :math:`t_\text{vert}`) Can also be an array
+            of shape (N, 2).
         inverse: If ``True``, the translation will be performed in the opposite
             direction. Defaults to ``False``.
 
     Returns:
         Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
-        :math:`f`.
+        :math:`f`. If ``translation`` is an array of shape (N, 2), they are
+        returned as array of shape (N, 6) that stores each parameter
+        contiguously.
     """
+    if (
+        type(translation) is not tuple
+        and isinstance(translation, np.ndarray)
+        and translation.ndim > 1
+    ):
+        translations = np.asarray(translation, dtype=np.float64).reshape(-1, 2)
+        if inverse:
+            translations = -translations
+        return _stack(1.0, 0.0, translations[:, 0], 0.0, 1.0, translations[:, 1])
+
     horz_translation, vert_translation = translation
     if inverse:
         horz_translation *= -1.0
@@ -0,0 +1,366 @@
+from typing import Any, NamedTuple, Optional, Sequence, Tuple, Union
+import numpy as np
+from PIL import Image
+from .cache import CacheInfo, LRUCache
+from .instrumentation import stage
+from .transforms import AffineTransform, Size
+from .utils import Matrix
+
+__all__ = ["SamplingMap", "compute_sampling_map", "remap", "SamplingMapCache"]
+
+Fill = Union[float, Sequence[float]]
+
+
+class SamplingMap(NamedTuple):
+    """Precomputed lookup table of an affine warp. For every output pixel that
+    falls inside the input, it holds the flat indices of the input pixels that are
+    read and, for a bilinear interpolation, their weights. Applying it with
+    :func:`remap` is a pure gather without any coordinate arithmetic.
+    """
+
+    input_size: Size
+    size: Size
+    resample: int
+    #: flat indices of the output pixels inside the transformed motif
+    valid: np.ndarray
+    #: flat indices of the input pixels, either of shape (K,) or (4, K) for the
+    #: top left, top right, bottom left, and bottom right neighbors
+    indices: np.ndarray
+    #: horizontal and vertical weights of shape (2, K, 1) or None
+    weights: Optional[np.ndarray]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory occupied by the table in bytes."""
+        nbytes = self.valid.nbytes + self.indices.nbytes
+        if self.weights is not None:
+            nbytes += self.weights.nbytes
+        return nbytes
+
+
+def _coord(values: np.ndarray) -> np.ndarray:
+    # C-style truncation, but every negative coordinate is mapped to -1
+    return np.where(values < 0.0, -1, np.trunc(values)).astype(np.int64)
+
+
+def _accumulate(start: float, step: float, num: int) -> np.ndarray:
+    # repeated addition in the same order as Pillow to reproduce its rounding
+    steps = np.full(num, step, dtype=np.float64)
+    steps[0] = start
+    return np.cumsum(steps)
+
+
+def _nearest_coords(data: Matrix, size: Size) -> Tuple[np.ndarray, np.ndarray]:
+    a0, a1, a2, a3, a4, a5 = data
+    width, height = size
+
+    if a1 == 0.0 and a3 == 0.0:
+        xin = _coord(_accumulate(a2 + a0 * 0.5, a0, width))
+        yin = _coord(_accumulate(a5 + a4 * 0.5, a4, height))
+        xin, yin = np.broadcast_arrays(xin[None, :], yin[:, None])
+        return xin, yin
+
+    def check_fixed(x: int, y: int) -> bool:
+        return (
+            abs(x * a0 + y * a1 + a2) < 32768.0 and abs(x * a3 + y * a4 + a5) < 32768.0
+        )
+
+    xs = np.arange(width, dtype=np.int64)[None, :]
+    ys = np.arange(height, dtype=np.int64)[:, None]
+    if all(
+        check_fixed(x, y) for x, y in ((0, 0), (width, height), (0, height), (width, 0))
+    ):
+
+        def fix(value: float) -> int:
+            return int(np.floor(value * 65536.0 + 0.5))
+
+        xx = fix(a2 + a0 * 0.5 + a1 * 0.5) + ys * fix(a1) + xs * fix(a0)
+        yy = fix(a5 + a3 * 0.5 + a4 * 0.5) + ys * fix(a4) + xs * fix(a3)
+        return xx >> 16, yy >> 16
+
+    def accumulate(row_start: float, row_step: float, col_step: float) -> np.ndarray:
+        steps = np.full((height, width), col_step, dtype=np.float64)
+        steps[:, 0] = _accumulate(row_start, row_step, height)
+        return np.cumsum(steps, axis=1)
+
+    xin = accumulate(a2 + a1 * 0.5 + a0 * 0.5, a1, a0)
+    yin = accumulate(a5 + a4 * 0.5 + a3 * 0.5, a4, a3)
+    return _coord(xin), _coord(yin)
+
+
+def _index_dtype(num: int) -> type:
+    return np.int32 if num < 2**31 else np.int64
+
+
+def _flat_valid(valid: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(valid).astype(_index_dtype(valid.size))
+
+
+def _nearest_map(
+    data: Matrix, size: Size, input_size: Size
+) -> Tuple[np.ndarray, np.ndarray, None]:
+    width, height = input_size
+    xin, yin = _nearest_coords(data, size)
+    valid = (xin >= 0) & (xin < width) & (yin >= 0) & (yin < height)
+
+    indices = yin[valid] * width + xin[valid]
+    return _flat_valid(valid), indices.astype(_index_dtype(width * height)), None
+
+
+def _bilinear_map(
+    data: Matrix, size: Size, input_size: Size
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    a0, a1, a2, a3, a4, a5 = data
+    width, height = input_size
+
+    xs = np.arange(size[0], dtype=np.float64)[None, :] + 0.5
+    ys = np.arange(size[1], dtype=np.float64)[:, None] + 0.5
+    xin = a0 * xs + a1 * ys + a2
+    yin = a3 * xs + a4 * ys + a5
+    valid = (xin >= 0.0) & (xin < width) & (yin >= 0.0) & (yin < height)
+
+    xin = xin[valid] - 0.5
+    yin = yin[valid] - 0.5
+    x = np.floor(xin).astype(np.int64)
+    y = np.floor(yin).astype(np.int64)
+    dx = xin - x
+    dy = yin - y
+
+    x0 = np.clip(x, 0, width - 1)
+    x1 = np.clip(x + 1, 0, width - 1)
+    y0 = np.clip(y, 0, height - 1)
+    # rows below the input repeat the top row, which reproduces Pillow exactly
+    y1 = np.where((y + 1 >= 0) & (y + 1 < height), y + 1, y0)
+
+    indices = np.stack(
+        (y0 * width + x0, y0 * width + x1, y1 * width + x0, y1 * width + x1)
+    )
+    weights = np.stack((dx, dy))[..., None]
+    return (
+        _flat_valid(valid),
+        indices.astype(_index_dtype(width * height)),
+        weights,
+    )
+
+
+def compute_sampling_map(
+    data: Union[Matrix, np.ndarray],
+    size: Size,
+    input_size: Size,
+    resample: int = Image.NEAREST,
+) -> SamplingMap:
+    """Computes the lookup table of the ``data`` parameters of an affine
+    transformation, as returned by
+    :meth:`~pillow_affine.transforms.AffineTransform.extract_transform_params`.
+
+    Args:
+        data: Parameters of shape (6,).
+        size: Output size (width, height).
+        input_size: Input size (width, height).
+        resample: Either ``Image.NEAREST`` or ``Image.BILINEAR``. Defaults to
+            ``Image.NEAREST``.
+
+    Returns:
+        Sampling map.
+    """
+    if resample not in (Image.NEAREST, Image.BILINEAR):
+        msg = "resample can be either Image.NEAREST or Image.BILINEAR."
+        raise RuntimeError(msg)
+
+    a0, a1, a2, a3, a4, a5 = (float(value) for value in data)
+    params = (a0, a1, a2, a3, a4, a5)
+    size = (int(size[0]), int(size[1]))
+    input_size = (int(input_size[0]), int(input_size[1]))
+    with stage("sampling_map", size=size, resample=resample):
+        valid: np.ndarray
+        indices: np.ndarray
+        weights: Optional[np.ndarray]
+        if resample == Image.NEAREST:
+            valid, indices, weights = _nearest_map(params, size, input_size)
+        else:
+            valid, indices, weights = _bilinear_map(params, size, input_size)
+    return SamplingMap(input_size, size, resample, valid, indices, weights)
+
+
+def _gather(array: np.ndarray, sampling_map: SamplingMap, fill: Any) -> np.ndarray:
+    leading_shape = array.shape[:-3]
+    num_channels = array.shape[-1]
+    pixels = array.reshape((*leading_shape, -1, num_channels))
+    width, height = sampling_map.size
+    valid = sampling_map.valid
+    indices = sampling_map.indices
+
+    output = np.empty((*leading_shape, height * width, num_channels), array.dtype)
+    output[...] = fill
+    if sampling_map.weights is None:
+        output[..., valid, :] = pixels[..., indices, :]
+    else:
+        dx, dy = sampling_map.weights
+
+        def interpolate(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+            left_pixels = pixels[..., left, :].astype(np.float64)
+            right_pixels = pixels[..., right, :].astype(np.float64)
+            return left_pixels + (right_pixels - left_pixels) * dx
+
+        top = interpolate(indices[0], indices[1])
+        bottom = interpolate(indices[2], indices[3])
+        values = top + (bottom - top) * dy
+        # Pillow truncates for integer images
+        output[..., valid, :] = values.astype(array.dtype)
+    return output.reshape((*leading_shape, height, width, num_channels))
+
+
+def remap(array: np.ndarray, sampling_map: SamplingMap, fill: Fill = 0) -> np.ndarray:
+    """Applies a precomputed sampling map to an array. The result is identical to
+    :func:`~pillow_affine.arrays.warp_array` with the parameters the map was
+    computed from.
+
+    Args:
+        array: Image(s) of shape (H, W), (H, W, C), or (N, H, W, C) with arbitrary
+            dtype. All images of a batch are warped with the same map.
+        sampling_map: Sampling map.
+        fill: Value for the area outside the transformed motif. Can also be given
+            per channel. Defaults to ``0``.
+
+    Returns:
+        Transformed image(s) with the same number of dimensions and dtype as the
+        input.
+    """
+    array = np.asarray(array)
+    if array.ndim == 2:
+        return remap(array[..., None], sampling_map, fill)[..., 0]
+    if array.ndim not in (3, 4):
+        msg = f"Expected array with 2 to 4 dimensions, but got {array.ndim}."
+        raise RuntimeError(msg)
+
+    height, width = array.shape[-3:-1]
+    if (width, height) != sampling_map.input_size:
+        msg = (
+            f"The sampling map was computed for images of size "
+            f"{sampling_map.input_size}, but got {(width, height)}."
+        )
+        raise RuntimeError(msg)
+
+    with stage("remap", size=sampling_map.size):
+        return _gather(array, sampling_map, np.asarray(fill, dtype=array.dtype))
+
+
+class SamplingMapCache:
+    """Cache of sampling maps for workloads that apply a small set of fixed
+    transformations to many images of the same size. The maps are keyed on the
+    ``data`` and ``size`` parameters of the transformation, the input size, and the
+    resampling filter. Thus, different transformations with identical results
+    share a map. A simple call might look like::
+
+        from pillow_affine import transforms
+        from pillow_affine.sampling import SamplingMapCache
+
+        cache = SamplingMapCache(maxbytes=512 * 2 ** 20)
+        rotations = [transforms.Rotate(angle) for angle in range(0, 360, 10)]
+
+        for array, idx in ...:
+            transformed_array = cache.warp(array, rotations[idx])
+
+    A map of a nearest neighbor warp takes up to 8 bytes per output pixel, a map of
+    a bilinear warp up to 36 bytes.
+
+    Args:
+        maxbytes: Maximum summed size of the cached maps in bytes. If exceeded the
+            least recently used maps are discarded. Defaults to 256 MiB.
+        maxsize: Maximum number of cached maps. Defaults to ``1024``.
+    """
+
+    def __init__(self, maxbytes: int = 256 * 2**20, maxsize: int = 1024) -> None:
+        self._cache = LRUCache(maxsize, maxbytes=maxbytes)
+
+    def get_map(
+        self,
+        data: Union[Matrix, np.ndarray],
+        size: Size,
+        input_size: Size,
+        resample: int = Image.NEAREST,
+    ) -> SamplingMap:
+        """Looks up the sampling map of the ``data`` parameters or computes it on a
+        miss. See :func:`compute_sampling_map` for details.
+        """
+        key = (
+            tuple(float(value) for value in data),
+            (int(size[0]), int(size[1])),
+            (int(input_size[0]), int(input_size[1])),
+            resample,
+        )
+        sampling_map = self._cache.get(key)
+        if sampling_map is None:
+            sampling_map = compute_sampling_map(data, size, input_size, resample)
+            self._cache.put(key, sampling_map, nbytes=sampling_map.nbytes)
+        return sampling_map
+
+    def get(
+        self,
+        transform: AffineTransform,
+        input_size: Size,
+        expand: bool = False,
+        resample: int = Image.NEAREST,
+    ) -> SamplingMap:
+        """Looks up the sampling map of an affine transformation or computes it on
+        a miss.
+
+        Args:
+            transform: Affine transformation.
+            input_size: Input size (width, height).
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+            resample: Either ``Image.NEAREST`` or ``Image.BILINEAR``. Defaults to
+                ``Image.NEAREST``.
+
+        Returns:
+            Sampling map.
+        """
+        size, _, data = transform.extract_transform_params(input_size, expand=expand)
+        return self.get_map(data, size, input_size, resample)
+
+    def warp(
+        self,
+        array: np.ndarray,
+        transform: AffineTransform,
+        expand: bool = False,
+        resample: int = Image.NEAREST,
+        fill: Fill = 0,
+    ) -> np.ndarray:
+        """Cached version of :func:`~pillow_affine.arrays.transform_array`.
+
+        Args:
+            array: Image(s) of shape (H, W), (H, W, C), or (N, H, W, C) with
+                arbitrary dtype.
+            transform: Affine transformation. For a batch of images the same
+                transformation is applied to every image.
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+            resample: Either ``Image.NEAREST`` or ``Image.BILINEAR``. Defaults to
+                ``Image.NEAREST``.
+            fill: Value for the area outside the transformed motif. Can also be
+                given per channel. Defaults to ``0``.
+
+        Returns:
+            Transformed image(s).
+        """
+        array = np.asarray(array)
+        height, width = array.shape[:2] if array.ndim == 2 else array.shape[-3:-1]
+        sampling_map = self.get(transform, (width, height), expand, resample)
+        return remap(array, sampling_map, fill=fill)
+
+    def clear(self) -> None:
+        """Discards all cached maps. The statistics are kept."""
+        self._cache.clear()
+
+    def info(self) -> CacheInfo:
+        """Reports the statistics of the cache.
+
+        Returns:
+            Number of hits and misses, maximum and current number of maps, and
+            their summed size in bytes.
+        """
+        return self._cache.info()
+
+    def __len__(self) -> int:
+        return len(self._cache)
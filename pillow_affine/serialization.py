@@ -0,0 +1,670 @@
+from typing import Any, Callable, Iterator, List, Sequence, Tuple, Union
+import struct
+from collections import deque
+from itertools import chain
+import numpy as np
+from PIL import Image
+from .transforms import (
+    AffineTransform,
+    CompiledTransform,
+    ComposedTransform,
+    Identity,
+    Rotate,
+    Scale,
+    Shear,
+    Size,
+    Sizes,
+    Translate,
+)
+from .utils import Matrix, Matrices
+
+__all__ = [
+    "VERSION",
+    "TransformBatch",
+    "TransformParamsBatch",
+    "dumps_transforms",
+    "loads_transforms",
+    "dumps_transform",
+    "loads_transform",
+    "dumps_params",
+    "loads_params",
+]
+
+VERSION = 2
+
+Buffer = Union[bytes, bytearray, memoryview]
+TransformParams = Tuple[Size, int, Matrix]
+
+# magic, version, number of items
+_HEADER = struct.Struct("<4sHxxQ")
+_TRANSFORMS_MAGIC = b"PATF"
+_PARAMS_MAGIC = b"PAPB"
+
+# Transforms are stored as a pre-order traversal of the tree in three columns:
+# the values of all nodes, the number of children of each composed and compiled
+# transform, and one byte per node holding its kind and flags. Each node only
+# stores the values its kind needs.
+_TRANSFORMS_INFO = struct.Struct("<QQQ")  # number of values, counts, and nodes
+
+_IDENTITY = 0
+_SHEAR = 1
+_ROTATE = 2
+_SCALE = 3
+_TRANSLATE = 4
+_COMPOSED = 5
+_COMPILED = 6
+_SEGMENT = 7
+
+# number of values per kind without the center
+_NUM_VALUES = np.array((0, 1, 1, 2, 2, 0, 0, 6), dtype=np.int64)
+
+# Shear and Rotate: clockwise, Translate: inverse, segments: centered
+_FLAG = 0x1
+_HAS_CENTER = 0x2
+_SCALAR_FACTOR = 0x4
+_FLAGS_SHIFT = 4
+
+# The parameters are stored in columns: the data, the sizes, and the methods.
+# If all images share the same method, it is stored once instead.
+_PARAMS_INFO = struct.Struct("<i4x")  # common method or -1
+
+
+def _pack_header(magic: bytes, num: int) -> bytes:
+    return _HEADER.pack(magic, VERSION, num)
+
+
+def _unpack_header(buffer: Buffer, magic: bytes) -> Tuple[int, memoryview]:
+    buffer = memoryview(buffer).cast("B")
+    if len(buffer) < _HEADER.size:
+        raise RuntimeError("The buffer is too short to hold a header.")
+
+    actual_magic, version, num = _HEADER.unpack_from(buffer)
+    if actual_magic != magic:
+        raise RuntimeError(
+            f"Expected a buffer starting with {magic!r}, but got {actual_magic!r}."
+        )
+    if version != VERSION:
+        raise RuntimeError(
+            f"The buffer was created with version {version} of the format, but only "
+            f"version {VERSION} is supported."
+        )
+    return num, buffer[_HEADER.size :]
+
+
+def _encode(
+    transform: AffineTransform,
+    nodes: bytearray,
+    counts: List[int],
+    values: List[float],
+) -> None:
+    # dispatching on the exact type rejects subclasses, since they might carry
+    # additional state that would be lost
+    cls = type(transform)
+    flags = 0
+    if cls is ComposedTransform:
+        children = transform.transforms  # type: ignore[attr-defined]
+        nodes.append(_COMPOSED)
+        counts.append(len(children))
+        for child in children:
+            _encode(child, nodes, counts, values)
+        return
+    elif cls is CompiledTransform:
+        segments = transform.segments  # type: ignore[attr-defined]
+        nodes.append(_COMPILED)
+        counts.append(len(segments))
+        for matrix, centered in segments:
+            nodes.append(_SEGMENT | (_FLAG if centered else 0) << _FLAGS_SHIFT)
+            values.extend(matrix)
+        return
+    elif cls is Identity:
+        kind = _IDENTITY
+    elif cls is Translate:
+        kind = _TRANSLATE
+        if transform.inverse:  # type: ignore[attr-defined]
+            flags |= _FLAG
+        values.extend(transform.translation)  # type: ignore[attr-defined]
+    elif cls is Rotate or cls is Shear:
+        kind = _ROTATE if cls is Rotate else _SHEAR
+        if transform.clockwise:  # type: ignore[attr-defined]
+            flags |= _FLAG
+        values.append(transform.angle)  # type: ignore[attr-defined]
+    elif cls is Scale:
+        kind = _SCALE
+        factor = transform.factor  # type: ignore[attr-defined]
+        if isinstance(factor, (tuple, list, np.ndarray)):
+            values.extend(factor)
+        else:
+            flags |= _SCALAR_FACTOR
+            values.append(factor)
+    else:
+        raise RuntimeError(f"Transforms of type {cls.__name__} cannot be serialized.")
+
+    center = getattr(transform, "center", None)
+    if center is not None:
+        flags |= _HAS_CENTER
+        values.extend(center)
+    nodes.append(kind | flags << _FLAGS_SHIFT)
+
+
+# The transforms are rebuilt from their states the same way pickle does, since the
+# parameters were already validated and normalized when they were created.
+_new = object.__new__
+
+
+def _unpack_values(
+    values: np.ndarray, offsets: np.ndarray, num: int
+) -> Iterator[Tuple[float, ...]]:
+    return struct.iter_unpack(
+        f"={num}d", values[offsets[:, None] + np.arange(num)].data
+    )
+
+
+def _decode(
+    kinds: np.ndarray,
+    flags: np.ndarray,
+    children: np.ndarray,
+    offsets: np.ndarray,
+    values: np.ndarray,
+) -> List[AffineTransform]:
+    # The leaves are built in bulk for each kind from whole columns of their
+    # values. Afterwards, only the composed and compiled transforms are visited
+    # in reverse, so that their children are already on the stack, in order
+    # starting from the top, when they are reached.
+    flag = (flags & _FLAG).astype(bool)
+
+    def centers(idcs: np.ndarray, num_values: Union[int, np.ndarray]) -> List[Any]:
+        centers: List[Any] = [None] * len(idcs)
+        (has_center,) = np.nonzero(flags[idcs] & _HAS_CENTER)
+        if len(has_center) > 0:
+            if isinstance(num_values, np.ndarray):
+                num_values = num_values[has_center]
+            deque(
+                map(
+                    centers.__setitem__,
+                    has_center.tolist(),
+                    _unpack_values(values, offsets[idcs[has_center]] + num_values, 2),
+                ),
+                maxlen=0,
+            )
+        return centers
+
+    def build_identity(idcs: np.ndarray) -> List[Any]:
+        return [_new(Identity) for _ in range(len(idcs))]
+
+    def build_angle(cls: type) -> Callable[[np.ndarray], List[Any]]:
+        def build(idcs: np.ndarray) -> List[Any]:
+            transforms = []
+            for angle, clockwise, center in zip(
+                values[offsets[idcs]].tolist(),
+                flag[idcs].tolist(),
+                centers(idcs, 1),
+            ):
+                transform: AffineTransform = _new(cls)
+                transform.__dict__.update(
+                    {"angle": angle, "clockwise": clockwise, "center": center}
+                )
+                transforms.append(transform)
+            return transforms
+
+        return build
+
+    def build_scale(idcs: np.ndarray) -> List[Any]:
+        scalar = (flags[idcs] & _SCALAR_FACTOR).astype(bool)
+        (vectors,) = np.nonzero(~scalar)
+        factors = values[offsets[idcs]].tolist()
+        deque(
+            map(
+                factors.__setitem__,
+                vectors.tolist(),
+                _unpack_values(values, offsets[idcs[vectors]], 2),
+            ),
+            maxlen=0,
+        )
+        transforms = []
+        for factor, center in zip(factors, centers(idcs, np.where(scalar, 1, 2))):
+            transform = _new(Scale)
+            transform.__dict__.update({"factor": factor, "center": center})
+            transforms.append(transform)
+        return transforms
+
+    def build_translate(idcs: np.ndarray) -> List[Any]:
+        transforms = []
+        for translation, inverse in zip(
+            _unpack_values(values, offsets[idcs], 2), flag[idcs].tolist()
+        ):
+            transform = _new(Translate)
+            transform.__dict__.update({"translation": translation, "inverse": inverse})
+            transforms.append(transform)
+        return transforms
+
+    def build_segment(idcs: np.ndarray) -> List[Any]:
+        return list(zip(_unpack_values(values, offsets[idcs], 6), flag[idcs].tolist()))
+
+    builders = {
+        _IDENTITY: build_identity,
+        _SHEAR: build_angle(Shear),
+        _ROTATE: build_angle(Rotate),
+        _SCALE: build_scale,
+        _TRANSLATE: build_translate,
+        _SEGMENT: build_segment,
+    }
+    order = np.argsort(kinds, kind="stable")
+    bounds = np.cumsum(np.bincount(kinds, minlength=_SEGMENT + 1)).tolist()
+    leaves: List[Any] = []
+    for kind, (start, stop) in enumerate(zip([0, *bounds], bounds)):
+        if start == stop:
+            continue
+        elif kind in builders:
+            leaves.extend(builders[kind](order[start:stop]))
+        else:
+            # composed and compiled transforms are only placeholders here
+            leaves.extend([None] * (stop - start))
+    positions = np.empty_like(order)
+    positions[order] = np.arange(len(order))
+    nodes = list(map(leaves.__getitem__, positions.tolist()))
+
+    stack: List[Any] = []
+    stop = len(nodes)
+    parents = np.flatnonzero(children)[::-1]
+    for idx, kind, count in zip(
+        parents.tolist(), kinds[parents].tolist(), children[parents].tolist()
+    ):
+        stack.extend(nodes[stop - 1 : idx : -1])
+        state = tuple(stack[: -count - 1 : -1])
+        del stack[-count:]
+        if kind == _COMPOSED:
+            transform = _new(ComposedTransform)
+            transform.__dict__["transforms"] = state
+        else:
+            transform = _new(CompiledTransform)
+            transform.__dict__["segments"] = state
+        stack.append(transform)
+        stop = idx
+    stack.extend(nodes[:stop][::-1])
+    stack.reverse()
+    return stack
+
+
+def dumps_transforms(transforms: Sequence[AffineTransform]) -> bytes:
+    """Serializes transforms into a single compact buffer. Only the kind of each
+    node of a transform tree and the values it needs are stored. Compared to
+    ``pickle``, the buffer is less than half the size and faster to create.
+    Loading it is almost free and a single transform can be rebuilt without
+    rebuilding all others.
+
+    Args:
+        transforms: Transforms. Only the transforms defined in
+            :mod:`pillow_affine.transforms` are supported.
+
+    Returns:
+        Serialized transforms.
+    """
+    nodes = bytearray()
+    counts: List[int] = []
+    values: List[float] = []
+    for transform in transforms:
+        if transform._is_batched():
+            raise RuntimeError(
+                "Transforms with array-valued parameters cannot be serialized. Use "
+                "dumps_params() for the extracted parameters instead."
+            )
+        _encode(transform, nodes, counts, values)
+    return b"".join(
+        (
+            _pack_header(_TRANSFORMS_MAGIC, len(transforms)),
+            _TRANSFORMS_INFO.pack(len(values), len(counts), len(nodes)),
+            np.array(values, dtype="<f8").tobytes(),
+            np.array(counts, dtype="<u4").tobytes(),
+            nodes,
+        )
+    )
+
+
+class TransformBatch:
+    """Read-only sequence of serialized transforms created by
+    :func:`loads_transforms`. A transform is only rebuilt when it is accessed.
+
+    Args:
+        values: Values of all nodes.
+        counts: Number of children of each composed and compiled transform.
+        nodes: Kind and flags of each node.
+        num: Number of transforms.
+    """
+
+    def __init__(
+        self, values: np.ndarray, counts: np.ndarray, nodes: np.ndarray, num: int
+    ) -> None:
+        kinds = nodes & 0xF
+        flags = nodes >> _FLAGS_SHIFT
+        if np.any(kinds > _SEGMENT):
+            raise RuntimeError(f"Unknown node kind {int(kinds.max())}.")
+
+        num_values = (
+            _NUM_VALUES[kinds]
+            + 2 * ((flags & _HAS_CENTER) != 0)
+            - ((kinds == _SCALE) & ((flags & _SCALAR_FACTOR) != 0))
+        )
+        offsets = np.concatenate(([0], np.cumsum(num_values)))
+        if offsets[-1] != len(values):
+            raise RuntimeError(
+                f"The nodes require {offsets[-1]} values, but got {len(values)}."
+            )
+
+        is_parent = (kinds == _COMPOSED) | (kinds == _COMPILED)
+        if (
+            np.count_nonzero(is_parent) != len(counts)
+            or np.any(counts == 0)
+            or counts.sum(dtype=np.int64) >= max(len(nodes), 1)
+        ):
+            raise RuntimeError("The number of children does not match the nodes.")
+        children = np.zeros(len(nodes), dtype=np.int64)
+        children[is_parent] = counts
+
+        # segments have to be exactly the children of the compiled transforms
+        compiled_counts = children[kinds == _COMPILED]
+        segment_idcs = np.repeat(
+            np.flatnonzero(kinds == _COMPILED)
+            + 1
+            - (np.cumsum(compiled_counts) - compiled_counts),
+            compiled_counts,
+        ) + np.arange(compiled_counts.sum())
+        if (
+            np.count_nonzero(kinds == _SEGMENT) != len(segment_idcs)
+            or np.any(segment_idcs >= len(nodes))
+            or np.any(kinds[segment_idcs] != _SEGMENT)
+        ):
+            raise RuntimeError("Expected only segments in a CompiledTransform.")
+
+        # Each tree reduces the number of pending nodes by one, so a tree ends at
+        # the first node after which the number of pending nodes reaches a new low.
+        pending = np.cumsum(children - 1)
+        lows = np.minimum.accumulate(np.concatenate(([0], pending[:-1])))
+        ends = np.flatnonzero(pending < lows) + 1
+        if len(ends) != num or (ends[-1] if num > 0 else 0) != len(nodes):
+            raise RuntimeError(f"The nodes do not form exactly {num} transforms.")
+
+        self.values = values
+        self.counts = counts
+        self.nodes = nodes
+        self._starts = np.concatenate(([0], ends)).tolist()
+        self._columns = (kinds, flags, children, offsets)
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __getitem__(self, idx: int) -> AffineTransform:
+        idx = range(len(self))[idx]
+        (transform,) = self._decode(self._starts[idx], self._starts[idx + 1])
+        return transform
+
+    def __iter__(self) -> Iterator[AffineTransform]:
+        return iter(self.tolist())
+
+    def tolist(self) -> List[AffineTransform]:
+        """Rebuilds all transforms.
+
+        Returns:
+            Transforms.
+        """
+        return self._decode(0, self._starts[-1])
+
+    def _decode(self, start: int, stop: int) -> List[AffineTransform]:
+        kinds, flags, children, offsets = self._columns
+        return _decode(
+            kinds[start:stop],
+            flags[start:stop],
+            children[start:stop],
+            offsets[start:stop],
+            self.values,
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} transforms)"
+
+
+def loads_transforms(buffer: Buffer) -> TransformBatch:
+    """Deserializes transforms created by :func:`dumps_transforms`. The columns
+    are read-only views into ``buffer`` and thus no data is copied.
+
+    Args:
+        buffer: Serialized transforms.
+
+    Returns:
+        Batch of transforms.
+    """
+    num, payload = _unpack_header(buffer, _TRANSFORMS_MAGIC)
+    if len(payload) < _TRANSFORMS_INFO.size:
+        raise RuntimeError("The buffer is too short to hold the number of nodes.")
+    num_values, num_counts, num_nodes = _TRANSFORMS_INFO.unpack_from(payload)
+    size = _TRANSFORMS_INFO.size + 8 * num_values + 4 * num_counts + num_nodes
+    if len(payload) != size:
+        raise RuntimeError(
+            f"Expected a payload of {size} bytes, but the buffer holds "
+            f"{len(payload)} bytes."
+        )
+
+    offset = _TRANSFORMS_INFO.size
+    values = np.frombuffer(payload, dtype="<f8", count=num_values, offset=offset)
+    offset += values.nbytes
+    counts = np.frombuffer(payload, dtype="<u4", count=num_counts, offset=offset)
+    offset += counts.nbytes
+    nodes = np.frombuffer(payload, dtype="u1", count=num_nodes, offset=offset)
+    return TransformBatch(values, counts, nodes, num)
+
+
+def dumps_transform(transform: AffineTransform) -> bytes:
+    """Serializes a single transform. See :func:`dumps_transforms` for details.
+
+    Args:
+        transform: Transform.
+
+    Returns:
+        Serialized transform.
+    """
+    return dumps_transforms((transform,))
+
+
+def loads_transform(buffer: Buffer) -> AffineTransform:
+    """Deserializes a single transform created by :func:`dumps_transform`.
+
+    Args:
+        buffer: Serialized transform.
+
+    Returns:
+        Transform.
+    """
+    transforms = loads_transforms(buffer)
+    if len(transforms) != 1:
+        raise RuntimeError(
+            f"Expected a buffer with a single transform, but got {len(transforms)}."
+        )
+    return transforms[0]
+
+
+class TransformParamsBatch:
+    """Array-backed batch of the ``size``, ``method``, and ``data`` parameters for
+    ``Image.transform()``. The parameters are only converted to Python objects for
+    the images that are accessed. A simple call might look like::
+
+        from pillow_affine import transforms
+        from pillow_affine.serialization import (
+            TransformParamsBatch,
+            dumps_params,
+            loads_params,
+        )
+
+        transform = transforms.Rotate(30.0)
+        batch = TransformParamsBatch.from_transform(transform, sizes)
+        buffer = dumps_params(batch)
+
+        # e.g. in a worker process
+        batch = loads_params(buffer)
+        transformed_image = image.transform(*batch[idx])
+
+    Args:
+        sizes: Sizes (width, height) of the transformed images of shape (N, 2).
+        data: Inverse transformation matrices of shape (N, 6).
+        methods: Transformation methods. If scalar, the same method is used for all
+            images. Defaults to ``Image.AFFINE``.
+    """
+
+    def __init__(
+        self,
+        sizes: Sizes,
+        data: Union[Matrices, Sequence[Matrix]],
+        methods: Union[int, Sequence[int], np.ndarray] = Image.AFFINE,
+    ) -> None:
+        self.sizes = np.asarray(sizes).reshape(-1, 2)
+        self.data = np.asarray(data, dtype=np.float64).reshape(-1, 6)
+        self.methods = np.broadcast_to(np.asarray(methods), (len(self.sizes),))
+        if len(self.data) != len(self.sizes):
+            raise RuntimeError(
+                f"Got {len(self.sizes)} sizes, but {len(self.data)} matrices."
+            )
+
+    @classmethod
+    def from_params(cls, params: Sequence[TransformParams]) -> "TransformParamsBatch":
+        """Creates a batch from a sequence of parameters, e.g. the output of
+        :meth:`~pillow_affine.transforms.AffineTransform.extract_batch_transform_params`.
+
+        Args:
+            params: ``size``, ``method``, and ``data`` parameters.
+
+        Returns:
+            Batch.
+        """
+        if not params:
+            return cls(np.empty((0, 2), dtype=np.int64), np.empty((0, 6)))
+        num = len(params)
+        sizes, methods, data = zip(*params)
+        return cls(
+            np.fromiter(chain.from_iterable(sizes), np.int64, 2 * num),
+            np.fromiter(chain.from_iterable(data), np.float64, 6 * num),
+            methods=np.fromiter(methods, np.int64, num),
+        )
+
+    @classmethod
+    def from_transform(
+        cls, transform: AffineTransform, sizes: Sizes, expand: bool = False
+    ) -> "TransformParamsBatch":
+        """Batched version of
+        :meth:`~pillow_affine.transforms.AffineTransform.extract_transform_params`
+        that skips the conversion of the parameters to Python objects.
+
+        Args:
+            transform: Affine transformation.
+            sizes: Image sizes (width, height) of shape (N, 2).
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+
+        Returns:
+            Batch.
+        """
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+        expanded_sizes, data = AffineTransform._extract_batch_affine_data(
+            sizes, transform._create_matrices(sizes), expand=expand
+        )
+        return cls(expanded_sizes, data)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __getitem__(self, idx: int) -> TransformParams:
+        width, height = self.sizes[idx].tolist()
+        a, b, c, d, e, f = self.data[idx].tolist()
+        return (width, height), int(self.methods[idx]), (a, b, c, d, e, f)
+
+    def __iter__(self) -> Iterator[TransformParams]:
+        return iter(self.tolist())
+
+    def tolist(self) -> List[TransformParams]:
+        """Converts all parameters to Python objects.
+
+        Returns:
+            ``size``, ``method``, and ``data`` parameters for each image.
+        """
+        # unpacking the raw arrays is much faster than converting them to nested
+        # lists first
+        return list(
+            zip(
+                struct.iter_unpack(
+                    "=2q", np.ascontiguousarray(self.sizes, dtype=np.int64).data
+                ),
+                self.methods.tolist(),
+                struct.iter_unpack(
+                    "=6d", np.ascontiguousarray(self.data, dtype=np.float64).data
+                ),
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} images)"
+
+
+def dumps_params(
+    params: Union[TransformParamsBatch, Sequence[TransformParams]],
+) -> bytes:
+    """Serializes the parameters for ``Image.transform()`` of a batch of images
+    into a single columnar buffer. If all images share the same method, it is
+    only stored once.
+
+    Args:
+        params: Batch or sequence of ``size``, ``method``, and ``data``
+            parameters.
+
+    Returns:
+        Serialized parameters.
+    """
+    if not isinstance(params, TransformParamsBatch):
+        params = TransformParamsBatch.from_params(params)
+
+    methods = params.methods
+    if len(methods) > 0 and np.all(methods == methods[0]):
+        method = int(methods[0])
+    else:
+        method = -1
+
+    return b"".join(
+        (
+            _pack_header(_PARAMS_MAGIC, len(params)),
+            _PARAMS_INFO.pack(method),
+            params.data.astype("<f8", copy=False).tobytes(),
+            params.sizes.astype("<u4").tobytes(),
+            methods.astype("u1").tobytes() if method < 0 else b"",
+        )
+    )
+
+
+def loads_params(buffer: Buffer) -> TransformParamsBatch:
+    """Deserializes parameters created by :func:`dumps_params`. The arrays of the
+    returned batch are read-only views into ``buffer`` and thus no data is
+    copied.
+
+    Args:
+        buffer: Serialized parameters.
+
+    Returns:
+        Batch.
+    """
+    num, payload = _unpack_header(buffer, _PARAMS_MAGIC)
+    if len(payload) < _PARAMS_INFO.size:
+        raise RuntimeError("The buffer is too short to hold the method.")
+    (method,) = _PARAMS_INFO.unpack_from(payload)
+    size = _PARAMS_INFO.size + num * (6 * 8 + 2 * 4 + (1 if method < 0 else 0))
+    if len(payload) != size:
+        raise RuntimeError(
+            f"Expected a payload of {size} bytes for {num} images, but the buffer "
+            f"holds {len(payload)} bytes."
+        )
+
+    offset = _PARAMS_INFO.size
+    data = np.frombuffer(payload, dtype="<f8", count=6 * num, offset=offset)
+    offset += data.nbytes
+    sizes = np.frombuffer(payload, dtype="<u4", count=2 * num, offset=offset)
+    offset += sizes.nbytes
+    methods: Union[int, np.ndarray]
+    if method < 0:
+        methods = np.frombuffer(payload, dtype="u1", count=num, offset=offset)
+    else:
+        methods = method
+    return TransformParamsBatch(sizes, data, methods=methods)
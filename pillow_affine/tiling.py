@@ -0,0 +1,113 @@
+from typing import Any, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from .apply import _crop_source, _submit_bounded
+from .instrumentation import stage
+from .transforms import AffineTransform
+from .utils import Box, Matrix
+
+__all__ = ["iter_tiles", "transform_tiled"]
+
+
+def _warp_tile(
+    image: Image.Image,
+    data: Matrix,
+    box: Box,
+    resample: int,
+    fillcolor: Optional[Any],
+) -> Image.Image:
+    with stage("crop_source", size=image.size):
+        tile_image, tile_data = _crop_source(image, data, box, resample)
+    tile_size = (box[2] - box[0], box[3] - box[1])
+    with stage("warp", size=tile_size, mode=image.mode):
+        return tile_image.transform(
+            tile_size, Image.AFFINE, tile_data, resample=resample, fillcolor=fillcolor
+        )
+
+
+def iter_tiles(
+    image: Image.Image,
+    transform: AffineTransform,
+    expand: bool = False,
+    tile_size: int = 512,
+    resample: int = Image.NEAREST,
+    fillcolor: Optional[Any] = None,
+    workers: int = 1,
+) -> Iterator[Tuple[Box, Image.Image]]:
+    """Applies an affine transformation tile by tile. For every tile of the output
+    only the region of the source that is actually read is cropped and warped. Thus,
+    the memory needed for the transformation is bounded by the tile size rather
+    than by the image size. The tiles are yielded in row-major order and can be
+    written to their final destination incrementally.
+
+    The result matches ``Image.transform()`` except for samples that fall exactly on
+    a pixel border, for which the rounding might pick the neighboring pixel.
+
+    Args:
+        image: Image to be transformed.
+        transform: Affine transformation.
+        expand: If ``True``, expands the canvas to hold the complete
+            transformed motif. Defaults to ``False``.
+        tile_size: Edge length of the output tiles. Defaults to ``512``.
+        resample: Resampling filter passed to ``Image.transform()``. Defaults to
+            ``Image.NEAREST``.
+        fillcolor: Optional color for the area outside the transformed motif.
+        workers: Number of threads warping tiles in parallel. Defaults to ``1``.
+
+    Returns:
+        Iterator of the region (left, upper, right, lower) in the output image
+        and the corresponding tile.
+    """
+    size, _, data = transform.extract_transform_params(image.size, expand=expand)
+    width, height = size
+    boxes = [
+        (left, upper, min(left + tile_size, width), min(upper + tile_size, height))
+        for upper in range(0, height, tile_size)
+        for left in range(0, width, tile_size)
+    ]
+
+    if workers == 1:
+        for box in boxes:
+            yield box, _warp_tile(image, data, box, resample, fillcolor)
+        return
+
+    # lazily opened images must not be loaded concurrently by the workers
+    image.load()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    tiles = _submit_bounded(
+        executor,
+        ((_warp_tile, (image, data, box, resample, fillcolor)) for box in boxes),
+        max_pending=2 * workers,
+    )
+    try:
+        yield from zip(boxes, tiles)
+    finally:
+        # cancels the tiles that are not yet warped if the iterator is closed early
+        tiles.close()
+        executor.shutdown(wait=True)
+
+
+def transform_tiled(
+    image: Image.Image, transform: AffineTransform, expand: bool = False, **kwargs: Any
+) -> Image.Image:
+    """Applies an affine transformation tile by tile and assembles the result. See
+    :func:`iter_tiles` for details.
+
+    Args:
+        image: Image to be transformed.
+        transform: Affine transformation.
+        expand: If ``True``, expands the canvas to hold the complete
+            transformed motif. Defaults to ``False``.
+        **kwargs: Optional parameters passed to :func:`iter_tiles`.
+
+    Returns:
+        Transformed image.
+    """
+    size, _, _ = transform.extract_transform_params(image.size, expand=expand)
+    transformed_image = Image.new(image.mode, size)
+    if image.mode == "P":
+        transformed_image.putpalette(image.getpalette())
+
+    for box, tile in iter_tiles(image, transform, expand=expand, **kwargs):
+        transformed_image.paste(tile, box[:2])
+    return transformed_image
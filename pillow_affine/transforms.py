@@ -1,14 +1,29 @@
-from typing import Union, Optional, Sequence, Tuple
+from typing import Any, Hashable, NamedTuple, Union, Optional, Sequence, Tuple, List
 from abc import ABC, abstractmethod
-from math import floor, ceil
+from math import floor, ceil, isclose
+import numpy as np
 from PIL import Image
+from .cache import CacheInfo, LRUCache
+from .instrumentation import stage
 from .matrix import (
+    _is_batched_factor,
     shearing_matrix,
     rotation_matrix,
     scaling_matrix,
     translation_matrix,
 )
-from .utils import Coordinate, Matrix, left_matmuls, matinv, transform_coordinate
+from .utils import (
+    Coordinate,
+    Coordinates,
+    Matrix,
+    Matrices,
+    left_matmuls,
+    matinv,
+    transform_coordinate,
+    transform_coordinates,
+    batch_left_matmuls,
+    batch_matinv,
+)
 
 __all__ = [
     "AffineTransform",
@@ -16,10 +31,26 @@ __all__ = [
     "Rotate",
     "Scale",
     "Translate",
+    "Identity",
     "ComposedTransform",
+    "CompiledTransform",
+    "Simplification",
 ]
 
 Size = Tuple[int, int]
+Sizes = Union[Sequence[Size], np.ndarray]
+Segment = Tuple[Matrix, bool]
+
+# absolute tolerance for detecting parameters that cancel out
+_TOLERANCE = 1e-9
+
+# Below these numbers of images, the fixed overhead of the vectorized NumPy calls
+# outweighs their gain and looping over the scalar path is faster. Measured for
+# single and chained transforms with and without expand: the complete
+# extraction crosses over between 24 and 48 images, the extraction from already
+# created matrices between 16 and 32 images.
+_MIN_BATCH_SIZE = 32
+_MIN_BATCH_AFFINE_DATA_SIZE = 16
 
 
 def calculate_image_center(size: Size) -> Coordinate:
@@ -37,14 +68,212 @@ def calculate_image_center(size: Size) -> Coordinate:
     return horz_center, vert_center
 
 
+def calculate_bounding_boxes(vertices: Coordinates) -> np.ndarray:
+    """Calculates the axis-aligned bounding boxes of polygons
+
+    Args:
+        vertices: Vertices (x, y) of the polygons of shape (N, K, 2).
+
+    Returns:
+        Bounding boxes (left, top, right, bottom) of shape (N, 4).
+    """
+    return np.concatenate((vertices.min(axis=-2), vertices.max(axis=-2)), axis=-1)
+
+
+def make_hashable(value: Any) -> Hashable:
+    """Converts a transformation parameter into a hashable equivalent.
+
+    Args:
+        value: Parameter. Sequences and arrays are converted into tuples
+            recursively.
+
+    Returns:
+        Hashable parameter.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return tuple(make_hashable(item) for item in value)
+    return value
+
+
+def _ndim(value: Any) -> int:
+    # cheaper than np.ndim() for the common case of Python numbers and tuples
+    if isinstance(value, np.ndarray):
+        return value.ndim
+    if isinstance(value, (list, tuple)):
+        return 1 + _ndim(value[0]) if value else 1
+    return 0
+
+
+def _as_batch(value: Any, ndim: int) -> Any:
+    # parameters with more than ndim dimensions describe a batch of transforms
+    if _ndim(value) > ndim:
+        return np.asarray(value, dtype=np.float64)
+    return value
+
+
+def _is_batch(value: Any, ndim: int) -> bool:
+    return isinstance(value, np.ndarray) and value.ndim > ndim
+
+
+def _format_batch(value: np.ndarray, name: str) -> str:
+    return f"[{len(value)} {name}]"
+
+
+def _check_batch_sizes(num_sizes: int, *nums_params: int) -> int:
+    num = max(num_sizes, *nums_params)
+    if {num_sizes, *nums_params} - {1, num}:
+        raise RuntimeError(
+            f"Got {num_sizes} image sizes, but the transform holds parameters for "
+            f"{max(nums_params)} images."
+        )
+    return num
+
+
+def _is_zero_angle(angle: float) -> bool:
+    angle %= 360.0
+    return isclose(angle, 0.0, abs_tol=_TOLERANCE) or isclose(
+        angle, 360.0, abs_tol=_TOLERANCE
+    )
+
+
 class AffineTransform(ABC):
     """ABC for all affine transformations.
     """
 
+    _cache: Optional[LRUCache] = None
+
     @abstractmethod
     def _create_matrix(self, size: Size) -> Matrix:
         pass
 
+    @abstractmethod
+    def _params(self) -> Hashable:
+        pass
+
+    @abstractmethod
+    def _segments(self) -> Tuple[Segment, ...]:
+        pass
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AffineTransform):
+            return NotImplemented
+        return type(self) is type(other) and self._params() == other._params()
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self._params()))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self.clear_cache()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_cache", None)
+        return state
+
+    def simplify(self) -> "Simplification":
+        """Rewrites the transform into a minimal equivalent chain. Nested
+        :class:`ComposedTransform` s are flattened, consecutive translations as
+        well as consecutive rotations and scalings around the same center are
+        merged, and transforms that do not change the image are removed. If the
+        complete chain cancels out, the result is an :class:`Identity`, for which
+        :func:`~pillow_affine.apply.apply` skips the warp.
+
+        Returns:
+            Simplified transform and the reduction of the number of transforms.
+        """
+        transforms = self._flatten()
+        simplified: List[AffineTransform] = []
+        for transform in transforms:
+            # batched transforms are kept as is
+            if transform._is_batched():
+                simplified.append(transform)
+                continue
+
+            if transform._is_identity():
+                continue
+
+            if simplified and not simplified[-1]._is_batched():
+                merged = simplified[-1]._merge(transform)
+                if merged is not None:
+                    simplified.pop()
+                    if not merged._is_identity():
+                        simplified.append(merged)
+                    continue
+
+            simplified.append(transform)
+
+        if not simplified:
+            simplified_transform: AffineTransform = Identity()
+        elif len(simplified) == 1:
+            simplified_transform = simplified[0]
+        else:
+            simplified_transform = ComposedTransform(*simplified)
+        return Simplification(simplified_transform, len(transforms), len(simplified))
+
+    def _flatten(self) -> Tuple["AffineTransform", ...]:
+        return (self,)
+
+    def _is_identity(self) -> bool:
+        return False
+
+    def _merge(self, other: "AffineTransform") -> Optional["AffineTransform"]:
+        return None
+
+    def _is_batched(self) -> bool:
+        return False
+
+    def _check_not_batched(self) -> None:
+        if self._is_batched():
+            raise RuntimeError(
+                f"{type(self).__name__} holds array-valued parameters and thus can "
+                f"only be used with extract_batch_transform_params()."
+            )
+
+    def compile(self) -> "CompiledTransform":
+        """Flattens the transform and pre-multiplies all parts that do not depend
+        on the image size. The result can be used as drop-in replacement, but
+        evaluates with the minimal number of matrix products.
+
+        Returns:
+            Immutable and picklable compiled transform.
+        """
+        self._check_not_batched()
+        return CompiledTransform(self._segments())
+
+    def enable_cache(self, maxsize: int = 128) -> None:
+        """Enables caching of the results of :meth:`extract_transform_params`. The
+        cache is keyed on the parameters of the transform, the image size, and the
+        ``expand`` flag. Changing a parameter of the transform clears the cache.
+
+        Args:
+            maxsize: Maximum number of cached results. If exceeded the least
+                recently used result is discarded. Defaults to ``128``.
+        """
+        self._cache = LRUCache(maxsize)
+
+    def disable_cache(self) -> None:
+        """Disables and discards the cache enabled by :meth:`enable_cache`."""
+        self._cache = None
+
+    def clear_cache(self) -> None:
+        """Discards all cached results, but keeps the cache enabled."""
+        if self._cache is not None:
+            self._cache.clear()
+
+    def cache_info(self) -> CacheInfo:
+        """Reports the statistics of the cache enabled by :meth:`enable_cache`.
+
+        Returns:
+            Number of hits and misses, maximum and current size.
+        """
+        if self._cache is None:
+            raise RuntimeError("The cache is not enabled.")
+        return self._cache.info()
+
     def extract_transform_params(
         self, size: Size, expand: bool = False
     ) -> Tuple[Size, int, Matrix]:
@@ -76,23 +305,357 @@ class AffineTransform(ABC):
             `Image.transform() <https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.Image.transform>`_
              .
         """
-        transform_matrix = self._create_matrix(size)
+        if self._cache is None:
+            return self._extract_transform_params(size, expand)
+
+        key = (self._params(), (int(size[0]), int(size[1])), expand)
+        transform_params = self._cache.get(key)
+        if transform_params is None:
+            transform_params = self._extract_transform_params(size, expand)
+            self._cache.put(key, transform_params)
+        return transform_params
+
+    def _extract_transform_params(
+        self, size: Size, expand: bool
+    ) -> Tuple[Size, int, Matrix]:
+        expanded_size, transform_matrix = self._extract_transform_matrix(
+            size, expand=expand
+        )
+        with stage("matinv"):
+            data = self._extract_affine_data(transform_matrix)
+        return expanded_size, Image.AFFINE, data
 
-        if expand:
-            expanded_size, transform_matrix = self._expand_canvas(
-                size, transform_matrix
+    def transform_coordinates(
+        self,
+        coordinates: Coordinates,
+        size: Union[Size, Sizes],
+        expand: bool = False,
+    ) -> Coordinates:
+        """Transforms pixel coordinates, e.g. keypoints, of an image the same way
+        the image is transformed by the parameters of
+        :meth:`extract_transform_params`. Both the input and output coordinates
+        are given in the pixel coordinate system of ``Pillow``, i.e. with the
+        origin in the top left corner and the vertical axis pointing downwards.
+
+        Transforms with array-valued parameters, e.g. ``Rotate(angles)``, are
+        evaluated batched and transform the coordinates once for each of the
+        :math:`M` images.
+
+        Args:
+            coordinates: Coordinates (x, y) of shape (N, 2).
+            size: Image size (width, height). For transforms with array-valued
+                parameters, this can also be one size per image of shape (M, 2).
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+
+        Returns:
+            Transformed coordinates of shape (N, 2) or (M, N, 2) for transforms with
+            array-valued parameters.
+        """
+        if not self._is_batched():
+            _, transform_matrix = self._extract_transform_matrix(
+                size, expand=expand  # type: ignore[arg-type]
             )
+            return transform_coordinates(coordinates, transform_matrix)
+
+        sizes = np.asarray(size, dtype=np.int64).reshape(-1, 2)
+        transform_matrices = self._create_matrices(sizes)
+        num = _check_batch_sizes(len(sizes), len(transform_matrices))
+        sizes = np.broadcast_to(sizes, (num, 2))
+        transform_matrices = self._batch_coordinate_system_transform(
+            sizes, np.broadcast_to(transform_matrices, (num, 6))
+        )
+        if expand:
+            _, transform_matrices = self._batch_expand_canvas(sizes, transform_matrices)
+        return transform_coordinates(coordinates, transform_matrices)
+
+    def transform_boxes(
+        self,
+        boxes: np.ndarray,
+        size: Size,
+        expand: bool = False,
+        clip: bool = True,
+        remove_degenerate: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Transforms axis-aligned bounding boxes, e.g. detection annotations, of
+        an image the same way the image is transformed by the parameters of
+        :meth:`extract_transform_params`. Each box is replaced by the axis-aligned
+        box enclosing its transformed corners.
+
+        Args:
+            boxes: Bounding boxes (left, top, right, bottom) in pixel coordinates
+                of shape (N, 4).
+            size: Image size (width, height).
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+            clip: If ``True``, the transformed boxes are clipped to the
+                transformed canvas. Defaults to ``True``.
+            remove_degenerate: If ``True``, boxes without area after the
+                transformation are removed. Defaults to ``False``.
+
+        Returns:
+            Transformed boxes of shape (M, 4) and a boolean mask of shape (N,)
+            indicating which of the input boxes are kept.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        expanded_size, transform_matrix = self._extract_transform_matrix(
+            size, expand=expand
+        )
+
+        lefts, tops, rights, bottoms = boxes.T
+        vertices = np.stack(
+            (
+                np.stack((lefts, tops), axis=-1),
+                np.stack((rights, tops), axis=-1),
+                np.stack((lefts, bottoms), axis=-1),
+                np.stack((rights, bottoms), axis=-1),
+            ),
+            axis=-2,
+        )
+        vertices = transform_coordinates(vertices.reshape(-1, 2), transform_matrix)
+        boxes = calculate_bounding_boxes(vertices.reshape(-1, 4, 2))
+
+        if clip:
+            width, height = expanded_size
+            boxes = np.clip(boxes, 0.0, (width, height, width, height))
+
+        if remove_degenerate:
+            keep = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+            boxes = boxes[keep]
+        else:
+            keep = np.ones(len(boxes), dtype=bool)
+
+        return boxes, keep
+
+    def _extract_transform_matrix(
+        self, size: Size, expand: bool = False
+    ) -> Tuple[Size, Matrix]:
+        self._check_not_batched()
+        with stage("create_matrix"):
+            transform_matrix = self._create_matrix(size)
+
+        with stage("coordinate_system_transform"):
+            transform_matrix = self._coordinate_system_transform(size, transform_matrix)
+
+        if expand:
+            with stage("expand_canvas", size=size) as record:
+                expanded_size, transform_matrix = self._expand_canvas(
+                    size, transform_matrix
+                )
+                if record.enabled:
+                    record.annotate(expanded_size=expanded_size)
+                    area = size[0] * size[1]
+                    # the growth is undefined for empty images
+                    if area > 0:
+                        record.annotate(
+                            area_growth=(expanded_size[0] * expanded_size[1]) / area
+                        )
         else:
             expanded_size = size
 
-        transform_matrix = self._coordinate_system_transform(size, transform_matrix)
+        return expanded_size, transform_matrix
 
-        data = self._extract_affine_data(transform_matrix)
+    def extract_batch_transform_params(
+        self, sizes: Sizes, expand: bool = False
+    ) -> List[Tuple[Size, int, Matrix]]:
+        """Batched version of :meth:`extract_transform_params`. All matrices are
+        composed and inverted at once rather than one image at a time. Transforms
+        with array-valued parameters, e.g. ``Rotate(angles)``, create one matrix
+        per image in a single vectorized call::
 
-        return expanded_size, Image.AFFINE, data
+            transform = transforms.Rotate(generator.uniform(-30.0, 30.0, num))
+            batch_transform_params = transform.extract_batch_transform_params(sizes)
+
+        The vectorized calls have a fixed overhead and only pay off for about 32
+        or more images. Smaller batches are processed one image at a time.
+
+        Args:
+            sizes: Image sizes (width, height) of shape (N, 2). A single size is
+                used for all images.
+            expand: If ``True``, expands the canvas to hold the complete
+                transformed motif. Defaults to ``False``.
+
+        Returns:
+            ``size``, ``method``, and ``data`` parameters for each of the :math:`N`
+            images.
+        """
+        sizes = np.asarray(sizes, dtype=np.int64).reshape(-1, 2)
+        if len(sizes) < _MIN_BATCH_SIZE and not self._is_batched():
+            return [
+                self.extract_transform_params((width, height), expand=expand)
+                for width, height in sizes.tolist()
+            ]
+
+        with stage("create_matrix", batch=len(sizes)):
+            transform_matrices = self._create_matrices(sizes)
+        expanded_sizes, data = self._extract_batch_affine_data(
+            sizes, transform_matrices, expand=expand
+        )
+        return [
+            ((int(width), int(height)), Image.AFFINE, tuple(params.tolist()))
+            for (width, height), params in zip(expanded_sizes, data)
+        ]
+
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        return np.array(
+            [self._create_matrix((int(width), int(height))) for width, height in sizes],
+            dtype=np.float64,
+        ).reshape(-1, 6)
+
+    @staticmethod
+    def _extract_batch_affine_data(
+        sizes: np.ndarray,
+        transform_matrices: Matrices,
+        expand: bool = False,
+        common_canvas: bool = False,
+    ) -> Tuple[np.ndarray, Matrices]:
+        num = _check_batch_sizes(len(sizes), len(transform_matrices))
+        sizes = np.broadcast_to(sizes, (num, 2))
+        transform_matrices = np.broadcast_to(transform_matrices, (num, 6))
+        if num < _MIN_BATCH_AFFINE_DATA_SIZE:
+            return AffineTransform._loop_extract_affine_data(
+                sizes, transform_matrices, expand=expand, common_canvas=common_canvas
+            )
+
+        with stage("coordinate_system_transform", batch=num):
+            transform_matrices = AffineTransform._batch_coordinate_system_transform(
+                sizes, transform_matrices
+            )
+
+        if expand:
+            with stage("expand_canvas", batch=num) as record:
+                (
+                    expanded_sizes,
+                    transform_matrices,
+                ) = AffineTransform._batch_expand_canvas(sizes, transform_matrices)
+                if common_canvas:
+                    # center every motif on the smallest canvas that holds all
+                    canvas_size = expanded_sizes.max(axis=0)
+                    transform_matrices = batch_left_matmuls(
+                        transform_matrices,
+                        translation_matrix((canvas_size - expanded_sizes) / 2.0),
+                    )
+                    expanded_sizes = np.broadcast_to(canvas_size, expanded_sizes.shape)
+                if record.enabled:
+                    # ratio of the total areas for a batch, which is undefined if
+                    # all images are empty
+                    area = np.prod(sizes, axis=1).sum()
+                    if area > 0:
+                        record.annotate(
+                            area_growth=float(
+                                np.prod(expanded_sizes, axis=1).sum() / area
+                            )
+                        )
+        else:
+            expanded_sizes = sizes
+
+        with stage("matinv", batch=num):
+            data = batch_matinv(transform_matrices)
+        return expanded_sizes, data
+
+    @staticmethod
+    def _loop_extract_affine_data(
+        sizes: np.ndarray,
+        transform_matrices: Matrices,
+        expand: bool = False,
+        common_canvas: bool = False,
+    ) -> Tuple[np.ndarray, Matrices]:
+        # scalar counterpart of _extract_batch_affine_data() for small batches
+        num = len(sizes)
+        sizes_ = [(width, height) for width, height in sizes.tolist()]
+        matrices = [
+            (a, b, c, d, e, f) for a, b, c, d, e, f in transform_matrices.tolist()
+        ]
+
+        with stage("coordinate_system_transform", batch=num):
+            matrices = [
+                AffineTransform._coordinate_system_transform(size, matrix)
+                for size, matrix in zip(sizes_, matrices)
+            ]
+
+        if expand:
+            with stage("expand_canvas", batch=num) as record:
+                expanded_sizes = []
+                for idx, (size, matrix) in enumerate(zip(sizes_, matrices)):
+                    expanded_size, matrices[idx] = AffineTransform._expand_canvas(
+                        size, matrix
+                    )
+                    expanded_sizes.append(expanded_size)
+                if common_canvas:
+                    canvas_size = (
+                        max(width for width, _ in expanded_sizes),
+                        max(height for _, height in expanded_sizes),
+                    )
+                    matrices = [
+                        left_matmuls(
+                            matrix,
+                            translation_matrix(
+                                (
+                                    (canvas_size[0] - width) / 2.0,
+                                    (canvas_size[1] - height) / 2.0,
+                                )
+                            ),
+                        )
+                        for (width, height), matrix in zip(expanded_sizes, matrices)
+                    ]
+                    expanded_sizes = [canvas_size] * num
+                if record.enabled:
+                    area = sum(width * height for width, height in sizes_)
+                    if area > 0:
+                        expanded_area = sum(
+                            width * height for width, height in expanded_sizes
+                        )
+                        record.annotate(area_growth=expanded_area / area)
+        else:
+            expanded_sizes = sizes_
+
+        with stage("matinv", batch=num):
+            data = [matinv(matrix) for matrix in matrices]
+        return (
+            np.array(expanded_sizes, dtype=np.int64).reshape(-1, 2),
+            np.array(data, dtype=np.float64).reshape(-1, 6),
+        )
+
+    @staticmethod
+    def _batch_expand_canvas(
+        sizes: np.ndarray, transform_matrices: Matrices
+    ) -> Tuple[np.ndarray, Matrices]:
+        widths, heights = sizes.T.astype(np.float64)
+        zeros = np.zeros_like(widths)
+        xs = np.stack((zeros, widths, zeros, widths), axis=-1)
+        ys = np.stack((zeros, zeros, heights, heights), axis=-1)
+
+        image_vertices = np.stack((xs, ys), axis=-1)
+        motif_vertices = transform_coordinates(image_vertices, transform_matrices)
+
+        lefts, uppers, rights, lowers = calculate_bounding_boxes(motif_vertices).T
+        expanded_sizes = np.stack(
+            (np.ceil(rights) - np.floor(lefts), np.ceil(lowers) - np.floor(uppers)),
+            axis=-1,
+        ).astype(np.int64)
+
+        translations = (expanded_sizes - sizes) / 2.0
+        ones = np.ones_like(widths)
+        matrices = np.stack(
+            (ones, zeros, translations[:, 0], zeros, ones, translations[:, 1]), axis=-1
+        )
+        return expanded_sizes, batch_left_matmuls(transform_matrices, matrices)
+
+    @staticmethod
+    def _batch_coordinate_system_transform(
+        sizes: np.ndarray, transform_matrices: Matrices
+    ) -> Matrices:
+        heights = sizes[:, 1].astype(np.float64)
+        ones = np.ones_like(heights)
+        zeros = np.zeros_like(heights)
+        matrices = np.stack((ones, zeros, zeros, zeros, -ones, heights), axis=-1)
+        return batch_left_matmuls(matrices, transform_matrices, batch_matinv(matrices))
 
     @staticmethod
     def _expand_canvas(size: Size, transform_matrix: Matrix) -> Tuple[Size, Matrix]:
+        # Operates in the pixel coordinate system. Since the vertical flip of
+        # _coordinate_system_transform() maps the image onto itself, the size of
+        # the bounding box of the motif is the same in both coordinate systems.
         def calculate_motif_vertices(transform_matrix: Matrix) -> Sequence[Coordinate]:
             width, height = size
             image_vertices = ((0.0, 0.0), (width, 0.0), (0.0, height), (width, height))
@@ -104,21 +667,21 @@ class AffineTransform(ABC):
         def calculate_expanded_size(motif_vertices: Sequence[Coordinate]) -> Size:
             xs, ys = zip(*motif_vertices)
             left = floor(min(xs))
-            bottom = floor(min(ys))
+            upper = floor(min(ys))
             right = ceil(max(xs))
-            top = ceil(max(ys))
+            lower = ceil(max(ys))
 
             expanded_width = right - left
-            expanded_height = top - bottom
+            expanded_height = lower - upper
             return expanded_width, expanded_height
 
         def recenter_motif(expanded_size: Size, transform_matrix: Matrix) -> Matrix:
+            # the motif is centered on the image center, so it is moved onto the
+            # center of the expanded canvas
             matrix = left_matmuls(
                 translation_matrix(calculate_image_center(size), inverse=True),
                 translation_matrix(calculate_image_center(expanded_size)),
             )
-            # TODO: Investigate and document why this extra step is needed
-            matrix = AffineTransform._coordinate_system_transform(size, matrix)
             return left_matmuls(transform_matrix, matrix)
 
         motif_vertices = calculate_motif_vertices(transform_matrix)
@@ -147,6 +710,33 @@ class AffineTransform(ABC):
             translation_matrix(coordinate, inverse=False),
         )
 
+    @staticmethod
+    def _batch_off_center_transform(
+        sizes: np.ndarray,
+        center: Optional[Union[Coordinate, Coordinates]],
+        transform_matrices: Matrices,
+    ) -> Matrices:
+        if center is None:
+            centers = sizes / 2.0
+        else:
+            centers = np.asarray(center, dtype=np.float64).reshape(-1, 2)
+        _check_batch_sizes(len(sizes), len(centers), len(transform_matrices))
+        horz_centers, vert_centers = centers.T
+
+        a, b, c, d, e, f = np.moveaxis(transform_matrices, -1, 0)
+        c = c + horz_centers - a * horz_centers - b * vert_centers
+        f = f + vert_centers - d * horz_centers - e * vert_centers
+        return np.stack(np.broadcast_arrays(a, b, c, d, e, f), axis=-1)
+
+    @staticmethod
+    def _off_center_segments(
+        center: Optional[Coordinate], transform_matrix: Matrix
+    ) -> Tuple[Segment, ...]:
+        if center is None:
+            return ((transform_matrix, True),)
+        matrix = AffineTransform._off_center_transform(center, transform_matrix)
+        return ((matrix, False),)
+
 
 class ElementaryTransform(AffineTransform):
     @abstractmethod
@@ -164,22 +754,27 @@ class Shear(ElementaryTransform):
     """Affine horizontal shearing transformation.
 
     Args:
-        angle: Shearing angle in degrees.
+        angle: Shearing angle in degrees. Can also be an array of shape (N,) with
+            one angle per image.
         clockwise: If ``True``, the shearing will be performed clockwise.
             Defaults to ``False``.
         center: Optional center of the shearing. Defaults to the center of
-            the image.
+            the image. Can also be an array of shape (N, 2) with one center per
+            image.
+
+    Array-valued parameters describe one transformation per image of a batch. Such
+    transforms can only be used with :meth:`extract_batch_transform_params`.
     """
 
     def __init__(
         self,
-        angle: float,
+        angle: Union[float, np.ndarray],
         clockwise: bool = False,
-        center: Optional[Coordinate] = None,
+        center: Optional[Union[Coordinate, np.ndarray]] = None,
     ):
-        self.angle = angle % 360.0
+        self.angle = _as_batch(angle, 0) % 360.0
         self.clockwise = clockwise
-        self.center = center
+        self.center = _as_batch(center, 1)
 
     def _create_matrix(self, size: Size) -> Matrix:
         matrix = shearing_matrix(self.angle, clockwise=self.clockwise)
@@ -190,11 +785,39 @@ class Shear(ElementaryTransform):
         matrix = self._off_center_transform(center, matrix)
         return matrix
 
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        matrices = shearing_matrix(np.atleast_1d(self.angle), clockwise=self.clockwise)
+        return self._batch_off_center_transform(sizes, self.center, matrices)
+
+    def _is_batched(self) -> bool:
+        # exact type checks, since this runs for every scalar extraction as well.
+        # Batched parameters are always converted into plain arrays.
+        angle, center = self.angle, self.center
+        return (type(angle) is np.ndarray and angle.ndim > 0) or (
+            type(center) is np.ndarray and center.ndim > 1
+        )
+
+    def _params(self) -> Hashable:
+        return make_hashable((self.angle, self.clockwise, self.center))
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return self._off_center_segments(
+            self.center, shearing_matrix(self.angle, clockwise=self.clockwise)
+        )
+
+    def _is_identity(self) -> bool:
+        return _is_zero_angle(self.angle)
+
     def _extra_repr(self) -> str:
-        extras = [f"{self.angle:4.1f}°"]
+        if _is_batch(self.angle, 0):
+            extras = [_format_batch(self.angle, "angles")]
+        else:
+            extras = [f"{self.angle:4.1f}°"]
         if self.clockwise:
             extras.append(f"clockwise={self.clockwise}")
-        if self.center is not None:
+        if _is_batch(self.center, 1):
+            extras.append(f"center={_format_batch(self.center, 'centers')}")
+        elif self.center is not None:
             extras.append(f"center={self.center}")
         return ", ".join(extras)
 
@@ -203,22 +826,26 @@ class Rotate(ElementaryTransform):
     """Affine rotation transformation.
 
     Args:
-        angle: Rotation angle in degrees.
+        angle: Rotation angle in degrees. Can also be an array of shape (N,) with
+            one angle per image.
         clockwise: If ``True``, the rotation will be performed clockwise.
             Defaults to ``False``.
         center: Optional center of the rotation. Defaults to the center of the
-            image.
+            image. Can also be an array of shape (N, 2) with one center per image.
+
+    Array-valued parameters describe one transformation per image of a batch. Such
+    transforms can only be used with :meth:`extract_batch_transform_params`.
     """
 
     def __init__(
         self,
-        angle: float,
+        angle: Union[float, np.ndarray],
         clockwise: bool = False,
-        center: Optional[Coordinate] = None,
+        center: Optional[Union[Coordinate, np.ndarray]] = None,
     ):
-        self.angle = angle % 360.0
+        self.angle = _as_batch(angle, 0) % 360.0
         self.clockwise = clockwise
-        self.center = center
+        self.center = _as_batch(center, 1)
 
     def _create_matrix(self, size: Size) -> Matrix:
         matrix = rotation_matrix(self.angle, clockwise=self.clockwise)
@@ -229,11 +856,50 @@ class Rotate(ElementaryTransform):
         matrix = self._off_center_transform(center, matrix)
         return matrix
 
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        matrices = rotation_matrix(np.atleast_1d(self.angle), clockwise=self.clockwise)
+        return self._batch_off_center_transform(sizes, self.center, matrices)
+
+    def _is_batched(self) -> bool:
+        # exact type checks, since this runs for every scalar extraction as well.
+        # Batched parameters are always converted into plain arrays.
+        angle, center = self.angle, self.center
+        return (type(angle) is np.ndarray and angle.ndim > 0) or (
+            type(center) is np.ndarray and center.ndim > 1
+        )
+
+    def _params(self) -> Hashable:
+        return make_hashable((self.angle, self.clockwise, self.center))
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return self._off_center_segments(
+            self.center, rotation_matrix(self.angle, clockwise=self.clockwise)
+        )
+
+    def _is_identity(self) -> bool:
+        return _is_zero_angle(self.angle)
+
+    def _merge(self, other: AffineTransform) -> Optional[AffineTransform]:
+        if not isinstance(other, Rotate):
+            return None
+        # centers might be arrays, which cannot be compared directly
+        if make_hashable(other.center) != make_hashable(self.center):
+            return None
+        return Rotate(self._signed_angle() + other._signed_angle(), center=self.center)
+
+    def _signed_angle(self) -> float:
+        return -self.angle if self.clockwise else self.angle
+
     def _extra_repr(self) -> str:
-        extras = [f"{self.angle:4.1f}°"]
+        if _is_batch(self.angle, 0):
+            extras = [_format_batch(self.angle, "angles")]
+        else:
+            extras = [f"{self.angle:4.1f}°"]
         if self.clockwise:
             extras.append(f"clockwise={self.clockwise}")
-        if self.center is not None:
+        if _is_batch(self.center, 1):
+            extras.append(f"center={_format_batch(self.center, 'centers')}")
+        elif self.center is not None:
             extras.append(f"center={self.center}")
         return ", ".join(extras)
 
@@ -243,18 +909,24 @@ class Scale(ElementaryTransform):
 
     Args:
         factor: Horizontal and vertical scaling factors. If scalar, the
-            same factor is used for both directions.
+            same factor is used for both directions. Can also be an array of shape
+            (N,) or (N, 2) with the factors of each image.
         center: Optional center of the scaling. Defaults to the center of
-            the image.
+            the image. Can also be an array of shape (N, 2) with one center per
+            image.
+
+    Array-valued parameters describe one transformation per image of a batch. Such
+    transforms can only be used with :meth:`extract_batch_transform_params`.
     """
 
     def __init__(
         self,
-        factor: Union[float, Tuple[float, float]],
-        center: Optional[Coordinate] = None,
+        factor: Union[float, Tuple[float, float], np.ndarray],
+        center: Optional[Union[Coordinate, np.ndarray]] = None,
     ):
-        self.factor = factor
-        self.center = center
+        # tuples and lists hold the horizontal and vertical factor of one image
+        self.factor = _as_batch(factor, 1 if isinstance(factor, (tuple, list)) else 0)
+        self.center = _as_batch(center, 1)
 
     def _create_matrix(self, size: Size) -> Matrix:
         matrix = scaling_matrix(self.factor)
@@ -265,19 +937,67 @@ class Scale(ElementaryTransform):
         matrix = self._off_center_transform(center, matrix)
         return matrix
 
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        if _is_batched_factor(self.factor):
+            matrices = scaling_matrix(self.factor)
+        else:
+            matrices = np.asarray(scaling_matrix(self.factor))[None, :]
+        return self._batch_off_center_transform(sizes, self.center, matrices)
+
+    def _is_batched(self) -> bool:
+        factor, center = self.factor, self.center
+        return (type(factor) is np.ndarray and factor.ndim > 0) or (
+            type(center) is np.ndarray and center.ndim > 1
+        )
+
+    def _params(self) -> Hashable:
+        return make_hashable((self.factor, self.center))
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return self._off_center_segments(self.center, scaling_matrix(self.factor))
+
+    def _is_identity(self) -> bool:
+        return all(
+            isclose(factor, 1.0, abs_tol=_TOLERANCE) for factor in self._factors()
+        )
+
+    def _merge(self, other: AffineTransform) -> Optional[AffineTransform]:
+        if not isinstance(other, Scale):
+            return None
+        # centers might be arrays, which cannot be compared directly
+        if make_hashable(other.center) != make_hashable(self.center):
+            return None
+        if _ndim(self.factor) == 0 and _ndim(other.factor) == 0:
+            return Scale(self.factor * other.factor, center=self.center)
+
+        horz_factor1, vert_factor1 = self._factors()
+        horz_factor2, vert_factor2 = other._factors()
+        factor = (horz_factor1 * horz_factor2, vert_factor1 * vert_factor2)
+        return Scale(factor, center=self.center)
+
+    def _factors(self) -> Tuple[float, float]:
+        if _ndim(self.factor) == 0:
+            return self.factor, self.factor
+        horz_factor, vert_factor = self.factor
+        return horz_factor, vert_factor
+
     def _extra_repr(self) -> str:
         def format_factor(factor: float) -> str:
             return f"{factor:.2f}"
 
         extras = []
-        if isinstance(self.factor, float):
+        if _is_batched_factor(self.factor):
+            extras.append(_format_batch(self.factor, "factors"))
+        elif _ndim(self.factor) == 0:
             extras.append(format_factor(self.factor))
         else:
             horz_factor, vert_factor = [
                 format_factor(dim_factor) for dim_factor in self.factor
             ]
             extras.append(f"({horz_factor}, {vert_factor})")
-        if self.center is not None:
+        if _is_batch(self.center, 1):
+            extras.append(f"center={_format_batch(self.center, 'centers')}")
+        elif self.center is not None:
             extras.append(f"center={self.center}")
         return ", ".join(extras)
 
@@ -286,25 +1006,89 @@ class Translate(ElementaryTransform):
     """Affine translation transformation
 
     Args:
-        translation: Horizontal and vertical translation.
+        translation: Horizontal and vertical translation. Can also be an array of
+            shape (N, 2) with one translation per image.
         inverse: If ``True``, the translation will be performed in the
             opposite direction. Defaults to ``False``.
+
+    Array-valued parameters describe one transformation per image of a batch. Such
+    transforms can only be used with :meth:`extract_batch_transform_params`.
     """
 
-    def __init__(self, translation: Coordinate, inverse: bool = False) -> None:
-        self.translation = translation
+    def __init__(
+        self, translation: Union[Coordinate, np.ndarray], inverse: bool = False
+    ) -> None:
+        self.translation = _as_batch(translation, 1)
         self.inverse = inverse
 
     def _create_matrix(self, size: Size) -> Matrix:
         return translation_matrix(self.translation, inverse=self.inverse)
 
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        return translation_matrix(
+            np.reshape(self.translation, (-1, 2)), inverse=self.inverse
+        )
+
+    def _is_batched(self) -> bool:
+        translation = self.translation
+        return type(translation) is np.ndarray and translation.ndim > 1
+
+    def _params(self) -> Hashable:
+        return make_hashable((self.translation, self.inverse))
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return ((self._create_matrix((0, 0)), False),)
+
+    def _is_identity(self) -> bool:
+        return all(
+            isclose(coord, 0.0, abs_tol=_TOLERANCE) for coord in self.translation
+        )
+
+    def _merge(self, other: AffineTransform) -> Optional[AffineTransform]:
+        if not isinstance(other, Translate):
+            return None
+        horz_translation1, vert_translation1 = self._signed_translation()
+        horz_translation2, vert_translation2 = other._signed_translation()
+        translation = (
+            horz_translation1 + horz_translation2,
+            vert_translation1 + vert_translation2,
+        )
+        return Translate(translation)
+
+    def _signed_translation(self) -> Coordinate:
+        horz_translation, vert_translation = self.translation
+        if self.inverse:
+            return -horz_translation, -vert_translation
+        return horz_translation, vert_translation
+
     def _extra_repr(self) -> str:
-        extras = [f"{tuple([round(coord, 1) for coord in self.translation])}"]
+        if _is_batch(self.translation, 1):
+            extras = [_format_batch(self.translation, "translations")]
+        else:
+            extras = [f"{tuple([round(coord, 1) for coord in self.translation])}"]
         if self.inverse:
             extras.append(f"inverse={self.inverse}")
         return ", ".join(extras)
 
 
+class Identity(ElementaryTransform):
+    """Affine identity transformation, which leaves the image unchanged. It is the
+    result of :meth:`AffineTransform.simplify` for chains that cancel out.
+    """
+
+    def _create_matrix(self, size: Size) -> Matrix:
+        return (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+    def _params(self) -> Hashable:
+        return ()
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return ((self._create_matrix((0, 0)), False),)
+
+    def _is_identity(self) -> bool:
+        return True
+
+
 class ComposedTransform(AffineTransform):
     """Composed affine transformation by chaining multiple
     :class:`AffineTransform` s together. An simple example might look like::
@@ -335,6 +1119,37 @@ class ComposedTransform(AffineTransform):
             *[transform._create_matrix(size) for transform in self.transforms]
         )
 
+    def _create_matrices(self, sizes: np.ndarray) -> Matrices:
+        matrices = [transform._create_matrices(sizes) for transform in self.transforms]
+        _check_batch_sizes(len(sizes), *[len(matrix) for matrix in matrices])
+        return batch_left_matmuls(*matrices)
+
+    def _params(self) -> Hashable:
+        return tuple(
+            (type(transform).__name__, transform._params())
+            for transform in self.transforms
+        )
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return tuple(
+            segment
+            for transform in self.transforms
+            for segment in transform._segments()
+        )
+
+    def _flatten(self) -> Tuple[AffineTransform, ...]:
+        return tuple(
+            flat_transform
+            for transform in self.transforms
+            for flat_transform in transform._flatten()
+        )
+
+    def _is_batched(self) -> bool:
+        for transform in self.transforms:
+            if transform._is_batched():
+                return True
+        return False
+
     def __repr__(self) -> str:
         head = f"{self.__class__.__name__}("
         tail = ")"
@@ -344,3 +1159,94 @@ class ComposedTransform(AffineTransform):
 
         body = [" " * 2 + repr(transform) for transform in self.transforms]
         return "\n".join((head, *body, tail))
+
+
+class CompiledTransform(AffineTransform):
+    """Flattened and fused affine transformation. Consecutive parts that either do
+    not depend on the image size or share the image center as center of the
+    transformation are pre-multiplied. Usually created by
+    :meth:`AffineTransform.compile` ::
+
+        from PIL import Image
+        from pillow_affine import transforms
+
+        image = Image.open(...)
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Translate((50.0, 100.0))
+        ).compile()
+
+        transform_params = transform.extract_transform_params(image.size)
+        transformed_image = image.transform(*transform_params)
+
+    Args:
+        segments: Matrices in the order of application each paired with a flag
+            whether the matrix has to be applied around the image center.
+    """
+
+    segments: Tuple[Segment, ...]
+
+    def __init__(self, segments: Sequence[Segment]) -> None:
+        if len(segments) == 0:
+            msg = "A CompiledTransform must comprise at least one segment."
+            raise RuntimeError(msg)
+
+        fused: List[Segment] = []
+        for matrix, centered in segments:
+            if fused and fused[-1][1] == centered:
+                matrix = left_matmuls(fused.pop()[0], matrix)
+            a, b, c, d, e, f = [float(param) for param in matrix]
+            fused.append(((a, b, c, d, e, f), centered))
+        super().__setattr__("segments", tuple(fused))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name != "_cache":
+            raise AttributeError(f"{self.__class__.__name__} is immutable.")
+        super().__setattr__(name, value)
+
+    def __reduce__(self) -> Tuple[type, Tuple[Tuple[Segment, ...]]]:
+        return self.__class__, (self.segments,)
+
+    def _create_matrix(self, size: Size) -> Matrix:
+        horz_center, vert_center = calculate_image_center(size)
+        matrices = []
+        for matrix, centered in self.segments:
+            if centered:
+                a, b, c, d, e, f = matrix
+                c += horz_center - a * horz_center - b * vert_center
+                f += vert_center - d * horz_center - e * vert_center
+                matrix = (a, b, c, d, e, f)
+            matrices.append(matrix)
+        if len(matrices) == 1:
+            return matrices[0]
+        return left_matmuls(*matrices)
+
+    def _params(self) -> Hashable:
+        return self.segments
+
+    def _segments(self) -> Tuple[Segment, ...]:
+        return self.segments
+
+    def __repr__(self) -> str:
+        num_segments = len(self.segments)
+        return f"{self.__class__.__name__}({num_segments} segment{'s' if num_segments > 1 else ''})"
+
+
+class Simplification(NamedTuple):
+    """Result of :meth:`AffineTransform.simplify`.
+
+    Args:
+        transform: Simplified transform.
+        num_transforms: Number of elementary transforms before the
+            simplification.
+        num_simplified_transforms: Number of elementary transforms after the
+            simplification.
+    """
+
+    transform: AffineTransform
+    num_transforms: int
+    num_simplified_transforms: int
+
+    @property
+    def is_identity(self) -> bool:
+        """``True`` if the complete chain cancels out."""
+        return self.num_simplified_transforms == 0
@@ -1,19 +1,34 @@
-from typing import Tuple
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
 from functools import reduce
-from math import pi
+from math import pi, floor, hypot
+import numpy as np
 
 __all__ = [
     "Coordinate",
+    "Coordinates",
+    "Box",
     "Matrix",
+    "Matrices",
     "matmul",
     "left_matmuls",
     "matinv",
+    "batch_matmul",
+    "batch_left_matmuls",
+    "batch_matinv",
     "deg2rad",
     "transform_coordinate",
+    "transform_coordinates",
+    "calculate_source_box",
+    "offset_affine_data",
+    "calculate_singular_values",
+    "AffineMatrix",
 ]
 
 Coordinate = Tuple[float, float]
 Matrix = Tuple[float, float, float, float, float, float]
+Matrices = np.ndarray
+Coordinates = np.ndarray
+Box = Tuple[int, int, int, int]
 
 
 def matmul(matrix1: Matrix, matrix2: Matrix) -> Matrix:
@@ -144,6 +159,82 @@ def matinv(matrix: Matrix) -> Matrix:
     return (ainv, binv, cinv, dinv, einv, finv)
 
 
+def batch_matmul(matrices1: Matrices, matrices2: Matrices) -> Matrices:
+    r"""Batched version of :func:`matmul`. Both inputs are broadcasted against each
+    other.
+
+    Args:
+        matrices1: Parameters :math:`a_1`, :math:`b_1`, :math:`c_1`, :math:`d_1`,
+            :math:`e_1`, :math:`f_1` stacked along the last dimension, i.e. of shape
+            (6,) or (N, 6).
+        matrices2: Parameters :math:`a_2`, :math:`b_2`, :math:`c_2`, :math:`d_2`,
+            :math:`e_2`, :math:`f_2` stacked along the last dimension, i.e. of shape
+            (6,) or (N, 6).
+
+    Returns:
+        Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
+        :math:`f` stacked along the last dimension.
+    """
+    matrices1 = np.asarray(matrices1, dtype=np.float64)
+    matrices2 = np.asarray(matrices2, dtype=np.float64)
+    a1, b1, c1, d1, e1, f1 = np.moveaxis(matrices1, -1, 0)
+    a2, b2, c2, d2, e2, f2 = np.moveaxis(matrices2, -1, 0)
+
+    a = a1 * a2 + b1 * d2
+    b = a1 * b2 + b1 * e2
+    c = a1 * c2 + b1 * f2 + c1
+    d = d1 * a2 + e1 * d2
+    e = d1 * b2 + e1 * e2
+    f = d1 * c2 + e1 * f2 + f1
+
+    return np.stack(np.broadcast_arrays(a, b, c, d, e, f), axis=-1)
+
+
+def batch_left_matmuls(*matrices: Matrices) -> Matrices:
+    r"""Batched version of :func:`left_matmuls`. All inputs are broadcasted against
+    each other.
+
+    Args:
+        *matrices: Parameters :math:`a_n`, :math:`b_n`, :math:`c_n`, :math:`d_n`,
+            :math:`e_n`, :math:`f_n` of each matrix stacked along the last
+            dimension, i.e. of shape (6,) or (N, 6).
+
+    Returns:
+        Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
+        :math:`f` stacked along the last dimension.
+    """
+    return reduce(
+        lambda matrices1, matrices2: batch_matmul(matrices2, matrices1), matrices
+    )
+
+
+def batch_matinv(matrices: Matrices) -> Matrices:
+    r"""Batched version of :func:`matinv`.
+
+    Args:
+        matrices: Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
+            :math:`f` stacked along the last dimension, i.e. of shape (6,) or
+            (N, 6).
+
+    Returns:
+        Parameters :math:`a^\prime`, :math:`b^\prime`, :math:`c^\prime`,
+        :math:`d^\prime`, :math:`e^\prime`, :math:`f^\prime` stacked along the
+        last dimension.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    a, b, c, d, e, f = np.moveaxis(matrices, -1, 0)
+
+    det = a * e - b * d
+    ainv = e / det
+    binv = -b / det
+    cinv = (b * f - c * e) / det
+    dinv = -d / det
+    einv = a / det
+    finv = (c * d - a * f) / det
+
+    return np.stack((ainv, binv, cinv, dinv, einv, finv), axis=-1)
+
+
 def deg2rad(angle_in_deg: float) -> float:
     """Converts an angle from degrees to radians
 
@@ -196,3 +287,266 @@ def transform_coordinate(coordinate: Coordinate, matrix: Matrix) -> Coordinate:
     ytrans = d * x + e * y + f
 
     return (xtrans, ytrans)
+
+
+def transform_coordinates(
+    coordinates: Coordinates, matrices: Union[Matrix, Matrices]
+) -> Coordinates:
+    r"""Batched version of :func:`transform_coordinate`.
+
+    Args:
+        coordinates: Coordinates (:math:`x`, :math:`y`) of shape (N, 2).
+        matrices: Affine parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`,
+            :math:`e`, :math:`f` of shape (6,) or a stack of them of shape (M, 6).
+
+    Returns:
+        Transformed coordinates (:math:`x^\prime`, :math:`y^\prime`) of shape
+        (N, 2) or (M, N, 2) if a stack of matrices is passed.
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    matrices = np.asarray(matrices, dtype=np.float64)
+    x, y = np.moveaxis(coordinates, -1, 0)
+    a, b, c, d, e, f = np.moveaxis(matrices[..., None, :], -1, 0)
+
+    xtrans = a * x + b * y + c
+    ytrans = d * x + e * y + f
+
+    return np.stack((xtrans, ytrans), axis=-1)
+
+
+def calculate_source_box(data: Matrix, box: Box, margin: int = 0) -> Box:
+    r"""Calculates the region of the input image that is read if the ``data``
+    parameters of an affine transformation are passed to ``Image.transform()``.
+
+    Args:
+        data: Affine parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`,
+            :math:`e`, :math:`f` that map output to input coordinates.
+        box: Region (left, upper, right, lower) of the output image.
+        margin: Additional pixels on each side, e.g. for the support of the
+            resampling filter. Defaults to ``0``.
+
+    Returns:
+        Region (left, upper, right, lower) of the input image. It is not clipped
+        to the bounds of the input image.
+    """
+    left, upper, right, lower = box
+    # Pillow samples at the centers of the output pixels
+    vertices = [
+        transform_coordinate((x + 0.5, y + 0.5), data)
+        for x in (left, right - 1)
+        for y in (upper, lower - 1)
+    ]
+    xs, ys = zip(*vertices)
+    return (
+        floor(min(xs)) - margin,
+        floor(min(ys)) - margin,
+        floor(max(xs)) + 1 + margin,
+        floor(max(ys)) + 1 + margin,
+    )
+
+
+def offset_affine_data(
+    data: Matrix,
+    output_offset: Tuple[int, int] = (0, 0),
+    input_offset: Tuple[int, int] = (0, 0),
+) -> Matrix:
+    r"""Adapts the ``data`` parameters of an affine transformation to crops of the
+    output and input image.
+
+    Args:
+        data: Affine parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`,
+            :math:`e`, :math:`f` that map output to input coordinates.
+        output_offset: Upper left corner of the output crop. Defaults to
+            ``(0, 0)``.
+        input_offset: Upper left corner of the input crop. Defaults to ``(0, 0)``.
+
+    Returns:
+        Affine parameters that map the output crop to the input crop.
+    """
+    a, b, c, d, e, f = data
+    horz_output_offset, vert_output_offset = output_offset
+    horz_input_offset, vert_input_offset = input_offset
+
+    c += a * horz_output_offset + b * vert_output_offset - horz_input_offset
+    f += d * horz_output_offset + e * vert_output_offset - vert_input_offset
+
+    return (a, b, c, d, e, f)
+
+
+def calculate_singular_values(matrix: Matrix) -> Tuple[float, float]:
+    r"""Calculates the singular values of the linear part
+
+    .. math::
+
+        \begin{pmatrix}
+            a & b \\
+            d & e \\
+        \end{pmatrix}
+
+    of an affine ``matrix``. They are the maximum and minimum scaling factors the
+    ``matrix`` applies to any direction.
+
+    Args:
+        matrix: Affine parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`,
+            :math:`e`, :math:`f`.
+
+    Returns:
+        Largest and smallest singular value.
+    """
+    a, b, _, d, e, _ = matrix
+    q = hypot((a + e) / 2.0, (d - b) / 2.0)
+    r = hypot((a - e) / 2.0, (d + b) / 2.0)
+    return q + r, abs(q - r)
+
+
+class AffineMatrix:
+    r"""Immutable affine matrix
+
+    .. math::
+
+        \begin{pmatrix}
+            a & b & c \\
+            d & e & f \\
+            0 & 0 & 1 \\
+        \end{pmatrix}
+
+    Derived properties such as the :attr:`inverse` are computed on first access
+    and cached afterwards. The matrix behaves like the tuple of its parameters
+    and thus can be passed wherever a :data:`Matrix` is expected. Matrices are
+    composed with the ``@`` operator.
+
+    The predicates :attr:`is_identity`, :attr:`is_translation`, and
+    :attr:`is_axis_aligned` tolerate absolute deviations up to ``1e-9`` to absorb
+    the round-off errors of composed matrices.
+
+    Args:
+        params: Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`,
+            :math:`e`, :math:`f`. Defaults to the identity.
+    """
+
+    __slots__ = (
+        "_params",
+        "_inverse",
+        "_det",
+        "_singular_values",
+        "_is_translation",
+        "_is_identity",
+        "_is_axis_aligned",
+    )
+
+    _TOLERANCE = 1e-9
+
+    def __init__(
+        self, params: Iterable[float] = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+    ) -> None:
+        a, b, c, d, e, f = params
+        self._params: Matrix = (a, b, c, d, e, f)
+        self._inverse: Optional[AffineMatrix] = None
+        self._det: Optional[float] = None
+        self._singular_values: Optional[Tuple[float, float]] = None
+        self._is_translation: Optional[bool] = None
+        self._is_identity: Optional[bool] = None
+        self._is_axis_aligned: Optional[bool] = None
+
+    @property
+    def params(self) -> Matrix:
+        """Parameters :math:`a`, :math:`b`, :math:`c`, :math:`d`, :math:`e`,
+        :math:`f`, e.g. for ``Image.transform()``."""
+        return self._params
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._params)
+
+    def __len__(self) -> int:
+        return 6
+
+    def __getitem__(self, idx: int) -> float:
+        return self._params[idx]
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AffineMatrix):
+            return NotImplemented
+        return self._params == other._params
+
+    def __hash__(self) -> int:
+        return hash(self._params)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self), (self._params,)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self._params}"
+
+    def __matmul__(self, other: Union["AffineMatrix", Matrix]) -> "AffineMatrix":
+        if isinstance(other, AffineMatrix):
+            other = other._params
+        return AffineMatrix(matmul(self._params, other))
+
+    def __rmatmul__(self, other: Matrix) -> "AffineMatrix":
+        return AffineMatrix(matmul(other, self._params))
+
+    @property
+    def det(self) -> float:
+        """Determinant."""
+        if self._det is None:
+            a, b, _, d, e, _ = self._params
+            self._det = a * e - b * d
+        return self._det
+
+    @property
+    def inverse(self) -> "AffineMatrix":
+        """Inverse matrix. Raises a ``RuntimeError`` if the matrix is singular."""
+        if self._inverse is None:
+            if self.det == 0.0:
+                raise RuntimeError("The affine matrix is singular.")
+            inverse = AffineMatrix(matinv(self._params))
+            inverse._inverse = self
+            self._inverse = inverse
+        return self._inverse
+
+    @property
+    def singular_values(self) -> Tuple[float, float]:
+        """Largest and smallest singular value of the linear part. See
+        :func:`calculate_singular_values`."""
+        if self._singular_values is None:
+            self._singular_values = calculate_singular_values(self._params)
+        return self._singular_values
+
+    @property
+    def is_translation(self) -> bool:
+        """``True`` if the linear part is the identity."""
+        if self._is_translation is None:
+            a, b, _, d, e, _ = self._params
+            tolerance = self._TOLERANCE
+            self._is_translation = (
+                abs(a - 1.0) <= tolerance
+                and abs(b) <= tolerance
+                and abs(d) <= tolerance
+                and abs(e - 1.0) <= tolerance
+            )
+        return self._is_translation
+
+    @property
+    def is_identity(self) -> bool:
+        """``True`` if the matrix is the identity."""
+        if self._is_identity is None:
+            _, _, c, _, _, f = self._params
+            tolerance = self._TOLERANCE
+            self._is_identity = (
+                self.is_translation and abs(c) <= tolerance and abs(f) <= tolerance
+            )
+        return self._is_identity
+
+    @property
+    def is_axis_aligned(self) -> bool:
+        """``True`` if the matrix maps the coordinate axes onto the coordinate
+        axes, i.e. axis-aligned boxes onto axis-aligned boxes. This is the case
+        for a linear part that is either diagonal, e.g. scalings and flips, or
+        anti-diagonal, e.g. rotations by 90 degrees."""
+        if self._is_axis_aligned is None:
+            a, b, _, d, e, _ = self._params
+            tolerance = self._TOLERANCE
+            self._is_axis_aligned = (abs(b) <= tolerance and abs(d) <= tolerance) or (
+                abs(a) <= tolerance and abs(e) <= tolerance
+            )
+        return self._is_axis_aligned
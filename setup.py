@@ -10,7 +10,7 @@ with open(path.join(here, "pillow_affine", "__about__.py"), "r") as fh:
 with open(path.join(here, "README.md"), "r") as fh:
     long_description = fh.read()
 
-install_requires = ("Pillow",)
+install_requires = ("Pillow", "numpy")
 
 type_check_requires = ("mypy",)
 
@@ -0,0 +1,159 @@
+from os import path
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+from threading import Event, Lock
+import unittest
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.aio import AsyncTransformer, apply_async, apply_many_async
+from pillow_affine.apply import apply
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+async def collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def test_apply_async(self):
+        image = self.load_image()
+        transform = transforms.Rotate(30.0)
+
+        actual = run(apply_async(image, transform, expand=True))
+        desired = apply(image, transform, expand=True)
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_AsyncTransformer_transform_bytes(self):
+        image = self.load_image()
+        transform = transforms.Scale(0.5)
+
+        fp = io.BytesIO()
+        image.save(fp, format="png")
+
+        async def main():
+            async with AsyncTransformer(max_concurrency=2) as transformer:
+                return await transformer.transform_bytes(fp.getvalue(), transform)
+
+        actual = Image.open(io.BytesIO(run(main())))
+        self.assertEqual(actual.format, "PNG")
+
+        desired = apply(image, transform)
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_AsyncTransformer_max_concurrency(self):
+        max_concurrency = 2
+        lock = Lock()
+        running = 0
+        max_running = 0
+
+        def job(_):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            Event().wait(0.01)
+            with lock:
+                running -= 1
+
+        async def main():
+            executor = ThreadPoolExecutor(max_workers=4)
+            transformer = AsyncTransformer(
+                executor=executor, max_concurrency=max_concurrency
+            )
+            try:
+                await asyncio.gather(*[transformer._run(job, idx) for idx in range(8)])
+            finally:
+                executor.shutdown()
+
+        run(main())
+        self.assertEqual(max_running, max_concurrency)
+
+    def test_AsyncTransformer_timeout(self):
+        started = Event()
+        release = Event()
+
+        def job():
+            started.set()
+            release.wait(1.0)
+
+        async def main():
+            async with AsyncTransformer(max_concurrency=1, timeout=0.05) as transformer:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await transformer._run(job)
+                self.assertTrue(started.is_set())
+
+                # the slot is only freed after the running job is finished
+                release.set()
+                transformer.timeout = 1.0
+                await transformer._run(lambda: None)
+
+        run(main())
+
+    def test_apply_many_async(self):
+        images = [self.load_image().resize((size, size)) for size in range(20, 60, 5)]
+        transform = transforms.Rotate(30.0)
+        desired = [apply(image, transform) for image in images]
+
+        actual = run(collect(apply_many_async(images, transform, max_concurrency=2)))
+        self.assertEqual(len(actual), len(desired))
+        for actual_image, desired_image in zip(actual, desired):
+            self.assertImagesAlmostEqual(actual_image, desired_image)
+
+        async def async_images():
+            for image in images:
+                yield image
+
+        actual = run(
+            collect(
+                apply_many_async(
+                    async_images(), transform, max_concurrency=2, ordered=False
+                )
+            )
+        )
+        self.assertCountEqual(
+            [image.size for image in actual], [image.size for image in desired]
+        )
+
+    def test_AsyncTransformer_apply_many_early_stop(self):
+        image = self.load_image()
+        image.load()
+        transform = transforms.Rotate(30.0)
+        max_concurrency = 2
+        num_consumed = 0
+
+        def images():
+            nonlocal num_consumed
+            for _ in range(16):
+                num_consumed += 1
+                yield image
+
+        async def main():
+            async with AsyncTransformer(max_concurrency=max_concurrency) as transformer:
+                async_iterator = transformer.apply_many(images(), transform)
+                async for _ in async_iterator:
+                    break
+                await async_iterator.aclose()
+
+        run(main())
+        self.assertLessEqual(num_consumed, 2 * max_concurrency)
+
+
+if __name__ == "__main__":
+    unittest.main()
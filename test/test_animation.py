@@ -0,0 +1,162 @@
+import io
+import unittest
+import numpy as np
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.animation import (
+    ConstantSchedule,
+    GeneratedSchedule,
+    KeyframeSchedule,
+    iter_frames,
+    make_schedule,
+    save_frames,
+    transform_frames,
+)
+
+
+def make_animation(num_frames=5, size=(40, 30), format="GIF"):
+    frames = []
+    for idx in range(num_frames):
+        frame = Image.new("RGB", size, (idx * 40, 100, 200 - idx * 30))
+        frame.paste((255, 255, 255), (idx * 5, 5, idx * 5 + 10, 15))
+        frames.append(frame)
+
+    fp = io.BytesIO()
+    frames[0].save(
+        fp,
+        format=format,
+        save_all=True,
+        append_images=frames[1:],
+        duration=[50 + 10 * idx for idx in range(num_frames)],
+        loop=0,
+    )
+    return Image.open(io.BytesIO(fp.getvalue()))
+
+
+class Tester(ImageTestCase):
+    def default_image_backend(self):
+        return "PIL"
+
+    def test_make_schedule(self):
+        transform = transforms.Rotate(30.0)
+        self.assertIsInstance(make_schedule(transform), ConstantSchedule)
+        self.assertIsInstance(make_schedule([transform]), GeneratedSchedule)
+        self.assertIsInstance(make_schedule(lambda idx: transform), GeneratedSchedule)
+
+        schedule = KeyframeSchedule(angle={0: 0.0})
+        self.assertIs(make_schedule(schedule), schedule)
+
+    def test_ConstantSchedule(self):
+        transform = transforms.Rotate(30.0)
+        sizes = [(40, 30), (20, 10)]
+
+        actuals = ConstantSchedule(transform).extract_batch_transform_params(sizes)
+        desireds = transform.extract_batch_transform_params(sizes)
+        self.assertEqual(actuals, desireds)
+
+    def test_KeyframeSchedule(self):
+        schedule = KeyframeSchedule(
+            angle=[(0, 0.0), (4, 40.0)],
+            scale={2: 1.0, 4: (0.5, 2.0)},
+            translation={0: (0.0, 0.0), 4: (8.0, -4.0)},
+        )
+        size = (40, 30)
+
+        actuals = schedule.extract_batch_transform_params([size] * 6)
+        for idx, actual in enumerate(actuals):
+            clipped_idx = min(idx, 4)
+            scale = 1.0 if idx <= 2 else (1.0 - 0.25 * (idx - 2), 1.0 + 0.5 * (idx - 2))
+            if idx > 4:
+                scale = (0.5, 2.0)
+            desired = transforms.ComposedTransform(
+                transforms.Rotate(10.0 * clipped_idx),
+                transforms.Scale(scale),
+                transforms.Translate((2.0 * clipped_idx, -1.0 * clipped_idx)),
+            ).extract_transform_params(size)
+            self.assertEqual(actual[:2], desired[:2])
+            np.testing.assert_allclose(actual[2], desired[2], atol=1e-9)
+
+    def test_GeneratedSchedule(self):
+        sizes = [(40, 30)] * 3
+        transforms_ = [transforms.Rotate(10.0 * idx) for idx in range(3)]
+        desireds = [
+            transform.extract_transform_params(size)
+            for transform, size in zip(transforms_, sizes)
+        ]
+
+        for schedule in (
+            GeneratedSchedule(iter(transforms_)),
+            GeneratedSchedule(lambda idx: transforms.Rotate(10.0 * idx)),
+        ):
+            actuals = schedule.extract_batch_transform_params(sizes)
+            for actual, desired in zip(actuals, desireds):
+                self.assertEqual(actual[:2], desired[:2])
+                np.testing.assert_allclose(actual[2], desired[2], atol=1e-9)
+
+        with self.assertRaises(RuntimeError):
+            GeneratedSchedule(transforms_[:2]).extract_batch_transform_params(sizes)
+
+    def test_common_canvas(self):
+        schedule = KeyframeSchedule(angle={0: 0.0, 2: 45.0})
+        desired_size, _, _ = transforms.Rotate(45.0).extract_transform_params(
+            (40, 30), expand=True
+        )
+
+        # small batches are processed one frame at a time
+        for num_frames in (3, 40):
+            actuals = schedule.extract_batch_transform_params(
+                [(40, 30)] * num_frames, expand=True
+            )
+            sizes = {size for size, _, _ in actuals}
+            self.assertEqual(len(sizes), 1)
+            self.assertEqual(sizes.pop(), desired_size)
+
+    def test_transform_frames(self):
+        image = make_animation()
+        schedule = KeyframeSchedule(angle={0: 0.0, 4: 90.0})
+        batch_transform_params = schedule.extract_batch_transform_params(
+            [image.size] * image.n_frames
+        )
+
+        actuals = list(transform_frames(image, schedule, workers=2, max_pending=1))
+        desireds = [
+            frame.transform(*transform_params)
+            for frame, transform_params in zip(
+                iter_frames(image), batch_transform_params
+            )
+        ]
+        self.assertEqual(len(actuals), len(desireds))
+        for actual, desired in zip(actuals, desireds):
+            self.assertImagesAlmostEqual(actual, desired)
+
+    def test_save_frames(self):
+        image = make_animation()
+        transform = transforms.Rotate(30.0)
+
+        fp = io.BytesIO()
+        save_frames(image, fp, transform, expand=True, workers=2)
+
+        actual = Image.open(io.BytesIO(fp.getvalue()))
+        self.assertEqual(actual.format, "GIF")
+        self.assertEqual(actual.n_frames, image.n_frames)
+        self.assertEqual(
+            actual.size,
+            transform.extract_transform_params(image.size, expand=True)[0],
+        )
+        actual.seek(1)
+        self.assertEqual(actual.info["duration"], 60)
+
+    def test_save_frames_tiff(self):
+        image = make_animation(format="TIFF")
+
+        fp = io.BytesIO()
+        save_frames(image, fp, transforms.Scale(0.5), workers=2)
+
+        actual = Image.open(io.BytesIO(fp.getvalue()))
+        self.assertEqual(actual.format, "TIFF")
+        self.assertEqual(actual.n_frames, image.n_frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+from os import path
+import unittest
+import numpy as np
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.apply import apply, apply_batch, apply_many
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def test_apply(self):
+        image = self.load_image()
+        transform = transforms.Rotate(30.0)
+
+        actual = apply(image, transform, expand=True, resample=Image.BILINEAR)
+
+        transform_params = transform.extract_transform_params(image.size, expand=True)
+        desired = image.transform(*transform_params, resample=Image.BILINEAR)
+
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_crop_source(self):
+        image = self.load_image()
+
+        for transform in (
+            transforms.ComposedTransform(
+                transforms.Translate((100.0, 50.0)), transforms.Scale(4.0)
+            ),
+            transforms.Rotate(30.0),
+            transforms.Translate((10000.0, 0.0)),
+        ):
+            for resample in (Image.NEAREST, Image.BILINEAR, Image.BICUBIC):
+                actual = apply(image, transform, resample=resample, crop_source=True)
+                desired = apply(image, transform, resample=resample)
+                self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_fast_path(self):
+        image = self.load_image()
+
+        for transform in (
+            transforms.Rotate(0.0),
+            transforms.Rotate(90.0),
+            transforms.Rotate(180.0),
+            transforms.Rotate(270.0, clockwise=True),
+            transforms.Scale((-1.0, 1.0)),
+            transforms.Scale((1.0, -1.0)),
+            transforms.Translate((20.0, -7.0)),
+            transforms.ComposedTransform(
+                transforms.Rotate(90.0), transforms.Translate((3.0, 5.0))
+            ),
+        ):
+            for expand in (False, True):
+                for fillcolor in (None, (255, 0, 0)):
+                    transform_params = transform.extract_transform_params(
+                        image.size, expand=expand
+                    )
+                    desired = image.transform(
+                        *transform_params,
+                        resample=Image.BILINEAR,
+                        fillcolor=fillcolor,
+                    )
+                    actual = apply(
+                        image,
+                        transform,
+                        expand=expand,
+                        resample=Image.BILINEAR,
+                        fillcolor=fillcolor,
+                    )
+                    self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_fast_path_alpha(self):
+        image = self.load_image().convert("RGBA")
+        # fully transparent pixels with a color that bleeds into their neighbors
+        # if the alpha channel is not premultiplied
+        alpha = Image.new("L", image.size, 255)
+        alpha.paste(0, (0, 0, image.width // 2, image.height))
+        image.putalpha(alpha)
+
+        for mode in ("RGBA", "LA"):
+            for resample in (Image.NEAREST, Image.BILINEAR, Image.BICUBIC):
+                for transform in (
+                    transforms.Rotate(90.0),
+                    transforms.Translate((20.0, -7.0)),
+                ):
+                    source = image.convert(mode)
+                    transform_params = transform.extract_transform_params(source.size)
+                    desired = source.transform(*transform_params, resample=resample)
+                    actual = apply(source, transform, resample=resample)
+                    np.testing.assert_array_equal(
+                        np.asarray(actual), np.asarray(desired)
+                    )
+
+    def test_apply_resize_scales(self):
+        image = self.load_image()
+        transform = transforms.Scale(2.0)
+
+        actual = apply(image, transform, resize_scales=True)
+        desired = apply(image, transform)
+
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_reducing_gap(self):
+        image = self.load_image()
+        transform = transforms.Rotate(30.0)
+
+        actual = apply(image, transform, resample=Image.BILINEAR, reducing_gap=2.0)
+        desired = apply(image, transform, resample=Image.BILINEAR)
+
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_reducing_gap_downscale(self):
+        image = self.load_image()
+        transform = transforms.Scale(0.1)
+
+        reduced = apply(
+            image, transform, expand=True, resample=Image.BILINEAR, reducing_gap=2.0
+        )
+        plain = apply(image, transform, expand=True, resample=Image.BILINEAR)
+        self.assertEqual(reduced.size, plain.size)
+
+        reference = np.asarray(image.resize(plain.size, Image.BOX), np.float64)
+
+        def error(image):
+            return np.mean(np.abs(np.asarray(image, np.float64) - reference))
+
+        self.assertLess(error(reduced), error(plain))
+
+    def test_apply_batch(self):
+        images = [self.load_image().resize((32 + idx, 24)) for idx in range(6)]
+        transform = transforms.Rotate(30.0)
+
+        actuals = apply_batch(images, transform, expand=True, resample=Image.BILINEAR)
+        desireds = [
+            apply(image, transform, expand=True, resample=Image.BILINEAR)
+            for image in images
+        ]
+        self.assertEqual(len(actuals), len(desireds))
+        for actual, desired in zip(actuals, desireds):
+            self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_batch_batched_transform(self):
+        images = [self.load_image().resize((32, 24 + idx)) for idx in range(4)]
+        angles = (0.0, 90.0, 30.0, 45.0)
+
+        actuals = apply_batch(images, transforms.Rotate(angles))
+        desireds = [
+            apply(image, transforms.Rotate(angle))
+            for image, angle in zip(images, angles)
+        ]
+        for actual, desired in zip(actuals, desireds):
+            self.assertImagesAlmostEqual(actual, desired)
+
+        with self.assertRaises(RuntimeError):
+            apply_batch(images[:3], transforms.Rotate(angles))
+
+    def test_apply_batch_empty(self):
+        self.assertEqual(apply_batch([], transforms.Rotate(30.0)), [])
+
+    def test_apply_many(self):
+        images = [self.load_image().resize((32 + idx, 24)) for idx in range(6)]
+        transform = transforms.Rotate(30.0)
+
+        desireds = [apply(image, transform) for image in images]
+        for backend in ("thread", "process"):
+            actuals = list(
+                apply_many(
+                    iter(images), transform, workers=2, backend=backend, max_pending=1
+                )
+            )
+            self.assertEqual(len(actuals), len(desireds))
+            for actual, desired in zip(actuals, desireds):
+                self.assertImagesAlmostEqual(actual, desired)
+
+    def test_apply_many_unordered(self):
+        images = [self.load_image().resize((32 + idx, 24)) for idx in range(6)]
+        transform = transforms.Rotate(30.0)
+
+        actuals = apply_many(images, transform, workers=2, ordered=False, chunksize=2)
+        actual = sorted(image.size for image in actuals)
+        desired = [image.size for image in images]
+        self.assertEqual(actual, desired)
+
+    def test_apply_many_unknown_backend(self):
+        with self.assertRaises(RuntimeError):
+            list(apply_many([], transforms.Rotate(30.0), backend="unknown"))
+
+
+if __name__ == "__main__":
+    unittest.main()
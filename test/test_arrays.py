@@ -0,0 +1,91 @@
+from os import path
+import unittest
+import numpy as np
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.arrays import transform_array, warp_array
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def load_image(self, mode="RGB"):
+        return super().load_image().convert(mode).resize((123, 97))
+
+    def assertArrayMatchesPillow(self, transform, mode, resample, expand=False):
+        image = self.load_image(mode)
+        transform_params = transform.extract_transform_params(image.size, expand=expand)
+
+        actual = transform_array(
+            np.asarray(image), transform, expand=expand, resample=resample
+        )
+        desired = np.asarray(image.transform(*transform_params, resample=resample))
+        if mode == "F":
+            np.testing.assert_allclose(actual, desired, rtol=1e-6, atol=1e-4)
+        else:
+            np.testing.assert_array_equal(actual, desired)
+
+    def test_transform_array(self):
+        transform = transforms.ComposedTransform(
+            transforms.Shear(20.0), transforms.Rotate(11.0), transforms.Scale(1.7)
+        )
+        for mode in ("L", "RGB", "F"):
+            for resample in (Image.NEAREST, Image.BILINEAR):
+                for expand in (False, True):
+                    self.assertArrayMatchesPillow(transform, mode, resample, expand)
+
+    def test_transform_array_scale(self):
+        transform = transforms.Scale((2.3, 0.7))
+        for resample in (Image.NEAREST, Image.BILINEAR):
+            self.assertArrayMatchesPillow(transform, "RGB", resample)
+
+    def test_transform_array_large_translation(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Translate((-40000.0, 0.0))
+        )
+        self.assertArrayMatchesPillow(transform, "L", Image.NEAREST)
+
+    def test_warp_array_batch(self):
+        image = np.asarray(self.load_image())
+        images = np.stack((image, image[::-1]))
+        data = np.array(
+            [
+                transforms.Rotate(angle).extract_transform_params((123, 97))[2]
+                for angle in (30.0, 60.0)
+            ]
+        )
+
+        actual = warp_array(images, data)
+        desired = np.stack(
+            [warp_array(image, params) for image, params in zip(images, data)]
+        )
+        np.testing.assert_array_equal(actual, desired)
+
+    def test_warp_array_fill(self):
+        image = np.ones((10, 10, 3), dtype=np.uint16)
+        data = transforms.Translate((5.0, 0.0)).extract_transform_params((10, 10))[2]
+
+        actual = warp_array(image, data, fill=(1000, 2000, 3000))
+        np.testing.assert_array_equal(
+            actual[:, :5], np.broadcast_to((1000, 2000, 3000), (10, 5, 3))
+        )
+        np.testing.assert_array_equal(actual[:, 5:], 1)
+        self.assertEqual(actual.dtype, np.uint16)
+
+    def test_warp_array_unknown_resample(self):
+        with self.assertRaises(RuntimeError):
+            warp_array(
+                np.zeros((10, 10)),
+                (1.0, 0.0, 0.0, 0.0, 1.0, 0.0),
+                resample=Image.BICUBIC,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
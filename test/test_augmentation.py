@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+from pillow_affine import augmentation, transforms
+
+
+class Tester(unittest.TestCase):
+    def assertBatchTransformParamsAlmostEqual(self, actuals, desireds):
+        self.assertEqual(len(actuals), len(desireds))
+        for actual, desired in zip(actuals, desireds):
+            self.assertEqual(actual[:2], desired[:2])
+            np.testing.assert_allclose(actual[2], desired[2], atol=1e-9)
+
+    def test_make_generator(self):
+        generator1 = augmentation.make_generator(seed=0, worker_id=0)
+        generator2 = augmentation.make_generator(seed=0, worker_id=0)
+        generator3 = augmentation.make_generator(seed=0, worker_id=1)
+
+        samples1 = generator1.random(10)
+        samples2 = generator2.random(10)
+        samples3 = generator3.random(10)
+
+        np.testing.assert_array_equal(samples1, samples2)
+        self.assertFalse(np.allclose(samples1, samples3))
+
+    def test_reproducibility(self):
+        transform = augmentation.RandomAffine(
+            shear=10.0, angle=30.0, factor=(0.5, 2.0), translation=(10.0, 5.0)
+        )
+        sizes = ((64, 48),) * 8
+
+        actual = transform.sample_matrices(sizes, augmentation.make_generator(seed=0))
+        desired = transform.sample_matrices(sizes, augmentation.make_generator(seed=0))
+        np.testing.assert_array_equal(actual, desired)
+        self.assertEqual(actual.shape, (8, 6))
+
+    def test_RandomShear(self):
+        sizes = ((64, 48), (31, 17))
+        angle = 30.0
+        clockwise = True
+
+        transform = augmentation.RandomShear((angle, angle), clockwise=clockwise)
+        actuals = transform.extract_batch_transform_params(sizes, expand=True)
+
+        transform = transforms.Shear(angle, clockwise=clockwise)
+        desireds = transform.extract_batch_transform_params(sizes, expand=True)
+
+        self.assertBatchTransformParamsAlmostEqual(actuals, desireds)
+
+    def test_RandomRotate(self):
+        sizes = ((64, 48), (31, 17))
+        angle = -30.0
+        center = (10.0, 20.0)
+
+        transform = augmentation.RandomRotate((angle, angle), center=center)
+        actuals = transform.extract_batch_transform_params(sizes)
+
+        transform = transforms.Rotate(angle, center=center)
+        desireds = transform.extract_batch_transform_params(sizes)
+
+        self.assertBatchTransformParamsAlmostEqual(actuals, desireds)
+
+    def test_RandomScale(self):
+        sizes = ((64, 48), (31, 17))
+        factor = 0.5
+
+        transform = augmentation.RandomScale((factor, factor))
+        actuals = transform.extract_batch_transform_params(sizes)
+
+        transform = transforms.Scale(factor)
+        desireds = transform.extract_batch_transform_params(sizes)
+
+        self.assertBatchTransformParamsAlmostEqual(actuals, desireds)
+
+    def test_RandomScale_anisotropic(self):
+        transform = augmentation.RandomScale((0.5, 2.0), anisotropic=True)
+        matrices = transform.sample_matrices(
+            ((64, 48),) * 8, augmentation.make_generator(seed=0)
+        )
+        self.assertFalse(np.allclose(matrices[:, 0], matrices[:, 4]))
+
+    def test_RandomTranslate(self):
+        translation = (10.0, 5.0)
+
+        transform = augmentation.RandomTranslate(translation)
+        matrices = transform.sample_matrices(
+            ((64, 48),) * 100, augmentation.make_generator(seed=0)
+        )
+
+        self.assertTrue(np.all(np.abs(matrices[:, 2]) <= translation[0]))
+        self.assertTrue(np.all(np.abs(matrices[:, 5]) <= translation[1]))
+        np.testing.assert_array_equal(matrices[:, (0, 4)], 1.0)
+
+    def test_RandomAffine(self):
+        sizes = ((64, 48), (31, 17))
+        shear = 10.0
+        angle = 30.0
+        factor = 0.5
+
+        transform = augmentation.RandomAffine(
+            shear=(shear, shear), angle=(angle, angle), factor=(factor, factor)
+        )
+        actuals = transform.extract_batch_transform_params(sizes, expand=True)
+
+        transform = transforms.ComposedTransform(
+            transforms.Shear(shear), transforms.Rotate(angle), transforms.Scale(factor)
+        )
+        desireds = transform.extract_batch_transform_params(sizes, expand=True)
+
+        self.assertBatchTransformParamsAlmostEqual(actuals, desireds)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+from os import path
+import unittest
+import numpy as np
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.collage import Patch, calculate_patch_box, composite_patches
+from pillow_affine.utils import offset_affine_data
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def load_patches(self):
+        image = self.load_image().convert("RGBA").resize((48, 32))
+        return [
+            Patch(image, transforms.Rotate(30.0), (10.0, 20.0)),
+            Patch(
+                image.transpose(Image.FLIP_LEFT_RIGHT),
+                transforms.ComposedTransform(
+                    transforms.Scale(1.5), transforms.Translate((5.0, -3.0))
+                ),
+                (40.5, 30.0),
+            ),
+            Patch(image.convert("RGB"), transforms.Shear(20.0), (-20.0, 70.0)),
+        ]
+
+    def composite_naive(self, canvas, patches, resample):
+        # warps every patch onto a layer of the size of the complete canvas
+        for image, transform, (left, upper) in patches:
+            _, _, data = transform.extract_transform_params(image.size)
+            data = offset_affine_data(data, output_offset=(-left, -upper))
+            layer = image.convert("RGBA").transform(
+                canvas.size, Image.AFFINE, data, resample=resample
+            )
+            canvas.alpha_composite(layer)
+        return canvas
+
+    def test_composite_patches(self):
+        patches = self.load_patches()[:2]
+        patches = [
+            Patch(image, transform, (10.0, 20.0)) for image, transform, _ in patches
+        ]
+        actual = composite_patches(
+            Image.new("RGBA", (120, 100)), patches, resample=Image.BILINEAR
+        )
+        desired = self.composite_naive(
+            Image.new("RGBA", (120, 100)), patches, Image.BILINEAR
+        )
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_composite_patches_workers(self):
+        patches = self.load_patches()
+        desired = composite_patches(Image.new("RGBA", (120, 100)), patches)
+        actual = composite_patches(
+            Image.new("RGBA", (120, 100)), iter(patches), workers=2, max_pending=1
+        )
+        np.testing.assert_array_equal(np.asarray(actual), np.asarray(desired))
+
+    def test_composite_patches_tuples(self):
+        patches = self.load_patches()
+        desired = composite_patches(Image.new("RGBA", (120, 100)), patches)
+        actual = composite_patches(
+            Image.new("RGBA", (120, 100)), [tuple(patch) for patch in patches]
+        )
+        np.testing.assert_array_equal(np.asarray(actual), np.asarray(desired))
+
+    def test_composite_patches_rgb(self):
+        patches = self.load_patches()
+        desired = composite_patches(
+            Image.new("RGBA", (120, 100), (255, 0, 0, 255)), patches
+        )
+        actual = composite_patches(Image.new("RGB", (120, 100), (255, 0, 0)), patches)
+        self.assertEqual(actual.mode, "RGB")
+        self.assertImagesAlmostEqual(actual, desired.convert("RGB"))
+
+    def test_composite_patches_outside(self):
+        image = Image.new("RGBA", (10, 10), (255, 255, 255, 255))
+        patch = Patch(image, transforms.Rotate(45.0), (-30.0, 5.0))
+        self.assertIsNone(calculate_patch_box(patch, (100, 100)))
+
+        canvas = composite_patches(Image.new("RGBA", (100, 100)), [patch])
+        self.assertIsNone(canvas.getbbox())
+
+    def test_composite_patches_invalid(self):
+        with self.assertRaises(RuntimeError):
+            composite_patches(Image.new("L", (10, 10)), [])
+        with self.assertRaises(RuntimeError):
+            composite_patches(Image.new("RGBA", (10, 10)), [], fillcolor=(0, 0, 0))
+
+    def test_calculate_patch_box(self):
+        image = Image.new("RGB", (30, 40))
+        box = calculate_patch_box(
+            (image, transforms.Identity(), (10.0, 20.0)), (100, 100)
+        )
+        self.assertEqual(box, (10, 20, 40, 60))
+
+        box = calculate_patch_box(
+            (image, transforms.Translate((5.0, 25.0)), (10.0, 20.0)), (100, 100)
+        )
+        self.assertEqual(box, (15, 0, 45, 35))
+
+        box = calculate_patch_box(
+            (image, transforms.Rotate(90.0), (10.0, 20.0)), (100, 100)
+        )
+        self.assertEqual(box, (5, 25, 45, 55))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from PIL import Image
+from pillow_affine import instrumentation, transforms
+from pillow_affine.apply import apply
+
+
+class Tester(unittest.TestCase):
+    def test_collect(self):
+        image = Image.new("RGB", (64, 48))
+        transform = transforms.Rotate(30.0)
+
+        with instrumentation.collect() as collector:
+            apply(image, transform, expand=True)
+
+        statistics = collector.statistics
+        for name in (
+            "create_matrix",
+            "expand_canvas",
+            "coordinate_system_transform",
+            "matinv",
+            "fast_path",
+            "warp",
+        ):
+            self.assertEqual(statistics[name].calls, 1)
+
+        (event,) = [event for event in collector.events if event.stage == "warp"]
+        size, _, _ = transform.extract_transform_params(image.size, expand=True)
+        self.assertEqual(event.info, {"size": size, "mode": "RGB"})
+
+        self.assertAlmostEqual(
+            collector.max_area_growth, (size[0] * size[1]) / (64 * 48)
+        )
+
+    def test_collect_batch(self):
+        transform = transforms.Rotate(30.0)
+        sizes = ((64, 48), (32, 32)) * 20
+
+        with instrumentation.collect() as collector:
+            transform.extract_batch_transform_params(sizes, expand=True)
+
+        for event in collector.events:
+            self.assertEqual(event.info["batch"], len(sizes))
+        self.assertGreater(collector.max_area_growth, 1.0)
+
+    def test_collect_empty_image(self):
+        transform = transforms.Rotate(30.0)
+
+        with instrumentation.collect() as collector:
+            size, _, _ = transform.extract_transform_params((0, 10), expand=True)
+            transform.extract_batch_transform_params(((0, 10), (10, 0)), expand=True)
+
+        self.assertEqual(size, (6, 10))
+        for event in collector.events:
+            self.assertNotIn("area_growth", event.info)
+        self.assertEqual(collector.max_area_growth, 1.0)
+
+    def test_fast_path(self):
+        image = Image.new("RGB", (64, 48))
+
+        with instrumentation.collect() as collector:
+            apply(image, transforms.Rotate(180.0))
+
+        (event,) = [event for event in collector.events if event.stage == "fast_path"]
+        self.assertTrue(event.info["hit"])
+        self.assertNotIn("warp", collector.statistics)
+
+    def test_callback(self):
+        events = []
+        instrumentation.add_callback(events.append)
+        try:
+            transforms.Rotate(30.0).extract_transform_params((64, 48))
+        finally:
+            instrumentation.remove_callback(events.append)
+        self.assertEqual(
+            [event.stage for event in events],
+            ["create_matrix", "coordinate_system_transform", "matinv"],
+        )
+
+        transforms.Rotate(30.0).extract_transform_params((64, 48))
+        self.assertEqual(len(events), 3)
+
+    def test_disabled(self):
+        self.assertIs(instrumentation.stage("foo"), instrumentation.stage("bar"))
+
+
+if __name__ == "__main__":
+    unittest.main()
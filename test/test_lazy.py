@@ -0,0 +1,81 @@
+from os import path
+import io
+import unittest
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import instrumentation, transforms
+from pillow_affine.apply import apply
+from pillow_affine.lazy import LazyImage
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def test_LazyImage(self):
+        image = self.load_image()
+        chain = (
+            transforms.Rotate(30.0),
+            transforms.Scale(0.7),
+            transforms.Translate((20.0, -10.0)),
+        )
+
+        lazy_image = LazyImage(image, resample=Image.BILINEAR)
+        for transform in chain:
+            lazy_image = lazy_image.transform(transform)
+        self.assertFalse(lazy_image.is_loaded)
+
+        with instrumentation.collect() as collector:
+            actual = lazy_image.load()
+        self.assertEqual(collector.statistics["warp"].calls, 1)
+        self.assertTrue(lazy_image.is_loaded)
+        self.assertIs(lazy_image.load(), actual)
+
+        desired = apply(
+            image, transforms.ComposedTransform(*chain), resample=Image.BILINEAR
+        )
+        self.assertImagesAlmostEqual(actual, desired)
+
+    def test_LazyImage_expand(self):
+        image = self.load_image()
+        transform = transforms.Rotate(30.0)
+
+        lazy_image = LazyImage(image).transform(transform, expand=True)
+        desired = apply(image, transform, expand=True)
+
+        self.assertEqual(lazy_image.size, desired.size)
+        self.assertImagesAlmostEqual(lazy_image.load(), desired)
+
+    def test_LazyImage_expand_chain(self):
+        image = self.load_image()
+        lazy_image = LazyImage(image)
+        for _ in range(4):
+            lazy_image = lazy_image.transform(transforms.Rotate(90.0), expand=True)
+
+        self.assertEqual(lazy_image.size, image.size)
+        self.assertEqual(lazy_image.tobytes(), image.tobytes())
+
+    def test_LazyImage_untransformed(self):
+        image = self.load_image()
+        lazy_image = LazyImage(image)
+
+        self.assertEqual(lazy_image.tobytes(), image.tobytes())
+        self.assertIsNot(lazy_image.load(), image)
+
+    def test_LazyImage_save(self):
+        image = self.load_image()
+        lazy_image = LazyImage(image).transform(transforms.Rotate(30.0))
+
+        fp = io.BytesIO()
+        lazy_image.save(fp, format="png")
+        fp.seek(0)
+
+        self.assertImagesAlmostEqual(Image.open(fp), lazy_image.load())
+
+
+if __name__ == "__main__":
+    unittest.main()
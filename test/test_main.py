@@ -0,0 +1,117 @@
+from os import path
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.__main__ import main
+from pillow_affine.apply import apply
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = path.join(self.tmp_dir.name, "input")
+        self.output_dir = path.join(self.tmp_dir.name, "output")
+        os.makedirs(self.input_dir)
+
+        image = self.load_image()
+        self.files = []
+        for idx in range(3):
+            file = path.join(self.input_dir, f"{idx}.png")
+            image.resize((64 + idx, 48)).save(file)
+            self.files.append(file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_main(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            exit_code = main([*args, "--output", self.output_dir])
+        return exit_code, stdout.getvalue()
+
+    def test_main(self):
+        exit_code, stdout = self.run_main(
+            self.input_dir, "--rotate", "30", "--translate", "10,5", "--expand"
+        )
+        self.assertEqual(exit_code, 0)
+        self.assertIn(f"Transformed {len(self.files)} image(s)", stdout)
+        self.assertIn("images/s", stdout)
+
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Translate((10.0, 5.0))
+        )
+        for file in self.files:
+            actual = Image.open(path.join(self.output_dir, path.basename(file)))
+            desired = apply(Image.open(file), transform, expand=True)
+            self.assertImagesAlmostEqual(actual, desired)
+
+    def test_main_glob_format(self):
+        exit_code, _ = self.run_main(
+            path.join(self.input_dir, "*.png"), "--scale", "0.5,2", "--format", "bmp"
+        )
+        self.assertEqual(exit_code, 0)
+        self.assertCountEqual(os.listdir(self.output_dir), ("0.bmp", "1.bmp", "2.bmp"))
+
+    def test_main_manifest(self):
+        manifest = path.join(self.input_dir, "manifest.txt")
+        with open(manifest, "w") as fh:
+            fh.write("0.png\n# comment\n\n2.png\n")
+
+        exit_code, _ = self.run_main(manifest, "--shear", "10")
+        self.assertEqual(exit_code, 0)
+        self.assertCountEqual(os.listdir(self.output_dir), ("0.png", "2.png"))
+
+    def test_main_concurrency_errors(self):
+        for option in ("--decoders", "--workers", "--encoders", "--queue-size"):
+            for value in ("0", "-1"):
+                with self.subTest(option=option, value=value):
+                    with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                        with self.assertRaises(SystemExit) as context:
+                            self.run_main(
+                                self.input_dir, "--rotate", "30", option, value
+                            )
+                    self.assertEqual(context.exception.code, 2)
+                    self.assertIn("expected a positive int", stderr.getvalue())
+
+    def test_main_missing_input(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                self.run_main(path.join(self.input_dir, "missing"), "--rotate", "30")
+        self.assertIn("does not exist", stderr.getvalue())
+        self.assertFalse(path.exists(self.output_dir))
+
+    def test_main_output_collision(self):
+        other_dir = path.join(self.tmp_dir.name, "other")
+        os.makedirs(other_dir)
+        self.load_image().save(path.join(other_dir, "0.png"))
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                self.run_main(self.input_dir, other_dir, "--rotate", "30")
+        self.assertIn("would both be written to", stderr.getvalue())
+        self.assertFalse(path.exists(self.output_dir))
+
+    def test_main_errors(self):
+        with open(path.join(self.input_dir, "broken.png"), "w") as fh:
+            fh.write("not an image")
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            exit_code, stdout = self.run_main(self.input_dir, "--rotate", "30")
+        self.assertEqual(exit_code, 1)
+        self.assertIn(f"Transformed {len(self.files)} image(s)", stdout)
+        self.assertEqual(len(os.listdir(self.output_dir)), len(self.files))
+
+
+if __name__ == "__main__":
+    unittest.main()
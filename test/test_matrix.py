@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from pillow_affine import matrix
+
+
+class Tester(unittest.TestCase):
+    def assertBatchMatricesAlmostEqual(self, actuals, desireds):
+        self.assertEqual(actuals.shape, (len(desireds), 6))
+        np.testing.assert_allclose(actuals, desireds, atol=1e-12)
+
+    def test_shearing_matrix_array(self):
+        angles = np.array([-30.0, 0.0, 45.0, 90.0, 400.0])
+        for clockwise in (False, True):
+            actuals = matrix.shearing_matrix(angles, clockwise=clockwise)
+            desireds = [
+                matrix.shearing_matrix(float(angle), clockwise=clockwise)
+                for angle in angles
+            ]
+            self.assertBatchMatricesAlmostEqual(actuals, desireds)
+
+    def test_rotation_matrix_array(self):
+        angles = np.array([-30.0, 0.0, 45.0, 90.0, 180.0, 270.0, 400.0])
+        for clockwise in (False, True):
+            actuals = matrix.rotation_matrix(angles, clockwise=clockwise)
+            desireds = [
+                matrix.rotation_matrix(float(angle), clockwise=clockwise)
+                for angle in angles
+            ]
+            self.assertBatchMatricesAlmostEqual(actuals, desireds)
+
+    def test_rotation_matrix_array_right_angles(self):
+        actuals = matrix.rotation_matrix(np.array([90.0, -90.0]))
+        np.testing.assert_array_equal(
+            actuals,
+            [(0.0, -1.0, 0.0, 1.0, 0.0, 0.0), (0.0, 1.0, 0.0, -1.0, 0.0, 0.0)],
+        )
+
+    def test_scaling_matrix_scalar_types(self):
+        desired = (2.0, 0.0, 0.0, 0.0, 2.0, 0.0)
+        for factor in (2, 2.0, np.float32(2.0), np.int64(2)):
+            self.assertEqual(matrix.scaling_matrix(factor), desired)
+        self.assertEqual(matrix.scaling_matrix((2, 3)), (2.0, 0.0, 0.0, 0.0, 3.0, 0.0))
+
+    def test_scaling_matrix_array(self):
+        factors = np.array([0.5, 1.0, 2.0])
+        actuals = matrix.scaling_matrix(factors)
+        desireds = [matrix.scaling_matrix(float(factor)) for factor in factors]
+        self.assertBatchMatricesAlmostEqual(actuals, desireds)
+
+        factors = np.array([(0.5, 2.0), (1.0, 3.0)])
+        actuals = matrix.scaling_matrix(factors)
+        desireds = [matrix.scaling_matrix(tuple(factor)) for factor in factors]
+        self.assertBatchMatricesAlmostEqual(actuals, desireds)
+
+    def test_translation_matrix_array(self):
+        translations = np.array([(1.0, 2.0), (-3.0, 4.0)])
+        for inverse in (False, True):
+            actuals = matrix.translation_matrix(translations, inverse=inverse)
+            desireds = [
+                matrix.translation_matrix(tuple(translation), inverse=inverse)
+                for translation in translations
+            ]
+            self.assertBatchMatricesAlmostEqual(actuals, desireds)
+
+    def test_array_layout(self):
+        actuals = matrix.rotation_matrix(np.zeros(4))
+        self.assertTrue(actuals.flags.f_contiguous)
+
+
+if __name__ == "__main__":
+    unittest.main()
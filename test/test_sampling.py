@@ -0,0 +1,127 @@
+from os import path
+import unittest
+import numpy as np
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.arrays import transform_array
+from pillow_affine.cache import LRUCache
+from pillow_affine.sampling import SamplingMapCache, compute_sampling_map, remap
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def load_array(self, mode="RGB"):
+        return np.asarray(super().load_image().convert(mode).resize((123, 97)))
+
+    def test_remap(self):
+        array = self.load_array()
+        transform = transforms.ComposedTransform(
+            transforms.Shear(20.0), transforms.Rotate(11.0), transforms.Scale(1.7)
+        )
+        for resample in (Image.NEAREST, Image.BILINEAR):
+            for expand in (False, True):
+                size, _, data = transform.extract_transform_params(
+                    (123, 97), expand=expand
+                )
+                sampling_map = compute_sampling_map(data, size, (123, 97), resample)
+
+                actual = remap(array, sampling_map)
+                desired = transform_array(
+                    array, transform, expand=expand, resample=resample
+                )
+                np.testing.assert_array_equal(actual, desired)
+
+    def test_remap_batch(self):
+        array = self.load_array("L")
+        batch = np.stack((array, array[::-1]))[..., None]
+        size, _, data = transforms.Rotate(30.0).extract_transform_params((123, 97))
+        sampling_map = compute_sampling_map(data, size, (123, 97), Image.BILINEAR)
+
+        actual = remap(batch, sampling_map, fill=255)
+        desired = np.stack([remap(image, sampling_map, fill=255) for image in batch])
+        np.testing.assert_array_equal(actual, desired)
+
+    def test_remap_size_mismatch(self):
+        size, _, data = transforms.Rotate(30.0).extract_transform_params((10, 10))
+        sampling_map = compute_sampling_map(data, size, (10, 10))
+        with self.assertRaises(RuntimeError):
+            remap(np.zeros((10, 11)), sampling_map)
+
+    def test_compute_sampling_map_unknown_resample(self):
+        with self.assertRaises(RuntimeError):
+            compute_sampling_map(
+                (1.0, 0.0, 0.0, 0.0, 1.0, 0.0), (10, 10), (10, 10), Image.BICUBIC
+            )
+
+    def test_SamplingMapCache(self):
+        array = self.load_array()
+        cache = SamplingMapCache()
+
+        for angle in (0.0, 90.0, 0.0, 90.0):
+            transform = transforms.Rotate(angle)
+            actual = cache.warp(array, transform, expand=True)
+            desired = transform_array(array, transform, expand=True)
+            np.testing.assert_array_equal(actual, desired)
+
+        info = cache.info()
+        self.assertEqual(info.hits, 2)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.currsize, 2)
+        self.assertEqual(
+            info.currbytes,
+            sum(
+                cache.get(transforms.Rotate(angle), (123, 97), expand=True).nbytes
+                for angle in (0.0, 90.0)
+            ),
+        )
+
+    def test_SamplingMapCache_shared(self):
+        cache = SamplingMapCache()
+        sampling_map = cache.get(transforms.Rotate(360.0), (32, 32))
+        self.assertIs(cache.get(transforms.Identity(), (32, 32)), sampling_map)
+
+    def test_SamplingMapCache_maxbytes(self):
+        nbytes = SamplingMapCache().get(transforms.Rotate(30.0), (64, 64)).nbytes
+
+        cache = SamplingMapCache(maxbytes=int(nbytes * 2.5))
+        for angle in (30.0, 40.0, 50.0):
+            cache.get(transforms.Rotate(angle), (64, 64))
+        info = cache.info()
+        self.assertEqual(info.currsize, 2)
+        self.assertLessEqual(info.currbytes, cache._cache.maxbytes)
+
+        cache.get(transforms.Rotate(30.0), (64, 64))
+        self.assertEqual(cache.info().misses, 4)
+
+        cache.get(transforms.Rotate(30.0), (256, 256))
+        self.assertEqual(len(cache), 2)
+
+    def test_LRUCache_maxbytes(self):
+        cache = LRUCache(maxsize=10, maxbytes=100)
+        cache.put("a", 1, nbytes=40)
+        cache.put("b", 2, nbytes=40)
+        cache.get("a")
+        cache.put("c", 3, nbytes=40)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.info().currbytes, 80)
+
+        cache.put("d", 4, nbytes=200)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(len(cache), 2)
+
+        cache.put("a", 5, nbytes=10)
+        self.assertEqual(cache.info().currbytes, 50)
+
+        cache.clear()
+        self.assertEqual(cache.info().currbytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
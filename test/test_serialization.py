@@ -0,0 +1,167 @@
+import unittest
+import numpy as np
+from PIL import Image
+from pillow_affine import serialization, transforms
+
+
+def make_transform():
+    return transforms.ComposedTransform(
+        transforms.Rotate(30.0, center=(1.0, 2.0)),
+        transforms.Scale((0.5, 2.0)),
+        transforms.Scale(2.0, center=(3.0, 4.0)),
+        transforms.ComposedTransform(
+            transforms.Shear(10.0, clockwise=True),
+            transforms.Translate((3.0, 4.0), inverse=True),
+        ),
+        transforms.Identity(),
+    )
+
+
+class Tester(unittest.TestCase):
+    def test_transform_roundtrip(self):
+        transform = make_transform()
+
+        actual = serialization.loads_transform(serialization.dumps_transform(transform))
+        self.assertEqual(actual, transform)
+        self.assertEqual(repr(actual), repr(transform))
+
+    def test_compiled_transform_roundtrip(self):
+        transform = make_transform().compile()
+
+        actual = serialization.loads_transform(serialization.dumps_transform(transform))
+        self.assertEqual(actual, transform)
+
+    def test_transforms_roundtrip(self):
+        transforms_ = [
+            transforms.Rotate(angle) for angle in np.linspace(0.0, 360.0, 10)
+        ] + [make_transform(), make_transform().compile()]
+
+        batch = serialization.loads_transforms(
+            serialization.dumps_transforms(transforms_)
+        )
+        self.assertEqual(len(batch), len(transforms_))
+        self.assertEqual(batch[-2], transforms_[-2])
+        self.assertEqual(batch.tolist(), transforms_)
+
+    def test_loads_transforms_errors(self):
+        buffer = serialization.dumps_transforms([make_transform()] * 2)
+
+        with self.assertRaises(RuntimeError):
+            serialization.loads_transform(buffer)
+
+        with self.assertRaises(RuntimeError):
+            serialization.loads_transforms(buffer[:-56])
+
+        with self.assertRaises(RuntimeError):
+            serialization.loads_transforms(b"PATX" + buffer[4:])
+
+        version = serialization.VERSION + 1
+        with self.assertRaises(RuntimeError):
+            serialization.loads_transforms(
+                buffer[:4] + version.to_bytes(2, "little") + buffer[6:]
+            )
+
+    def test_loads_transforms_malformed(self):
+        transform = make_transform().compile()
+        buffer = serialization.dumps_transforms([make_transform(), transform])
+
+        def replace_node(idx, node):
+            malformed = bytearray(buffer)
+            malformed[idx] = node
+            return malformed
+
+        with self.subTest("unknown kind"):
+            with self.assertRaises(RuntimeError):
+                serialization.loads_transforms(replace_node(-1, 0x0F))
+
+        with self.subTest("missing values"):
+            with self.assertRaises(RuntimeError):
+                # Identity -> Rotate
+                serialization.loads_transforms(
+                    replace_node(-len(transform.segments) - 2, 2)
+                )
+
+        with self.subTest("segment outside of CompiledTransform"):
+            with self.assertRaises(RuntimeError):
+                # CompiledTransform -> ComposedTransform
+                serialization.loads_transforms(
+                    replace_node(-len(transform.segments) - 1, 5)
+                )
+
+    def test_dumps_transforms_compact(self):
+        empty = len(serialization.dumps_transforms([]))
+
+        for transform, num_values in (
+            (transforms.Identity(), 0),
+            (transforms.Rotate(30.0), 1),
+            (transforms.Scale(2.0), 1),
+            (transforms.Scale((2.0, 3.0), center=(1.0, 2.0)), 4),
+            (transforms.Translate((1.0, 2.0)), 2),
+        ):
+            with self.subTest(transform=transform):
+                buffer = serialization.dumps_transform(transform)
+                self.assertEqual(len(buffer), empty + 8 * num_values + 1)
+
+    def test_dumps_transforms_unsupported(self):
+        class Custom(transforms.Identity):
+            pass
+
+        with self.assertRaises(RuntimeError):
+            serialization.dumps_transform(Custom())
+
+    def test_params_roundtrip(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Scale(0.7)
+        )
+        sizes = np.random.default_rng(0).integers(16, 512, (100, 2))
+        desired = transform.extract_batch_transform_params(sizes, expand=True)
+
+        batch = serialization.TransformParamsBatch.from_transform(
+            transform, sizes, expand=True
+        )
+        buffer = serialization.dumps_params(batch)
+        self.assertEqual(buffer, serialization.dumps_params(desired))
+
+        actual = serialization.loads_params(buffer)
+        self.assertEqual(len(actual), len(desired))
+        self.assertEqual(actual[3], desired[3])
+        self.assertEqual(actual.tolist(), desired)
+        self.assertEqual(actual[0][1], Image.AFFINE)
+
+    def test_params_roundtrip_methods(self):
+        params = [
+            ((2, 3), Image.AFFINE, (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)),
+            ((4, 5), Image.PERSPECTIVE, (2.0, 0.0, 1.0, 0.0, 2.0, 1.0)),
+        ]
+
+        buffer = serialization.dumps_params(params)
+        self.assertEqual(serialization.loads_params(buffer).tolist(), params)
+
+        uniform = [(size, Image.AFFINE, data) for size, _, data in params]
+        self.assertEqual(
+            len(serialization.dumps_params(uniform)), len(buffer) - len(params)
+        )
+
+    def test_loads_params_zero_copy(self):
+        buffer = serialization.dumps_params(
+            [((2, 3), Image.AFFINE, (1.0, 0.0, 0.0, 0.0, 1.0, 0.0))]
+        )
+
+        batch = serialization.loads_params(buffer)
+        self.assertFalse(batch.data.flags.owndata)
+        self.assertFalse(batch.data.flags.writeable)
+
+    def test_loads_params_errors(self):
+        buffer = serialization.dumps_params(
+            [((2, 3), Image.AFFINE, (1.0, 0.0, 0.0, 0.0, 1.0, 0.0))]
+        )
+
+        with self.assertRaises(RuntimeError):
+            serialization.loads_params(buffer[:-1])
+
+        with self.assertRaises(RuntimeError):
+            serialization.loads_params(serialization.dumps_transform(make_transform()))
+
+
+if __name__ == "__main__":
+    unittest.main()
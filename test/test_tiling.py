@@ -0,0 +1,93 @@
+from os import path
+import time
+import unittest
+import unittest.mock
+from pyimagetest import ImageTestCase
+from PIL import Image
+from pillow_affine import transforms
+from pillow_affine.tiling import _warp_tile, iter_tiles, transform_tiled
+
+
+class Tester(ImageTestCase):
+    def default_image_file(self) -> str:
+        here = path.abspath(path.dirname(__file__))
+        return path.join(here, "..", "docs", "source", "_static", "images", "raw.png")
+
+    def default_image_backend(self):
+        return "PIL"
+
+    def test_transform_tiled(self):
+        image = self.load_image()
+        transform = transforms.ComposedTransform(
+            transforms.Shear(20.0),
+            transforms.Rotate(11.0),
+            transforms.Scale(0.7),
+            transforms.Translate((30.0, -20.0)),
+        )
+
+        for resample in (Image.NEAREST, Image.BILINEAR, Image.BICUBIC):
+            for expand in (False, True):
+                transform_params = transform.extract_transform_params(
+                    image.size, expand=expand
+                )
+                desired = image.transform(*transform_params, resample=resample)
+
+                actual = transform_tiled(
+                    image,
+                    transform,
+                    expand=expand,
+                    tile_size=100,
+                    resample=resample,
+                    workers=2,
+                )
+                self.assertImagesAlmostEqual(actual, desired)
+
+    def test_transform_tiled_fillcolor(self):
+        image = self.load_image()
+        transform = transforms.Translate((10000.0, 0.0))
+
+        actual = transform_tiled(image, transform, tile_size=256, fillcolor=(255, 0, 0))
+        self.assertEqual(
+            actual.getcolors(), [(image.width * image.height, (255, 0, 0))]
+        )
+
+    def test_iter_tiles(self):
+        image = self.load_image()
+        transform = transforms.Rotate(30.0)
+        tile_size = 200
+
+        tiles = list(iter_tiles(image, transform, expand=True, tile_size=tile_size))
+        size, _, _ = transform.extract_transform_params(image.size, expand=True)
+        width, height = size
+
+        self.assertEqual(tiles[0][0], (0, 0, tile_size, tile_size))
+        self.assertEqual(tiles[-1][0][2:], size)
+        self.assertEqual(
+            sum(tile.width * tile.height for _, tile in tiles), width * height
+        )
+        for box, tile in tiles:
+            self.assertEqual(tile.size, (box[2] - box[0], box[3] - box[1]))
+
+    def test_iter_tiles_close(self):
+        image = self.load_image()
+        transform = transforms.Rotate(30.0)
+        workers = 2
+        started = []
+
+        def warp_tile(*args):
+            started.append(args[2])
+            if len(started) > 1:
+                time.sleep(0.05)
+            return _warp_tile(*args)
+
+        with unittest.mock.patch("pillow_affine.tiling._warp_tile", warp_tile):
+            tiles = iter_tiles(image, transform, tile_size=16, workers=workers)
+            next(tiles)
+            tiles.close()
+
+        # only the tiles that were already being warped are finished
+        self.assertLessEqual(len(started), 1 + workers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,10 @@ from typing import Tuple
 from os import path
 import unittest
 import re
+import pickle
+import itertools
+import numpy as np
+from PIL import Image
 from pyimagetest import ImageTestCase
 from pillow_affine import transforms
 
@@ -143,6 +147,14 @@ class Tester(ImageTestCase):
         self.assertImagesAlmostEqual(actual, desired)
         self.assertHasValidElementaryTransformRepr(transform, special_chars="°")
 
+    def test_Rotate_right_angle(self):
+        image = self.load_image()
+
+        for angle in (90.0, 180.0, 270.0, -90.0):
+            transform = transforms.Rotate(angle)
+            _, _, data = transform.extract_transform_params(image.size)
+            self.assertTrue(all(param == round(param * 2.0) / 2.0 for param in data))
+
     def test_Scale_identity(self):
         factor = 1.0
 
@@ -250,6 +262,371 @@ class Tester(ImageTestCase):
 
         self.assertImagesAlmostEqual(actual, desired)
 
+    def test_extract_batch_transform_params(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0),
+            transforms.Shear(10.0, center=(3.0, 4.0)),
+            transforms.Translate((5.0, 7.0)),
+            transforms.Scale((0.5, 2.0)),
+        )
+        # small batches are processed one image at a time
+        small_sizes = ((100, 200), (31, 17), (640, 480))
+        large_sizes = small_sizes * 20
+
+        for sizes, expand in itertools.product(
+            (small_sizes, large_sizes), (False, True)
+        ):
+            actuals = transform.extract_batch_transform_params(sizes, expand=expand)
+            self.assertEqual(len(actuals), len(sizes))
+            for size, actual in zip(sizes, actuals):
+                desired = transform.extract_transform_params(size, expand=expand)
+                self.assertEqual(actual[:2], desired[:2])
+                for actual_param, desired_param in zip(actual[2], desired[2]):
+                    self.assertAlmostEqual(actual_param, desired_param)
+
+    def test_extract_batch_transform_params_small_batch(self):
+        transform = transforms.Rotate(30.0)
+        sizes = ((100, 200), (31, 17))
+
+        actuals = transform.extract_batch_transform_params(sizes, expand=True)
+        desireds = [
+            transform.extract_transform_params(size, expand=True) for size in sizes
+        ]
+        self.assertEqual(actuals, desireds)
+
+    def test_extract_batch_transform_params_array_params(self):
+        generator = np.random.default_rng(0)
+        num = 40
+        angles = generator.uniform(-30.0, 30.0, num)
+        centers = generator.uniform(0.0, 50.0, (num, 2))
+        factors = generator.uniform(0.5, 2.0, (num, 2))
+        translations = generator.uniform(-10.0, 10.0, (num, 2))
+        sizes = generator.integers(16, 128, (num, 2))
+
+        transform = transforms.ComposedTransform(
+            transforms.Shear(angles, clockwise=True),
+            transforms.Rotate(angles, center=centers),
+            transforms.Scale(factors),
+            transforms.Scale(factors[:, 0]),
+            transforms.Translate(translations, inverse=True),
+        )
+        self.assertEqual(
+            repr(transform.transforms[1]), "Rotate([40 angles], center=[40 centers])"
+        )
+
+        for expand in (False, True):
+            actuals = transform.extract_batch_transform_params(sizes, expand=expand)
+            self.assertEqual(len(actuals), num)
+            for idx, actual in enumerate(actuals):
+                desired = transforms.ComposedTransform(
+                    transforms.Shear(angles[idx], clockwise=True),
+                    transforms.Rotate(angles[idx], center=tuple(centers[idx])),
+                    transforms.Scale(tuple(factors[idx])),
+                    transforms.Scale(factors[idx, 0]),
+                    transforms.Translate(tuple(translations[idx]), inverse=True),
+                ).extract_transform_params(tuple(sizes[idx]), expand=expand)
+                self.assertEqual(actual[:2], desired[:2])
+                np.testing.assert_allclose(actual[2], desired[2], atol=1e-9)
+
+    def test_array_params_single_size(self):
+        transform = transforms.Rotate(np.array([0.0, 90.0, 180.0]))
+
+        actuals = transform.extract_batch_transform_params([(10, 10)])
+        self.assertEqual(len(actuals), 3)
+        self.assertEqual(actuals[1][2], (0.0, -1.0, 10.0, 1.0, 0.0, 0.0))
+
+    def test_array_params_errors(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Translate(np.zeros((3, 2)))
+        )
+
+        with self.assertRaises(RuntimeError):
+            transform.extract_transform_params((10, 10))
+
+        with self.assertRaises(RuntimeError):
+            transform.compile()
+
+        with self.assertRaises(RuntimeError):
+            transform.extract_batch_transform_params([(10, 10), (20, 20)])
+
+    def test_array_params_eq_hash(self):
+        angles = np.array([10.0, 20.0])
+        transform1 = transforms.Rotate(angles)
+        transform2 = transforms.Rotate(list(angles))
+
+        self.assertEqual(transform1, transform2)
+        self.assertEqual(hash(transform1), hash(transform2))
+        self.assertNotEqual(transform1, transforms.Rotate(angles + 1.0))
+
+    def test_Scale_scalar_types(self):
+        for factor in (2, np.float32(2.0), np.int64(2)):
+            transform = transforms.Scale(factor)
+            self.assertEqual(repr(transform), "Scale(2.00)")
+            self.assertEqual(
+                transform.extract_transform_params((10, 10)),
+                transforms.Scale(2.0).extract_transform_params((10, 10)),
+            )
+
+    def test_transform_coordinates(self):
+        size = (64, 48)
+        coordinate = (10, 5)
+        image = Image.new("L", size)
+        image.putpixel(coordinate, 255)
+
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0, center=(20.0, 20.0)),
+            transforms.Translate((3.0, -4.0)),
+        )
+        transform_params = transform.extract_transform_params(size)
+        transformed_image = image.transform(*transform_params)
+
+        pixel_center = (coordinate[0] + 0.5, coordinate[1] + 0.5)
+        actual = transform.transform_coordinates(np.array([pixel_center]), size)
+        actual = tuple(np.floor(actual[0]).astype(int).tolist())
+        self.assertEqual(transformed_image.getpixel(actual), 255)
+
+    def test_transform_coordinates_array_params(self):
+        coordinates = np.array(((1.0, 2.0), (30.0, 4.0)))
+        angles = np.array((10.0, 20.0, 30.0))
+        sizes = np.array(((100, 50), (60, 70), (30, 30)))
+
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(angles), transforms.Translate((3.0, 4.0))
+        )
+        for expand in (False, True):
+            for size in ((100, 50), sizes):
+                actual = transform.transform_coordinates(
+                    coordinates, size, expand=expand
+                )
+
+                desired = [
+                    transforms.ComposedTransform(
+                        transforms.Rotate(angle), transforms.Translate((3.0, 4.0))
+                    ).transform_coordinates(coordinates, tuple(size_), expand=expand)
+                    for angle, size_ in zip(
+                        angles, np.broadcast_to(size, sizes.shape).tolist()
+                    )
+                ]
+                np.testing.assert_allclose(actual, desired)
+
+    def test_transform_boxes(self):
+        size = (64, 48)
+        boxes = np.array(((0.0, 0.0, 10.0, 20.0), (30.0, 10.0, 40.0, 12.0)))
+
+        transform = transforms.Rotate(30.0)
+        for expand in (False, True):
+            actual, keep = transform.transform_boxes(
+                boxes, size, expand=expand, clip=False
+            )
+
+            vertices = [
+                transform.transform_coordinates(
+                    np.array(
+                        ((left, top), (right, top), (left, bottom), (right, bottom))
+                    ),
+                    size,
+                    expand=expand,
+                )
+                for left, top, right, bottom in boxes
+            ]
+            desired = np.array(
+                [
+                    (*np.min(vertex, axis=0), *np.max(vertex, axis=0))
+                    for vertex in vertices
+                ]
+            )
+            np.testing.assert_allclose(actual, desired)
+            self.assertTrue(np.all(keep))
+
+    def test_transform_boxes_clip(self):
+        size = (64, 48)
+        boxes = np.array(((0.0, 0.0, 10.0, 20.0), (50.0, 10.0, 60.0, 20.0)))
+
+        transform = transforms.Translate((10.0, 0.0))
+        actual, _ = transform.transform_boxes(boxes, size)
+        desired = np.array(((10.0, 0.0, 20.0, 20.0), (60.0, 10.0, 64.0, 20.0)))
+        np.testing.assert_allclose(actual, desired)
+
+    def test_transform_boxes_remove_degenerate(self):
+        size = (64, 48)
+        boxes = np.array(
+            ((0.0, 0.0, 10.0, 20.0), (5.0, 5.0, 5.0, 30.0), (60.0, 0.0, 64.0, 10.0))
+        )
+
+        transform = transforms.Translate((10.0, 0.0))
+        actual, keep = transform.transform_boxes(boxes, size, remove_degenerate=True)
+        np.testing.assert_allclose(actual, np.array(((10.0, 0.0, 20.0, 20.0),)))
+        np.testing.assert_array_equal(keep, np.array((True, False, False)))
+
+    def test_eq_hash(self):
+        transform1 = transforms.ComposedTransform(
+            transforms.Rotate(30.0, center=[1.0, 2.0]), transforms.Translate([1.0, 2.0])
+        )
+        transform2 = transforms.ComposedTransform(
+            transforms.Rotate(390.0, center=(1.0, 2.0)),
+            transforms.Translate((1.0, 2.0)),
+        )
+        self.assertEqual(transform1, transform2)
+        self.assertEqual(hash(transform1), hash(transform2))
+
+        self.assertNotEqual(transforms.Rotate(30.0), transforms.Shear(30.0))
+        self.assertNotEqual(transforms.Rotate(30.0), transforms.Rotate(40.0))
+
+    def test_cache(self):
+        size = (64, 48)
+        transform = transforms.Rotate(30.0)
+        transform.enable_cache(maxsize=2)
+
+        desired = transform.extract_transform_params(size)
+        actual = transform.extract_transform_params(size)
+        self.assertEqual(actual, desired)
+
+        info = transform.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.currsize, 1)
+
+        transform.extract_transform_params(size, expand=True)
+        transform.extract_transform_params((32, 32))
+        self.assertEqual(transform.cache_info().currsize, 2)
+
+    def test_cache_invalidation(self):
+        size = (64, 48)
+        transform = transforms.Rotate(30.0)
+        transform.enable_cache()
+
+        transform.extract_transform_params(size)
+        transform.angle = 60.0
+        self.assertEqual(transform.cache_info().currsize, 0)
+
+        actual = transform.extract_transform_params(size)
+        desired = transforms.Rotate(60.0).extract_transform_params(size)
+        self.assertEqual(actual, desired)
+
+    def test_cache_disabled(self):
+        transform = transforms.Rotate(30.0)
+        with self.assertRaises(RuntimeError):
+            transform.cache_info()
+
+    def test_compile(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0),
+            transforms.ComposedTransform(transforms.Shear(10.0), transforms.Scale(0.5)),
+            transforms.Shear(10.0, center=(3.0, 4.0)),
+            transforms.Translate((5.0, 7.0)),
+            transforms.Scale((0.5, 2.0)),
+        )
+        compiled_transform = transform.compile()
+        self.assertEqual(len(compiled_transform.segments), 3)
+
+        for size in ((100, 200), (31, 17)):
+            for expand in (False, True):
+                actual = compiled_transform.extract_transform_params(
+                    size, expand=expand
+                )
+                desired = transform.extract_transform_params(size, expand=expand)
+                self.assertEqual(actual[:2], desired[:2])
+                for actual_param, desired_param in zip(actual[2], desired[2]):
+                    self.assertAlmostEqual(actual_param, desired_param)
+
+    def test_compile_immutable(self):
+        compiled_transform = transforms.Rotate(30.0).compile()
+        with self.assertRaises(AttributeError):
+            compiled_transform.segments = ()
+
+    def test_compile_pickle(self):
+        compiled_transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Translate((5.0, 7.0))
+        ).compile()
+        compiled_transform.enable_cache()
+
+        actual = pickle.loads(pickle.dumps(compiled_transform))
+        self.assertEqual(actual, compiled_transform)
+
+    def test_Identity(self):
+        transform = transforms.Identity()
+        self.assertIsIdentityTransform(transform)
+        self.assertHasValidElementaryTransformRepr(transform)
+
+    def test_simplify(self):
+        center = (10.0, 20.0)
+        transform = transforms.ComposedTransform(
+            transforms.Translate((1.0, 2.0)),
+            transforms.Translate((3.0, 4.0), inverse=True),
+            transforms.ComposedTransform(
+                transforms.Rotate(30.0), transforms.Rotate(20.0, clockwise=True)
+            ),
+            transforms.Scale(1.0),
+            transforms.Rotate(15.0, center=center),
+            transforms.Scale(2.0, center=center),
+            transforms.Scale((0.5, 3.0), center=center),
+        )
+
+        actual = transform.simplify()
+        desired = transforms.ComposedTransform(
+            transforms.Translate((-2.0, -2.0)),
+            transforms.Rotate(10.0),
+            transforms.Rotate(15.0, center=center),
+            transforms.Scale((1.0, 6.0), center=center),
+        )
+        self.assertEqual(actual.transform, desired)
+        self.assertEqual(actual.num_transforms, 8)
+        self.assertEqual(actual.num_simplified_transforms, 4)
+        self.assertFalse(actual.is_identity)
+
+        size = (100, 80)
+        for expand in (False, True):
+            actual_params = actual.transform.extract_transform_params(
+                size, expand=expand
+            )
+            desired_params = transform.extract_transform_params(size, expand=expand)
+            self.assertEqual(actual_params[0], desired_params[0])
+            for actual_param, desired_param in zip(actual_params[2], desired_params[2]):
+                self.assertAlmostEqual(actual_param, desired_param)
+
+    def test_simplify_identity(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0),
+            transforms.Translate((5.0, 7.0)),
+            transforms.Scale(2.0),
+            transforms.Scale(0.5),
+            transforms.Translate((5.0, 7.0), inverse=True),
+            transforms.Rotate(30.0, clockwise=True),
+        )
+
+        actual = transform.simplify()
+        self.assertTrue(actual.is_identity)
+        self.assertEqual(actual.transform, transforms.Identity())
+        self.assertIsIdentityTransform(actual.transform)
+
+    def test_simplify_array_center(self):
+        center = np.array([10.0, 20.0])
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(10.0, center=center),
+            transforms.Rotate(20.0, center=center),
+            transforms.Scale(2.0, center=center),
+            transforms.Scale(3.0, center=(10.0, 20.0)),
+        )
+
+        actual = transform.simplify()
+        self.assertEqual(actual.num_simplified_transforms, 2)
+        self.assertEqual(
+            actual.transform,
+            transforms.ComposedTransform(
+                transforms.Rotate(30.0, center=center),
+                transforms.Scale(6.0, center=center),
+            ),
+        )
+
+    def test_simplify_different_centers(self):
+        transform = transforms.ComposedTransform(
+            transforms.Rotate(30.0), transforms.Rotate(30.0, center=(0.0, 0.0))
+        )
+
+        actual = transform.simplify()
+        self.assertEqual(actual.transform, transform)
+        self.assertEqual(actual.num_simplified_transforms, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
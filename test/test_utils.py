@@ -1,5 +1,6 @@
 import unittest
 import random
+import pickle
 import numpy as np
 from pillow_affine import utils
 
@@ -65,6 +66,53 @@ class Tester(unittest.TestCase):
         desired = np.linalg.inv(numpy_matrix)
         self.assertMatrixAlmostEqual(actual, desired)
 
+    def test_batch_matmul(self):
+        random.seed(0)
+
+        pil_matrices1 = [random_matrix() for _ in range(5)]
+        pil_matrices2 = [random_matrix() for _ in range(5)]
+
+        actual = utils.batch_matmul(np.array(pil_matrices1), np.array(pil_matrices2))
+        desired = np.array(
+            [
+                utils.matmul(pil_matrix1, pil_matrix2)
+                for pil_matrix1, pil_matrix2 in zip(pil_matrices1, pil_matrices2)
+            ]
+        )
+        np.testing.assert_allclose(actual, desired)
+
+    def test_batch_matmul_broadcast(self):
+        random.seed(0)
+
+        pil_matrix = random_matrix()
+        pil_matrices = [random_matrix() for _ in range(5)]
+
+        actual = utils.batch_matmul(np.array(pil_matrix), np.array(pil_matrices))
+        desired = np.array(
+            [utils.matmul(pil_matrix, other_matrix) for other_matrix in pil_matrices]
+        )
+        np.testing.assert_allclose(actual, desired)
+
+    def test_batch_left_matmuls(self):
+        random.seed(0)
+
+        pil_matrices = [[random_matrix() for _ in range(5)] for _ in range(3)]
+
+        actual = utils.batch_left_matmuls(*[np.array(stack) for stack in pil_matrices])
+        desired = np.array(
+            [utils.left_matmuls(*matrices) for matrices in zip(*pil_matrices)]
+        )
+        np.testing.assert_allclose(actual, desired)
+
+    def test_batch_matinv(self):
+        random.seed(0)
+
+        pil_matrices = [random_matrix() for _ in range(5)]
+
+        actual = utils.batch_matinv(np.array(pil_matrices))
+        desired = np.array([utils.matinv(pil_matrix) for pil_matrix in pil_matrices])
+        np.testing.assert_allclose(actual, desired)
+
     def test_deg2rad(self):
         angles = (0.0, 90.0, -90.0, 30.0, 360.0, -360.0, 720.0)
 
@@ -84,3 +132,133 @@ class Tester(unittest.TestCase):
         actual = np.array(utils.transform_coordinate(pil_coordinate, pil_matrix))
         desired = np.matmul(numpy_matrix, numpy_coordinate)[:-1]
         np.testing.assert_allclose(actual, desired)
+
+    def test_transform_coordinates(self):
+        random.seed(0)
+
+        pil_coordinates = [(randn(), randn()) for _ in range(5)]
+        pil_matrix = random_matrix()
+
+        actual = utils.transform_coordinates(np.array(pil_coordinates), pil_matrix)
+        desired = np.array(
+            [
+                utils.transform_coordinate(pil_coordinate, pil_matrix)
+                for pil_coordinate in pil_coordinates
+            ]
+        )
+        np.testing.assert_allclose(actual, desired)
+
+    def test_transform_coordinates_matrix_stack(self):
+        random.seed(0)
+
+        pil_coordinates = [(randn(), randn()) for _ in range(5)]
+        pil_matrices = [random_matrix() for _ in range(3)]
+
+        actual = utils.transform_coordinates(
+            np.array(pil_coordinates), np.array(pil_matrices)
+        )
+        desired = np.array(
+            [
+                [
+                    utils.transform_coordinate(pil_coordinate, pil_matrix)
+                    for pil_coordinate in pil_coordinates
+                ]
+                for pil_matrix in pil_matrices
+            ]
+        )
+        np.testing.assert_allclose(actual, desired)
+
+    def test_calculate_source_box(self):
+        data = (0.5, 0.0, 10.0, 0.0, 2.0, -4.0)
+        box = (0, 0, 4, 2)
+
+        actual = utils.calculate_source_box(data, box, margin=1)
+        desired = (9, -4, 13, 1)
+        self.assertEqual(actual, desired)
+
+    def test_offset_affine_data(self):
+        pil_matrix = random_matrix(seed=0)
+        output_offset = (3, 4)
+        input_offset = (5, 6)
+
+        coordinate = (randn(), randn())
+        offset_coordinate = (
+            coordinate[0] - output_offset[0],
+            coordinate[1] - output_offset[1],
+        )
+
+        actual = utils.transform_coordinate(
+            offset_coordinate,
+            utils.offset_affine_data(pil_matrix, output_offset, input_offset),
+        )
+        desired = utils.transform_coordinate(coordinate, pil_matrix)
+        desired = (desired[0] - input_offset[0], desired[1] - input_offset[1])
+        np.testing.assert_allclose(actual, desired)
+
+    def test_calculate_singular_values(self):
+        pil_matrix = random_matrix(seed=0)
+
+        actual = utils.calculate_singular_values(pil_matrix)
+        desired = np.linalg.svd(convert_matrix_to_numpy(pil_matrix)[:2, :2])[1]
+        np.testing.assert_allclose(actual, desired)
+
+    def test_AffineMatrix(self):
+        pil_matrix = random_matrix(seed=0)
+        matrix = utils.AffineMatrix(pil_matrix)
+
+        self.assertEqual(tuple(matrix), pil_matrix)
+        self.assertEqual(matrix.params, pil_matrix)
+        self.assertEqual(matrix[2], pil_matrix[2])
+        self.assertEqual(matrix, utils.AffineMatrix(matrix.params))
+        self.assertNotEqual(matrix, utils.AffineMatrix())
+        self.assertEqual(hash(matrix), hash(utils.AffineMatrix(pil_matrix)))
+
+        a, b, _, d, e, _ = pil_matrix
+        self.assertAlmostEqual(matrix.det, a * e - b * d)
+        self.assertEqual(
+            matrix.singular_values, utils.calculate_singular_values(pil_matrix)
+        )
+
+    def test_AffineMatrix_matmul(self):
+        pil_matrix1 = random_matrix(seed=0)
+        pil_matrix2 = random_matrix(seed=1)
+        desired = utils.matmul(pil_matrix1, pil_matrix2)
+
+        matrix1 = utils.AffineMatrix(pil_matrix1)
+        matrix2 = utils.AffineMatrix(pil_matrix2)
+        for actual in (matrix1 @ matrix2, matrix1 @ pil_matrix2, pil_matrix1 @ matrix2):
+            self.assertIsInstance(actual, utils.AffineMatrix)
+            self.assertEqual(actual.params, desired)
+
+    def test_AffineMatrix_inverse(self):
+        pil_matrix = random_matrix(seed=0)
+        matrix = utils.AffineMatrix(pil_matrix)
+
+        inverse = matrix.inverse
+        self.assertIs(matrix.inverse, inverse)
+        self.assertIs(inverse.inverse, matrix)
+        self.assertMatrixAlmostEqual(inverse.params, utils.matinv(pil_matrix))
+
+        with self.assertRaises(RuntimeError):
+            utils.AffineMatrix((1.0, 2.0, 0.0, 2.0, 4.0, 0.0)).inverse
+
+    def test_AffineMatrix_predicates(self):
+        identity = utils.AffineMatrix()
+        self.assertTrue(identity.is_identity)
+        self.assertTrue(identity.is_translation)
+        self.assertTrue(identity.is_axis_aligned)
+
+        translation = utils.AffineMatrix((1.0, 0.0, 2.0, 0.0, 1.0, -3.0))
+        self.assertFalse(translation.is_identity)
+        self.assertTrue(translation.is_translation)
+
+        rotation = utils.AffineMatrix((1e-17, -1.0, 0.0, 1.0, 1e-17, 0.0))
+        self.assertFalse(rotation.is_translation)
+        self.assertTrue(rotation.is_axis_aligned)
+
+        shear = utils.AffineMatrix((1.0, 0.5, 0.0, 0.0, 1.0, 0.0))
+        self.assertFalse(shear.is_axis_aligned)
+
+    def test_AffineMatrix_pickle(self):
+        matrix = utils.AffineMatrix(random_matrix(seed=0))
+        self.assertEqual(pickle.loads(pickle.dumps(matrix)), matrix)
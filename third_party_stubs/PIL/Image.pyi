@@ -1,4 +1,63 @@
+from typing import Any, Dict, Optional, Tuple, Union
+
+NEAREST: int
+BILINEAR: int
+BICUBIC: int
 AFFINE: int
+FLIP_LEFT_RIGHT: int
+FLIP_TOP_BOTTOM: int
+ROTATE_90: int
+ROTATE_180: int
+ROTATE_270: int
+TRANSPOSE: int
+TRANSVERSE: int
+
+def open(fp: Any, mode: str = ...) -> Image: ...
+def new(mode: str, size: Tuple[int, int], color: Any = ...) -> Image: ...
 
 class Image:
-    pass
+    size: Tuple[int, int]
+    width: int
+    height: int
+    mode: str
+    format: Optional[str]
+    info: Dict[str, Any]
+    def load(self) -> Any: ...
+    def convert(self, mode: Optional[str] = ..., **kwargs: Any) -> Image: ...
+    def seek(self, frame: int) -> None: ...
+    def crop(self, box: Optional[Tuple[int, int, int, int]] = ...) -> Image: ...
+    def paste(
+        self, im: Any, box: Optional[Any] = ..., mask: Optional[Image] = ...
+    ) -> None: ...
+    def alpha_composite(
+        self,
+        im: Image,
+        dest: Tuple[int, int] = ...,
+        source: Tuple[int, ...] = ...,
+    ) -> None: ...
+    def transpose(self, method: int) -> Image: ...
+    def resize(
+        self,
+        size: Tuple[int, int],
+        resample: int = ...,
+        box: Optional[Tuple[float, float, float, float]] = ...,
+    ) -> Image: ...
+    def reduce(
+        self,
+        factor: Union[int, Tuple[int, int]],
+        box: Optional[Tuple[int, int, int, int]] = ...,
+    ) -> Image: ...
+    def getpalette(self) -> Optional[Any]: ...
+    def putpalette(self, data: Any, rawmode: str = ...) -> None: ...
+    def copy(self) -> Image: ...
+    def tobytes(self, encoder_name: str = ..., *args: Any) -> bytes: ...
+    def save(self, fp: Any, format: Optional[str] = ..., **params: Any) -> None: ...
+    def transform(
+        self,
+        size: Tuple[int, int],
+        method: int,
+        data: Optional[Any] = ...,
+        resample: int = ...,
+        fill: int = ...,
+        fillcolor: Optional[Any] = ...,
+    ) -> Image: ...